@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.ann_index import IVFIndex, exact_search
+from scripts.graph_arrays import normalize_embeddings
+
+# --- ANN candidate index benchmark ---
+# Builds the IVF index over N embeddings and compares it with exact search on a
+# sample of queries: recall@k (share of the exact k best more-senior rows the
+# index matches) and per-query latency, for several nprobe values.
+# Embeddings are a clustered Gaussian mixture by default (like profile
+# embeddings, which group by role and department), or the hashed
+# bag-of-words profiles of a synthetic org (--source synthetic).
+#
+#   python benchmarks/bench_ann.py --sizes 100000 --nprobe 1,4,8,16
+
+
+def clustered_embeddings(num_rows, dim=384, seed=0, noise=1.0):
+    """Unit rows drawn around sqrt(N) random centres, plus a seniority level (1-7) per row."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(max(1, int(np.sqrt(num_rows))), dim)).astype(np.float32)
+    labels = rng.integers(0, len(centres), num_rows)
+    vectors = centres[labels] + rng.normal(scale=noise, size=(num_rows, dim)).astype(np.float32)
+    return normalize_embeddings(vectors), rng.integers(1, 8, num_rows)
+
+
+def synthetic_org_embeddings(num_rows, seed=0):
+    """Hashed bag-of-words embeddings and seniority of a benchmarks/synthetic_org.py org."""
+    from benchmarks.run_stages import HashEmbedder
+    from benchmarks.synthetic_org import generate_org
+    from scripts.solution import get_seniority, profile_text
+    employees_df, _, _ = generate_org(num_rows, seed=seed)
+    vectors = HashEmbedder().encode(profile_text(employees_df).tolist())
+    return normalize_embeddings(vectors), employees_df['job_title_current'].map(get_seniority).to_numpy()
+
+
+def recall(found_scores, exact_scores):
+    """
+    Mean share of each query's exact top k matched by the index, counting a found
+    row as a hit when it scores at least the exact k-th best (profiles often tie).
+    Queries without any valid neighbour (the most senior rows) are skipped.
+    """
+    valid = np.isfinite(exact_scores)
+    kth = np.where(valid, exact_scores, np.inf).min(axis=1, keepdims=True)
+    hits = (found_scores >= kth - 1e-5).sum(axis=1)
+    counted = valid.any(axis=1)
+    return float(np.mean(np.minimum(hits, valid.sum(axis=1))[counted] / valid.sum(axis=1)[counted])) if counted.any() else 1.0
+
+
+def benchmark(vectors, ranks, k, nprobes, num_queries, seed=0):
+    rng = np.random.default_rng(seed)
+    queries = rng.choice(len(vectors), size=min(num_queries, len(vectors)), replace=False)
+
+    start = time.perf_counter()
+    index = IVFIndex(vectors, ranks=ranks, seed=seed)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, exact_scores = exact_search(vectors, vectors[queries], k, ranks, ranks[queries])
+    exact_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+    rows = []
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        _, found_scores = index.search(vectors[queries], k, nprobe=nprobe, rank_above=ranks[queries])
+        elapsed = time.perf_counter() - start
+        rows.append({'rows': len(vectors), 'nlist': index.nlist, 'nprobe': nprobe, 'k': k,
+                     'build_seconds': round(build_seconds, 3), 'exact_ms_per_query': round(exact_ms, 4),
+                     'ann_ms_per_query': round(elapsed / len(queries) * 1000, 4),
+                     f'recall_at_{k}': round(recall(found_scores, exact_scores), 4)})
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Recall and latency of the IVF candidate index against exact search.')
+    parser.add_argument('--sizes', default='10000,100000', help='Comma-separated numbers of embeddings')
+    parser.add_argument('--source', choices=['clusters', 'synthetic'], default='clusters')
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--nprobe', default='1,4,8,16', help='Comma-separated nprobe values')
+    parser.add_argument('--queries', type=int, default=2000, help='Queries timed and checked per size')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output_path', default=None, help='Optional JSON output file')
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'rows':>9} {'nlist':>6} {'nprobe':>6} {'build s':>8} {'exact ms/q':>11} {'ann ms/q':>9} {'recall':>7}")
+    for size in [int(s) for s in args.sizes.split(',') if s]:
+        if args.source == 'synthetic':
+            vectors, ranks = synthetic_org_embeddings(size, args.seed)
+        else:
+            vectors, ranks = clustered_embeddings(size, seed=args.seed)
+        for row in benchmark(vectors, ranks, args.k, [int(p) for p in args.nprobe.split(',')], args.queries, args.seed):
+            results.append(dict(row, source=args.source))
+            print(f"{row['rows']:>9} {row['nlist']:>6} {row['nprobe']:>6} {row['build_seconds']:>8} "
+                  f"{row['exact_ms_per_query']:>11} {row['ann_ms_per_query']:>9} {row[f'recall_at_{args.k}']:>7}")
+
+    if args.output_path:
+        with open(args.output_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output_path}")
@@ -0,0 +1,129 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.assignment import assign_greedy, assign_arborescence
+
+# --- Greedy vs arborescence assignment benchmark ---
+# Synthetic orgs are random recursive trees. Each employee gets its true manager
+# as a candidate (most of the time) plus noisy peers, direct reports and random
+# colleagues whose scores overlap the true one, so the greedy loop hits cycles.
+
+def synthetic_candidates(num_nodes, noise_candidates=4, seed=0):
+    """Returns (true_managers, emp_idx, mgr_idx, scores) for a synthetic org."""
+    rng = np.random.default_rng(seed)
+    true_managers = np.full(num_nodes, -1, dtype=np.int64)
+    true_managers[1:] = (rng.random(num_nodes - 1) * np.arange(1, num_nodes)).astype(np.int64)
+
+    employees = np.arange(1, num_nodes)
+    has_true = rng.random(len(employees)) < 0.9
+    emp_parts = [employees[has_true]]
+    mgr_parts = [true_managers[employees[has_true]]]
+    score_parts = [rng.normal(1.0, 0.3, has_true.sum())]
+
+    # Direct reports scored as managers are what makes the greedy pick cycles
+    emp_parts.append(true_managers[employees])
+    mgr_parts.append(employees)
+    score_parts.append(rng.normal(0.6, 0.3, len(employees)))
+
+    for _ in range(noise_candidates):
+        emp = rng.integers(1, num_nodes, num_nodes)
+        mgr = rng.integers(0, num_nodes, num_nodes)
+        emp_parts.append(emp)
+        mgr_parts.append(mgr)
+        score_parts.append(rng.normal(0.3, 0.3, num_nodes))
+
+    emp_idx, mgr_idx = np.concatenate(emp_parts), np.concatenate(mgr_parts)
+    scores = np.concatenate(score_parts)
+    keep = emp_idx != mgr_idx
+    return true_managers, emp_idx[keep], mgr_idx[keep], scores[keep]
+
+def run_greedy(num_nodes, emp_idx, mgr_idx, scores):
+    order = np.argsort(-scores, kind='stable')
+    pairs = zip(scores[order].tolist(), emp_idx[order].tolist(), mgr_idx[order].tolist())
+    predictions = assign_greedy(pairs, show_progress=False)
+    managers = np.full(num_nodes, -1, dtype=np.int64)
+    managers[list(predictions.keys())] = list(predictions.values())
+    return managers
+
+def accuracy(managers, true_managers):
+    evaluable = true_managers >= 0
+    return float(np.mean(managers[evaluable] == true_managers[evaluable]))
+
+def benchmark_synthetic(sizes, seed):
+    rows = []
+    for num_nodes in sizes:
+        true_managers, emp_idx, mgr_idx, scores = synthetic_candidates(num_nodes, seed=seed)
+        for mode, assign in [('greedy', run_greedy), ('arborescence', assign_arborescence)]:
+            start = time.perf_counter()
+            managers = assign(num_nodes, emp_idx, mgr_idx, scores)
+            elapsed = time.perf_counter() - start
+            rows.append({'dataset': f'synthetic-{num_nodes}', 'mode': mode, 'nodes': num_nodes,
+                         'edges': len(scores), 'seconds': round(elapsed, 3),
+                         'accuracy': round(accuracy(managers, true_managers), 4),
+                         'total_score': round(float(scores_of(managers, emp_idx, mgr_idx, scores)), 2)})
+            print(rows[-1])
+    return rows
+
+def scores_of(managers, emp_idx, mgr_idx, scores):
+    """Total score of the chosen edges (best score when a pair appears more than once)."""
+    chosen = managers[emp_idx] == mgr_idx
+    return pd.Series(scores[chosen]).groupby(emp_idx[chosen]).max().sum()
+
+def benchmark_bundled(employees_path, connections_path, ground_truth_path):
+    from scripts.solution import build_graph_with_features, get_scoring_weights, MODEL_NAME, DEFAULT_EMBEDDING_CACHE_DIR
+    from scripts.embedding_cache import EmbeddingCache
+    from scripts.data_io import read_employees, read_connections
+    from scripts.scoring import score_candidate_edges
+
+    employees_df = read_employees(employees_path)
+    connections_df = read_connections(connections_path)
+    G = build_graph_with_features(employees_df, connections_df,
+                                  embedding_cache=EmbeddingCache(DEFAULT_EMBEDDING_CACHE_DIR, MODEL_NAME))
+    emp_idx, mgr_idx, scores = score_candidate_edges(G, get_scoring_weights())
+
+    # Same definition as dependencies/evaluate.py: correct / rows in the ground truth file
+    gt_df = pd.read_csv(ground_truth_path)
+    gt_idx = G.index_of(gt_df['employee_id'].to_numpy())
+    true_ids = gt_df['manager_id'].to_numpy()
+
+    rows = []
+    for mode, assign in [('greedy', run_greedy), ('arborescence', assign_arborescence)]:
+        start = time.perf_counter()
+        managers = assign(G.number_of_nodes(), emp_idx, mgr_idx, scores)
+        elapsed = time.perf_counter() - start
+        predicted_ids = np.where(gt_idx >= 0, G.node_ids[managers[gt_idx]], 0)
+        predicted_ids[(gt_idx < 0) | (managers[gt_idx] < 0)] = 0
+        correct = int(np.sum((predicted_ids == true_ids) & (true_ids != -1)))
+        rows.append({'dataset': 'bundled', 'mode': mode, 'nodes': G.number_of_nodes(), 'edges': len(scores),
+                     'seconds': round(elapsed, 3), 'accuracy': round(correct / len(gt_df), 4),
+                     'total_score': round(float(scores_of(managers, emp_idx, mgr_idx, scores)), 2)})
+        print(rows[-1])
+    return rows
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10000,100000,1000000',
+                        help='Comma-separated synthetic org sizes')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bundled', action='store_true',
+                        help='Also compare both modes on data/ against the ground truth (needs the model or a warm embedding cache)')
+    parser.add_argument('--employees_path', default='data/employees.csv')
+    parser.add_argument('--connections_path', default='data/connections.csv')
+    parser.add_argument('--ground_truth_path', default='data/ground_truth_managers.csv')
+    parser.add_argument('--output_path', default=None, help='Optional CSV file for the result table')
+    args = parser.parse_args()
+
+    results = benchmark_synthetic([int(size) for size in args.sizes.split(',') if size], args.seed)
+    if args.bundled:
+        results += benchmark_bundled(args.employees_path, args.connections_path, args.ground_truth_path)
+
+    table = pd.DataFrame(results)
+    print("\n--- Assignment Benchmark ---")
+    print(table.to_string(index=False))
+    if args.output_path:
+        table.to_csv(args.output_path, index=False)
@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.run_stages import HashEmbedder
+from scripts.data_io import read_employees
+from scripts.embedding_cache import EmbeddingCache
+from scripts.model_snapshot import load_model
+from scripts.solution import embed_profiles, MODEL_NAME
+
+# --- Cold-start benchmark ---
+# Every measurement runs in a fresh interpreter, repeated and reported as the median:
+#   import:     `import scripts.solution`, and which heavy libraries it pulled in
+#   cached_cli: a full CLI run whose embeddings are all in the cache (torch must stay unimported)
+#   server:     serving/serve.py until /healthz answers (listening) and until /ready
+#               answers 200 (model loaded and warm), optionally from a model snapshot
+# The embedding cache for cached_cli is prefilled in a temporary directory, with the
+# real model or, offline, with hashed vectors (the timing does not depend on them).
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['torch', 'sentence_transformers', 'transformers', 'sklearn', 'networkx', 'tqdm', 'plotly']
+RESULT_MARKER = 'COLD_START_RESULT '
+
+IMPORT_PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import scripts.solution
+seconds = time.perf_counter() - start
+print({RESULT_MARKER!r} + json.dumps({{'seconds': seconds, 'heavy_modules': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+CLI_PROBE = f"""
+import json, runpy, sys, time
+sys.argv = ['scripts/solution.py'] + {{argv!r}}
+start = time.perf_counter()
+runpy.run_path('scripts/solution.py', run_name='__main__')
+seconds = time.perf_counter() - start
+print({RESULT_MARKER!r} + json.dumps({{{{'seconds': seconds, 'heavy_modules': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}}}))
+"""
+
+
+def _run_probe(code, env=None):
+    """Runs `code` in a new interpreter; returns (wall seconds including startup, probe result)."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True,
+                            env=dict(os.environ, **(env or {})))
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"Probe failed:\n{result.stderr[-2000:]}")
+    line = next(line for line in result.stdout.splitlines() if line.startswith(RESULT_MARKER))
+    return wall, json.loads(line[len(RESULT_MARKER):])
+
+
+def _summary(walls, inner, heavy_modules):
+    return {'process_seconds': round(statistics.median(walls), 3),
+            'in_process_seconds': round(statistics.median(inner), 3),
+            'heavy_modules': heavy_modules}
+
+
+def measure_import(repeats):
+    walls, inner = [], []
+    for _ in range(repeats):
+        wall, probe = _run_probe(IMPORT_PROBE)
+        walls.append(wall)
+        inner.append(probe['seconds'])
+    return _summary(walls, inner, probe['heavy_modules'])
+
+
+def prefill_embedding_cache(cache_dir, employees_path, embedder):
+    employees_df = read_employees(employees_path)
+    model = HashEmbedder() if embedder == 'hash' else load_model(MODEL_NAME)
+    embed_profiles(employees_df, model=model, embedding_cache=EmbeddingCache(cache_dir, MODEL_NAME))
+
+
+def measure_cached_cli(repeats, employees_path, connections_path, cache_dir):
+    output_path = os.path.join(cache_dir, 'submission.csv')
+    argv = ['--employees_path', employees_path, '--connections_path', connections_path,
+            '--output_path', output_path, '--embedding_cache_dir', cache_dir]
+    walls, inner = [], []
+    for _ in range(repeats):
+        wall, probe = _run_probe(CLI_PROBE.format(argv=argv))
+        walls.append(wall)
+        inner.append(probe['seconds'])
+    return _summary(walls, inner, probe['heavy_modules'])
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url, deadline):
+    """Polls `url` until it answers 200; a /ready body reporting a failed model load aborts."""
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except urllib.error.HTTPError as e:
+            body = json.loads(e.read() or b'{}')
+            if body.get('model') == 'failed':
+                raise RuntimeError(f"Model failed to load: {body.get('error')}")
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.05)
+    return False
+
+
+def measure_server(repeats, model_dir=None, timeout=300):
+    """Median seconds from process start to /healthz answering and to /ready returning 200."""
+    listen, ready = [], []
+    for _ in range(repeats):
+        port = _free_port()
+        env = dict(os.environ, PORT=str(port), FLASK_DEBUG='0')
+        if model_dir:
+            env['MODEL_SNAPSHOT_DIR'] = model_dir
+        start = time.perf_counter()
+        server = subprocess.Popen([sys.executable, 'serving/serve.py'], cwd=REPO_ROOT, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            deadline = start + timeout
+            if not _wait_for(f'http://127.0.0.1:{port}/healthz', deadline):
+                raise RuntimeError(f"Server did not start listening within {timeout}s")
+            listen.append(time.perf_counter() - start)
+            if not _wait_for(f'http://127.0.0.1:{port}/ready', deadline):
+                raise RuntimeError(f"Server did not become ready within {timeout}s")
+            ready.append(time.perf_counter() - start)
+        finally:
+            server.terminate()
+            server.wait()
+    return {'listen_seconds': round(statistics.median(listen), 3),
+            'ready_seconds': round(statistics.median(ready), 3),
+            'model_snapshot': bool(model_dir)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure import, cached-run and server cold-start times.')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--employees_path', default='data/employees.csv')
+    parser.add_argument('--connections_path', default='data/connections.csv')
+    parser.add_argument('--prefill', choices=['model', 'hash'], default='model',
+                        help="How to fill the embedding cache for the cached CLI run (hash works offline)")
+    parser.add_argument('--model_dir', default=None,
+                        help="Also time server start-up from this model snapshot (scripts/model_snapshot.py)")
+    parser.add_argument('--skip_server', action='store_true')
+    parser.add_argument('--output_path', default=None, help='Optional JSON output file')
+    args = parser.parse_args()
+    employees_path, connections_path = os.path.abspath(args.employees_path), os.path.abspath(args.connections_path)
+
+    results = {}
+    print("Timing `import scripts.solution`...")
+    results['import'] = measure_import(args.repeats)
+    print(f"   {results['import']}")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        print("Timing a CLI run with every embedding cached...")
+        prefill_embedding_cache(cache_dir, employees_path, args.prefill)
+        results['cached_cli'] = measure_cached_cli(args.repeats, employees_path, connections_path, cache_dir)
+        print(f"   {results['cached_cli']}")
+        if 'torch' in results['cached_cli']['heavy_modules']:
+            print("   WARNING: torch was imported although no embedding had to be computed")
+
+    if not args.skip_server:
+        print("Timing server start-up (model resolved by name)...")
+        results['server'] = measure_server(args.repeats)
+        print(f"   {results['server']}")
+        if args.model_dir:
+            print(f"Timing server start-up from the snapshot in {args.model_dir}...")
+            results['server_snapshot'] = measure_server(args.repeats, os.path.abspath(args.model_dir))
+            print(f"   {results['server_snapshot']}")
+
+    if args.output_path:
+        with open(args.output_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output_path}")
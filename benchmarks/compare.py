@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.run_stages import STAGES
+
+# --- Benchmark regression check ---
+# Compares two run_stages.py reports run by run (matched by dataset name) and
+# stage by stage. A stage regresses when it is slower (or, with --memory
+# reports, allocates more) than the baseline by more than the relative
+# tolerance *and* by more than an absolute floor, so millisecond stages do not
+# flap on timer noise. Accuracy drops are flagged as well. Exits 1 on any
+# regression so it can gate CI.
+
+DEFAULT_TOLERANCE = 0.15
+DEFAULT_MIN_SECONDS = 0.05
+DEFAULT_MIN_MB = 5.0
+DEFAULT_ACCURACY_DROP = 0.005
+
+
+def _regressed(baseline, current, tolerance, floor):
+    return current > baseline * (1 + tolerance) and current - baseline > floor
+
+
+def compare_reports(baseline, current, tolerance=DEFAULT_TOLERANCE, min_seconds=DEFAULT_MIN_SECONDS,
+                    min_mb=DEFAULT_MIN_MB, accuracy_drop=DEFAULT_ACCURACY_DROP):
+    """Returns (rows, regressions); each row is (dataset, stage, metric, baseline, current, regressed)."""
+    baseline_runs = {run['dataset']: run for run in baseline['runs']}
+    rows, regressions = [], []
+    for run in current['runs']:
+        base = baseline_runs.get(run['dataset'])
+        if base is None:
+            continue
+        for stage in STAGES:
+            old, new = base['stages'].get(stage), run['stages'].get(stage)
+            if old is None or new is None:
+                continue
+            checks = [('seconds', min_seconds)]
+            if 'peak_mb' in old and 'peak_mb' in new:
+                checks.append(('peak_mb', min_mb))
+            for metric, floor in checks:
+                regressed = _regressed(old[metric], new[metric], tolerance, floor)
+                rows.append((run['dataset'], stage, metric, old[metric], new[metric], regressed))
+                if regressed:
+                    regressions.append(rows[-1])
+        if 'accuracy' in base and 'accuracy' in run:
+            regressed = run['accuracy'] < base['accuracy'] - accuracy_drop
+            rows.append((run['dataset'], 'total', 'accuracy', base['accuracy'], run['accuracy'], regressed))
+            if regressed:
+                regressions.append(rows[-1])
+    return rows, regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Flag stage regressions between two run_stages.py reports.')
+    parser.add_argument('baseline_path')
+    parser.add_argument('current_path')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='Allowed relative slowdown')
+    parser.add_argument('--min_seconds', type=float, default=DEFAULT_MIN_SECONDS, help='Ignore slowdowns smaller than this')
+    parser.add_argument('--min_mb', type=float, default=DEFAULT_MIN_MB, help='Ignore peak memory growth smaller than this')
+    parser.add_argument('--accuracy_drop', type=float, default=DEFAULT_ACCURACY_DROP)
+    args = parser.parse_args()
+
+    with open(args.baseline_path) as f:
+        baseline = json.load(f)
+    with open(args.current_path) as f:
+        current = json.load(f)
+    rows, regressions = compare_reports(baseline, current, args.tolerance, args.min_seconds,
+                                        args.min_mb, args.accuracy_drop)
+
+    print(f"{'dataset':<20} {'stage':<16} {'metric':<9} {'baseline':>10} {'current':>10} {'change':>8}")
+    for dataset, stage, metric, old, new, regressed in rows:
+        change = f"{(new - old) / old:+.0%}" if old else 'n/a'
+        print(f"{dataset:<20} {stage:<16} {metric:<9} {old:>10.4g} {new:>10.4g} {change:>8}"
+              + ('  REGRESSION' if regressed else ''))
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%} tolerance.")
+        sys.exit(1)
+    print("\nNo regressions.")
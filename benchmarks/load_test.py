@@ -0,0 +1,132 @@
+import argparse
+import base64
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# --- Load test ---
+# Posts /predict payloads to a running server from N concurrent clients, each
+# sending its next request as soon as the previous one returns, for a fixed
+# duration per concurrency level. Reports throughput and p50/p99 latency.
+# By default every request posts the same snapshot, which after the first one
+# measures the response cache; --vary drops a different connection row from each
+# request so every prediction is computed (embeddings stay cached).
+#
+#   gunicorn -c serving/gunicorn.conf.py &        # or: python serving/serve.py
+#   python benchmarks/load_test.py --concurrency 1,4,16 --duration 30 --vary
+
+
+def encode_file(path):
+    with open(path, 'rb') as f:
+        return base64.b64encode(f.read()).decode('ascii')
+
+
+def make_payloads(employees_path, connections_path, count, vary):
+    """`count` JSON bodies; with `vary` each one omits a different connection row."""
+    employees = encode_file(employees_path)
+    if not vary:
+        body = json.dumps({'employees_csv_base64': employees,
+                           'connections_csv_base64': encode_file(connections_path)}).encode('utf-8')
+        return [body]
+    with open(connections_path, 'rb') as f:
+        header, *rows = f.read().splitlines(keepends=True)
+    payloads = []
+    for i in range(min(count, len(rows))):
+        connections = header + b''.join(rows[:i] + rows[i + 1:])
+        payloads.append(json.dumps({'employees_csv_base64': employees,
+                                    'connections_csv_base64': base64.b64encode(connections).decode('ascii')}).encode('utf-8'))
+    return payloads
+
+
+def post(url, body, timeout):
+    """Returns (latency seconds, HTTP status or None on a connection error)."""
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, ConnectionError, OSError):
+        status = None
+    return time.perf_counter() - start, status
+
+
+def run_level(url, payloads, concurrency, duration, timeout):
+    """Runs `concurrency` clients for `duration` seconds; returns the latency/throughput summary."""
+    latencies, statuses = [], []
+    lock = threading.Lock()
+    counter = iter(range(sys.maxsize))
+    deadline = time.perf_counter() + duration
+
+    def client():
+        while time.perf_counter() < deadline:
+            with lock:
+                body = payloads[next(counter) % len(payloads)]
+            latency, status = post(url, body, timeout)
+            with lock:
+                latencies.append(latency)
+                statuses.append(status)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    ok = np.array([latency for latency, status in zip(latencies, statuses) if status == 200])
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': sum(status != 200 for status in statuses),
+        'throughput_rps': round(len(ok) / elapsed, 2),
+        'p50_ms': round(float(np.percentile(ok, 50)) * 1000, 1) if len(ok) else None,
+        'p99_ms': round(float(np.percentile(ok, 99)) * 1000, 1) if len(ok) else None,
+        'mean_ms': round(float(ok.mean()) * 1000, 1) if len(ok) else None,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure /predict latency and throughput under concurrent load.')
+    parser.add_argument('--url', default='http://127.0.0.1:5001/predict')
+    parser.add_argument('--employees_path', default='data/employees.csv')
+    parser.add_argument('--connections_path', default='data/connections.csv')
+    parser.add_argument('--concurrency', default='1,4,16', help='Comma-separated numbers of concurrent clients')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds per concurrency level')
+    parser.add_argument('--timeout', type=float, default=300.0, help='Client-side timeout per request')
+    parser.add_argument('--vary', action='store_true',
+                        help='Make every request distinct so none is answered from the response cache')
+    parser.add_argument('--output_path', default=None, help='Optional JSON output file')
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.employees_path, args.connections_path, 10_000, args.vary)
+    # One warm-up request (also fails fast when nothing is listening)
+    _, status = post(args.url, payloads[0], args.timeout)
+    if status != 200:
+        print(f"Warm-up request to {args.url} failed (status {status}).")
+        sys.exit(1)
+
+    results = []
+    print(f"{'clients':>8} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+    for concurrency in [int(c) for c in args.concurrency.split(',')]:
+        row = run_level(args.url, payloads, concurrency, args.duration, args.timeout)
+        results.append(row)
+        print(f"{row['concurrency']:>8} {row['requests']:>9} {row['errors']:>7} {row['throughput_rps']:>8} "
+              f"{row['p50_ms'] if row['p50_ms'] is not None else '-':>9} "
+              f"{row['p99_ms'] if row['p99_ms'] is not None else '-':>9} "
+              f"{row['mean_ms'] if row['mean_ms'] is not None else '-':>9}")
+
+    if args.output_path:
+        with open(args.output_path, 'w') as f:
+            json.dump({'url': args.url, 'vary': args.vary, 'duration': args.duration, 'levels': results}, f, indent=2)
+        print(f"Results written to {args.output_path}")
@@ -0,0 +1,199 @@
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic_org import generate_org, write_org
+from scripts.assignment import assign_greedy, assign_arborescence
+from scripts.data_io import read_employees, read_connections
+from scripts.embedding_cache import EmbeddingCache
+from scripts.graph_arrays import CompactGraph
+from scripts.parallel_scoring import score_candidate_edges_parallel
+from scripts.scoring import ranked_candidate_pairs
+from scripts.solution import embed_profiles, get_seniority, get_scoring_weights, build_submission, MODEL_NAME
+
+# --- Stage-level pipeline benchmark ---
+# Runs the prediction pipeline one stage at a time on the bundled data or on
+# synthetic orgs, recording wall time, the traced allocation peak (--memory)
+# and the process RSS after every stage. Results are written as JSON that
+# benchmarks/compare.py checks against a stored baseline.
+
+STAGES = ['load', 'embed', 'seniority', 'graph_build', 'score', 'assign', 'csv_write', 'sunburst_render']
+
+
+class HashEmbedder:
+    """Offline stand-in for the sentence transformer: signed hashed bag of words."""
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def encode(self, texts, show_progress_bar=False):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in str(text).lower().split():
+                h = zlib.crc32(word.encode('utf-8'))
+                vectors[i, h % self.dim] += 1.0 if h & 1 << 31 else -1.0
+        return vectors
+
+
+def current_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource  # peak, not current, where /proc is unavailable
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+class StageRecorder:
+    """Context manager factory timing each stage and (optionally) tracing its allocation peak."""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        gc.collect()
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            result = {'seconds': round(elapsed, 4)}
+            if self.trace_memory:
+                result['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+                tracemalloc.stop()
+            result['rss_mb'] = round(current_rss_mb(), 1)
+            self.stages[name] = result
+            print(f"   {name:<16} {elapsed:9.3f}s  " + (f"peak {result['peak_mb']:.1f} MB  " if 'peak_mb' in result else '')
+                  + f"rss {result['rss_mb']:.0f} MB")
+
+
+def run_pipeline(employees_path, connections_path, ground_truth_path=None, embedder='model',
+                 embedding_cache_dir=None, workers=1, assignment='greedy', trace_memory=False,
+                 skip=(), output_dir=None):
+    """Runs every stage once and returns a result dict (stages, sizes, accuracy)."""
+    recorder = StageRecorder(trace_memory)
+    output_dir = output_dir or tempfile.mkdtemp(prefix='bench_')
+    model = HashEmbedder() if embedder == 'hash' else None
+    cache = EmbeddingCache(embedding_cache_dir, MODEL_NAME if embedder == 'model' else 'hash') if embedding_cache_dir else None
+
+    with recorder.stage('load'):
+        employees_df = read_employees(employees_path)
+        connections_df = read_connections(connections_path)
+    with recorder.stage('embed'):
+        with contextlib.redirect_stdout(None):
+            embeddings = embed_profiles(employees_df, model=model, embedding_cache=cache)
+    with recorder.stage('seniority'):
+        employees_df['seniority_score'] = employees_df['job_title_current'].apply(get_seniority)
+    with recorder.stage('graph_build'):
+        graph = CompactGraph.from_frames(employees_df, connections_df, embeddings)
+    with recorder.stage('score'):
+        src, dst, scores = score_candidate_edges_parallel(graph, get_scoring_weights(), workers)
+    with recorder.stage('assign'):
+        if assignment == 'arborescence':
+            managers = assign_arborescence(graph.number_of_nodes(), src, dst, scores)
+            assigned = np.flatnonzero(managers >= 0)
+            predictions = dict(zip(graph.node_ids[assigned].tolist(), graph.node_ids[managers[assigned]].tolist()))
+        else:
+            predictions = assign_greedy(ranked_candidate_pairs(graph, src, dst, scores), show_progress=False)
+    with recorder.stage('csv_write'):
+        submission_df = build_submission(employees_df, predictions)
+        submission_df.to_csv(os.path.join(output_dir, 'submission.csv'), index=False)
+    if 'sunburst_render' not in skip:
+        from dependencies.visualize_sunburst import SunburstTree, sunburst_page
+        # What /predict renders: the level-of-detail view, plotly.js linked rather than inlined
+        with recorder.stage('sunburst_render'):
+            tree = SunburstTree(employees_df, submission_df)
+            html = sunburst_page(tree.figure(), '/assets/plotly.min.js', '/hierarchy/__NODE__')
+        del tree, html
+
+    result = {
+        'employees': int(len(employees_df)),
+        'connections': int(len(connections_df)),
+        'candidate_pairs': int(len(scores)),
+        'stages': recorder.stages,
+        'total_seconds': round(sum(stage['seconds'] for stage in recorder.stages.values()), 4),
+    }
+    if ground_truth_path:
+        # Same definition as dependencies/evaluate.py: correct / rows in the ground truth file
+        gt_df = pd.read_csv(ground_truth_path)
+        merged = gt_df.merge(submission_df, on='employee_id', how='left', suffixes=('_true', '_pred'))
+        result['accuracy'] = round(float((merged['manager_id_true'] == merged['manager_id_pred']).mean()), 4)
+    return result
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time and memory-profile each pipeline stage.')
+    parser.add_argument('--synthetic', default='',
+                        help='Comma-separated synthetic org sizes to generate and run, e.g. 10000,100000')
+    parser.add_argument('--bundled', action='store_true', help='Also run on data/ (the default when --synthetic is empty)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--embedder', choices=['model', 'hash'], default='model',
+                        help="model: the sentence transformer; hash: offline hashed bag of words")
+    parser.add_argument('--embedding_cache_dir', default=None)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--assignment', choices=['greedy', 'arborescence'], default='greedy')
+    parser.add_argument('--memory', action='store_true', help='Trace allocation peaks per stage (slower)')
+    parser.add_argument('--skip_render', action='store_true', help='Skip the sunburst render stage')
+    parser.add_argument('--output_path', default='benchmarks/results/latest.json')
+    args = parser.parse_args()
+
+    datasets = []
+    if args.bundled or not args.synthetic:
+        datasets.append(('bundled', 'data/employees.csv', 'data/connections.csv', 'data/ground_truth_managers.csv'))
+    for size in [int(s) for s in args.synthetic.split(',') if s]:
+        org_dir = os.path.join(tempfile.gettempdir(), f'synthetic_org_{size}_{args.seed}')
+        if not os.path.exists(os.path.join(org_dir, 'employees.csv')):
+            write_org(org_dir, *generate_org(size, seed=args.seed))
+        datasets.append((f'synthetic-{size}', os.path.join(org_dir, 'employees.csv'),
+                         os.path.join(org_dir, 'connections.csv'), os.path.join(org_dir, 'ground_truth_managers.csv')))
+
+    runs = []
+    for name, employees_path, connections_path, ground_truth_path in datasets:
+        print(f"--- {name} ---")
+        result = run_pipeline(employees_path, connections_path, ground_truth_path, embedder=args.embedder,
+                              embedding_cache_dir=args.embedding_cache_dir, workers=args.workers,
+                              assignment=args.assignment, trace_memory=args.memory,
+                              skip=['sunburst_render'] if args.skip_render else [])
+        runs.append(dict(dataset=name, **result))
+        print(f"   total {result['total_seconds']:.3f}s" +
+              (f", accuracy {result['accuracy']:.2%}" if 'accuracy' in result else ''))
+
+    report = {
+        'environment': environment(),
+        'settings': {'embedder': args.embedder, 'workers': args.workers, 'assignment': args.assignment,
+                     'memory': args.memory, 'seed': args.seed},
+        'runs': runs,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output_path)), exist_ok=True)
+    with open(args.output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output_path}")
@@ -0,0 +1,182 @@
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# --- Synthetic organisation generator ---
+# Builds an org of any size in the same format as data/: employees.csv,
+# connections.csv and ground_truth_managers.csv. The hierarchy is a tree
+# (CEO -> VPs -> directors -> managers -> senior / mid / junior staff) with
+# realistic spans of control. Each VP owns one department, and titles and
+# summaries follow the bundled data's vocabulary. Social edges contain most
+# reporting lines plus teammates, skip-level links and random noise.
+
+DEPARTMENTS = {
+    'Engineering': ['Software Engineer', 'Software Developer', 'Platform Software Engineer', 'AI/ML Developer'],
+    'Product': ['Product Manager', 'Product Analyst', 'UX Designer'],
+    'Marketing': ['Brand Strategist', 'Content Strategist', 'Marketing Analyst'],
+    'Operations': ['Operations Analyst', 'Logistics Coordinator', 'Supply Chain Analyst'],
+    'Human Resources': ['HR Business Partner', 'Recruiter', 'HR Generalist'],
+    'Finance': ['Finance Analyst', 'Accountant', 'Financial Planner'],
+    'Sales': ['Account Executive', 'Sales Representative', 'Solutions Consultant'],
+}
+FOCUS_AREAS = ['Platform', 'Digital', 'Content', 'Compensation', 'Culture', 'Logistics',
+               'Braking Systems', 'Data', 'Growth', 'Infrastructure', 'Analytics', 'Security']
+LOCATIONS = ['Texas', 'California', 'Florida', 'New York', 'Washington', 'Illinois']
+LOCATION_WEIGHTS = [0.6, 0.15, 0.1, 0.08, 0.04, 0.03]
+UNIVERSITIES = ['Harvard', 'UCLA', 'Berkeley', 'Georgia Tech', 'Purdue', 'CMU', 'Stanford', 'MIT']
+FIRST_NAMES = ['Lisa', 'Marilyn', 'James', 'Maria', 'David', 'Priya', 'Wei', 'Carlos', 'Emma', 'Omar',
+               'Sofia', 'Noah', 'Aisha', 'Liam', 'Yuki', 'Grace']
+LAST_NAMES = ['Randall', 'Wang', 'Smith', 'Garcia', 'Patel', 'Chen', 'Johnson', 'Nguyen', 'Brown',
+              'Kim', 'Lopez', 'Hill', 'Okafor', 'Miller']
+
+# Share of the org at each level below the CEO, and the title patterns used there
+LEVELS = [
+    ('vp', 0.004, ['VP of {dept}', 'Vice President, {dept}']),
+    ('director', 0.02, ['Director of {dept}', 'Head of {dept} {focus}']),
+    ('manager', 0.09, ['{dept} Manager', '{role} Team Lead', 'Lead {role}']),
+    ('senior', 0.22, ['Senior {role}', 'Senior {role}, {focus} Focus', 'Principal {role}']),
+    ('mid', 0.33, ['{role}', '{role} II', '{role}, {focus} Focus']),
+    ('junior', 0.336, ['Junior {role}', 'Entry-Level {role}', 'Associate {role}', 'Aspiring {role} focused on {focus}']),
+]
+SUMMARIES = {
+    'vp': "Executive leading the {dept} organisation and its strategy across {focus} initiatives.",
+    'director': "Director responsible for {dept} programs, budgets and the managers delivering {focus} work.",
+    'manager': "People manager growing a {dept} team and delivering {focus} projects.",
+    'senior': "Experienced {role} mentoring peers and owning {focus} systems in {dept}.",
+    'mid': "{role} contributing to {focus} projects within the {dept} team.",
+    'junior': "Eager to build a career in {dept} as a {role}, with a focus on {focus}.",
+}
+
+
+def _pick(rng, options, size):
+    return np.asarray(options, dtype=object)[rng.integers(0, len(options), size)]
+
+
+def generate_hierarchy(num_employees, rng):
+    """Returns (manager index per row, level index per row, department per row); row 0 is the CEO."""
+    shares = np.array([share for _, share, _ in LEVELS])
+    bounds = np.round(np.cumsum(shares / shares.sum()) * (num_employees - 1)).astype(int)
+    bounds[0] = min(max(bounds[0], 1), num_employees - 1)  # at least one VP
+    counts = np.diff(np.concatenate([[0], np.maximum.accumulate(bounds)]))
+
+    managers = np.full(num_employees, -1, dtype=np.int64)
+    levels = np.zeros(num_employees, dtype=np.int64)
+    departments = np.empty(num_employees, dtype=object)
+    departments[0] = 'Executive'
+    dept_names = list(DEPARTMENTS)
+
+    previous = np.array([0])
+    start = 1
+    for level, count in enumerate(counts, start=1):
+        if count == 0:
+            continue
+        rows = np.arange(start, start + count)
+        levels[rows] = level
+        if level == 1:
+            managers[rows] = 0
+            departments[rows] = np.resize(dept_names, count)
+        else:
+            # Spans of control vary: some managers get many reports, some few
+            weights = rng.gamma(2.0, 1.0, len(previous))
+            managers[rows] = previous[rng.choice(len(previous), size=count, p=weights / weights.sum())]
+            departments[rows] = departments[managers[rows]]
+        previous, start = rows, start + count
+    return managers, levels, departments
+
+
+def generate_org(num_employees, seed=0, noise_edges_per_employee=1.0, missing_reporting_edges=0.05):
+    """Returns (employees_df, connections_df, ground_truth_df) for a synthetic org."""
+    rng = np.random.default_rng(seed)
+    managers, levels, departments = generate_hierarchy(num_employees, rng)
+    n = num_employees
+
+    # Titles and summaries from per-level templates
+    roles = np.empty(n, dtype=object)
+    for dept in pd.unique(departments):
+        rows = departments == dept
+        roles[rows] = _pick(rng, DEPARTMENTS.get(dept, ['Executive']), rows.sum())
+    focus = _pick(rng, FOCUS_AREAS, n)
+    titles = np.empty(n, dtype=object)
+    summaries = np.empty(n, dtype=object)
+    titles[0], summaries[0] = 'Chief Executive Officer', "I'm the CEO, focusing on setting the overall direction of the company."
+    for level, (name, _, patterns) in enumerate(LEVELS, start=1):
+        rows = np.flatnonzero(levels == level)
+        chosen = _pick(rng, patterns, len(rows))
+        titles[rows] = [p.format(dept=departments[r], role=roles[r], focus=focus[r]) for p, r in zip(chosen, rows)]
+        summaries[rows] = [SUMMARIES[name].format(dept=departments[r], role=roles[r], focus=focus[r]) for r in rows]
+
+    # Teams mostly sit with their manager
+    locations = np.asarray(LOCATIONS, dtype=object)[rng.choice(len(LOCATIONS), size=n, p=LOCATION_WEIGHTS)]
+    locations[0] = LOCATIONS[0]
+    for level in range(1, len(LEVELS) + 1):
+        rows = np.flatnonzero(levels == level)
+        stays = rng.random(len(rows)) < 0.8
+        locations[rows[stays]] = locations[managers[rows[stays]]]
+    locations[rng.random(n) < 0.02] = None
+
+    employee_ids = rng.permutation(np.arange(1, n + 1))
+    employees_df = pd.DataFrame({
+        'employee_id': employee_ids,
+        'name': _pick(rng, FIRST_NAMES, n) + ' ' + _pick(rng, LAST_NAMES, n),
+        'university': _pick(rng, UNIVERSITIES, n),
+        'location': locations,
+        'job_title_current': titles,
+        'profile_summary': summaries,
+    })
+
+    # Social edges: most reporting lines, teammates, skip-level links and random noise
+    reports = np.arange(1, n)
+    kept = reports[rng.random(len(reports)) >= missing_reporting_edges]
+    edge_parts = [np.column_stack([kept, managers[kept]])]
+    teammates = reports[rng.random(len(reports)) < 0.5]
+    if len(teammates):
+        order = np.lexsort((rng.random(len(teammates)), managers[teammates]))
+        team_sorted = teammates[order]
+        same_team = managers[team_sorted[1:]] == managers[team_sorted[:-1]]
+        edge_parts.append(np.column_stack([team_sorted[1:], team_sorted[:-1]])[same_team])
+    skip = reports[(managers[reports] > 0) & (rng.random(len(reports)) < 0.15)]
+    edge_parts.append(np.column_stack([skip, managers[managers[skip]]]))
+    num_noise = int(noise_edges_per_employee * n)
+    edge_parts.append(rng.integers(0, n, (num_noise, 2)))
+
+    edges = np.concatenate(edge_parts)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    edges = edges[rng.permutation(len(edges))]
+    connections_df = pd.DataFrame(employee_ids[edges].astype(np.int32), columns=['employee_id_a', 'employee_id_b'])
+
+    ground_truth_df = pd.DataFrame({'employee_id': employee_ids[reports],
+                                    'manager_id': employee_ids[managers[reports]]})
+
+    # Row order carries no hierarchy information
+    employees_df = employees_df.iloc[rng.permutation(n)].reset_index(drop=True)
+    ground_truth_df = ground_truth_df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+    return employees_df, connections_df, ground_truth_df
+
+
+def write_org(output_dir, employees_df, connections_df, ground_truth_df):
+    """Writes the three CSVs under output_dir and returns their paths."""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {name: os.path.join(output_dir, f'{name}.csv')
+             for name in ('employees', 'connections', 'ground_truth_managers')}
+    employees_df.to_csv(paths['employees'], index=False)
+    connections_df.to_csv(paths['connections'], index=False)
+    ground_truth_df.to_csv(paths['ground_truth_managers'], index=False)
+    return paths
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic org in the data/ CSV format.')
+    parser.add_argument('--employees', type=int, default=10000)
+    parser.add_argument('--output_dir', default=None, help='Defaults to benchmarks/data/org_<employees>')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--noise_edges', type=float, default=1.0, help='Random social edges per employee')
+    args = parser.parse_args()
+
+    output_dir = args.output_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', f'org_{args.employees}')
+    frames = generate_org(args.employees, seed=args.seed, noise_edges_per_employee=args.noise_edges)
+    paths = write_org(output_dir, *frames)
+    print(f"Wrote {args.employees} employees and {len(frames[1])} connections to {output_dir}")
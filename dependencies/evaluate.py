@@ -1,6 +1,25 @@
 import pandas as pd
 import sys
 
+def manager_accuracy(submission_df, ground_truth_df):
+    """
+    Returns (accuracy, correct predictions, non-CEO employees evaluated) for two
+    DataFrames with ['employee_id', 'manager_id'] columns. Accuracy is relative
+    to every row of the ground truth.
+    """
+    submission_df = submission_df.rename(columns={'manager_id': 'true_manager_id'})
+    ground_truth_df = ground_truth_df.rename(columns={'manager_id': 'predicted_manager_id'})
+
+    # 'inner' merge ensures we only evaluate employees present in both files.
+    results_df = pd.merge(submission_df, ground_truth_df, on='employee_id', how='inner')
+
+    # The CEO (manager_id = -1) does not have a manager, so we exclude them from the accuracy calculation.
+    evaluable_employees_df = results_df[results_df['true_manager_id'] != -1]
+    is_correct = evaluable_employees_df['predicted_manager_id'] == evaluable_employees_df['true_manager_id']
+
+    correct_predictions = int(is_correct.sum())
+    return correct_predictions / ground_truth_df.shape[0], correct_predictions, len(evaluable_employees_df)
+
 def evaluate_submission(submission_file: str, ground_truth_file: str):
     """
     Calculates the Manager Prediction Accuracy by comparing a submission file
@@ -42,37 +61,15 @@ def evaluate_submission(submission_file: str, ground_truth_file: str):
         print(f"\n[ERROR] Ground truth file is missing required columns. Expected: {required_truth_cols}")
         sys.exit(1)
 
-    submission_df = submission_df.rename(columns={'manager_id': 'true_manager_id'})
-    ground_truth_df = ground_truth_df.rename(columns={'manager_id': 'predicted_manager_id'})
-
-    # --- 3. Merge and Compare ---
+    # --- 3. Merge, Compare and Calculate Accuracy ---
     print("\nComparing submission against ground truth...")
-    
-    # Merge the two dataframes on the employee's ID
-    # 'inner' merge ensures we only evaluate employees present in both files.
-    results_df = pd.merge(submission_df, ground_truth_df, on='employee_id', how='inner')
-    
-    # --- 4. Filter for Evaluable Employees ---
-    # The CEO (manager_id = -1) does not have a manager, so we exclude them from the accuracy calculation.
-    evaluable_employees_df = results_df[results_df['true_manager_id'] != -1].copy()
-    
-    if len(evaluable_employees_df) == 0:
+    accuracy, correct_predictions, total_predictions = manager_accuracy(submission_df, ground_truth_df)
+
+    if total_predictions == 0:
         print("\n[WARNING] No non-CEO employees found to evaluate. Accuracy is 0%.")
         return
 
-    # --- 5. Calculate Accuracy ---
-    # Create a boolean column to mark correct predictions
-    evaluable_employees_df['is_correct'] = (
-        evaluable_employees_df['predicted_manager_id'] == evaluable_employees_df['true_manager_id']
-    )
-    
-    # Accuracy is the mean of the boolean (True=1, False=0) column
-    accuracy = evaluable_employees_df['is_correct'].sum()/ground_truth_df.shape[0]
-    
-    correct_predictions = evaluable_employees_df['is_correct'].sum()
-    total_predictions = len(evaluable_employees_df)
-
-    # --- 6. Print Report ---
+    # --- 4. Print Report ---
     print("\n--- Evaluation Results ---")
     print(f"Correctly Predicted Managers: {correct_predictions}")
     print(f"Total Employees Evaluated (non-CEO): {total_predictions}")
@@ -82,7 +79,7 @@ def evaluate_submission(submission_file: str, ground_truth_file: str):
     print(f"Manager Prediction Accuracy: {accuracy:.2%}")
     print("--------------------------------------")
 
-    # --- 7. Save Accuracy to File ---
+    # --- 5. Save Accuracy to File ---
     # This is for the CI/CD pipeline to read the accuracy value.
     with open("accuracy.txt", "w") as f:
         f.write(f"{accuracy:.2%}")
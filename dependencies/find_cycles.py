@@ -1,7 +1,100 @@
+import numpy as np
 import pandas as pd
-import networkx as nx
 import sys
 
+# --- Hierarchy checks by pointer doubling ---
+# A submission maps every employee to at most one manager, so the hierarchy is a
+# functional graph: following managers from any employee either reaches someone
+# without a manager or ends up circling a cycle. Each employee's manager is
+# turned into a row-index pointer. Pointer doubling (parent of parent, ...,
+# O(log N) vectorised rounds) then finds:
+#   - the employee reached after N steps, which lies on a cycle when the chain loops
+#   - the smallest row on each cycle, which labels the cycle
+#   - the number of hops from each employee to the top of its chain (or into its cycle)
+# That is O(N log N) work in NumPy with no per-employee Python code. Only the walk
+# that lists each cycle's members runs in Python, and cycles hold at most N
+# employees in total.
+
+def load_submission(submission_file):
+    """Reads the employee_id / manager_id columns of a submission as two int64 arrays (no manager = -1)."""
+    df = pd.read_csv(submission_file, usecols=['employee_id', 'manager_id'])
+    return df['employee_id'].to_numpy(dtype=np.int64), df['manager_id'].fillna(-1).to_numpy(dtype=np.int64)
+
+def manager_pointers(employee_ids, manager_ids):
+    """
+    Returns (parent, rows). `rows` are the submission rows used: the first one of
+    each employee. parent[i] is the position (in `rows`) of the manager of rows[i],
+    or -1 for a CEO (-1), unassigned (0) or unknown manager.
+    """
+    rows = np.flatnonzero(~pd.Index(employee_ids).duplicated())
+    managers = manager_ids[rows]
+    parent = pd.Index(employee_ids[rows]).get_indexer(managers).astype(np.int64)
+    parent[(managers == -1) | (managers == 0)] = -1
+    return parent, rows
+
+def analyze_hierarchy(employee_ids, manager_ids):
+    """
+    Finds every reporting cycle in O(N log N) array work. Returns a dict with
+      cycles:    employee-id lists, each in reporting order (a reports to b, ...)
+      feeding:   per cycle, the ids of employees whose chains lead into it
+      depth:     per employee row, hops up to the top of its chain (or into its cycle)
+      max_depth: the longest chain of reporting hops
+      duplicates: employee ids listed more than once (first row kept)
+    """
+    employee_ids = np.asarray(employee_ids, dtype=np.int64)
+    parent, rows = manager_pointers(employee_ids, np.asarray(manager_ids, dtype=np.int64))
+    ids = employee_ids[rows]
+    duplicates = np.unique(np.delete(employee_ids, rows))
+    n = len(parent)
+
+    # Row n is a sentinel above every chain top, so each pointer is a valid row
+    jump = np.append(np.where(parent >= 0, parent, n), n)
+    lowest = np.arange(n + 1)
+    rounds = max(1, int(n).bit_length())
+    for _ in range(rounds):
+        lowest = np.minimum(lowest, lowest[jump])
+        jump = jump[jump]
+    # After 2^rounds > n steps every chain has reached the sentinel or is circling its cycle
+    on_cycle = np.zeros(n + 1, dtype=bool)
+    on_cycle[jump] = True
+    on_cycle = on_cycle[:n]
+    # Around a cycle the running minimum covers the whole cycle: its smallest row labels it
+    cycle_label = np.where(jump[:n] < n, lowest[jump[:n]], -1)
+
+    # Hops to the first chain top or cycle member: those rows stop and count 0
+    stop = on_cycle | (parent < 0)
+    hop = np.append(np.where(stop, np.arange(n), parent), n)
+    steps = np.append((~stop).astype(np.int64), 0)
+    for _ in range(rounds):
+        steps = steps + steps[hop]
+        hop = hop[hop]
+    depth = steps[:n]
+
+    # Employees outside a cycle whose chain ends in one, grouped by cycle label
+    labels = np.unique(cycle_label[on_cycle])
+    feeders = np.flatnonzero(~on_cycle & (cycle_label >= 0))
+    feeders = feeders[np.argsort(cycle_label[feeders], kind='stable')]
+    groups = np.split(feeders, np.searchsorted(cycle_label[feeders], labels[1:])) if len(labels) else []
+
+    cycles = []
+    parent_list = parent.tolist()
+    for start in labels.tolist():
+        cycle = [start]
+        row = parent_list[start]
+        while row != start:
+            cycle.append(row)
+            row = parent_list[row]
+        cycles.append(ids[cycle].tolist())
+    feeding = [ids[group] for group in groups]
+
+    return {'cycles': cycles, 'feeding': feeding, 'depth': depth,
+            'max_depth': int(depth.max()) if n else 0, 'duplicates': duplicates}
+
+def analyze_submission(submission_df):
+    """analyze_hierarchy for a submission DataFrame (as written by solution.py)."""
+    return analyze_hierarchy(submission_df['employee_id'].to_numpy(dtype=np.int64),
+                             submission_df['manager_id'].fillna(-1).to_numpy(dtype=np.int64))
+
 def find_hierarchy_cycles(submission_file: str):
     """
     Loads a manager submission file and reports any circular reporting structures.
@@ -10,45 +103,35 @@ def find_hierarchy_cycles(submission_file: str):
 
     # --- 1. Load Data ---
     try:
-        df = pd.read_csv(submission_file)
+        employee_ids, manager_ids = load_submission(submission_file)
     except FileNotFoundError:
         print(f"\n[ERROR] File not found: {submission_file}")
         sys.exit(1)
 
-    # --- 2. Build a Directed Graph ---
-    # A directed graph is perfect because the manager relationship is one-way.
-    G = nx.DiGraph()
-    
-    print("Building a directed graph of the hierarchy...")
-    for _, row in df.iterrows():
-        employee_id = row['employee_id']
-        manager_id = row['manager_id']
-
-        # We only add an edge if there is a valid manager
-        # CEOs (-1) and unassigned managers (0 or NaN) don't create edges upward.
-        if pd.notna(manager_id) and manager_id not in [-1, 0]:
-            # The edge goes FROM the employee TO their manager
-            G.add_edge(employee_id, int(manager_id))
-
-    # --- 3. Find and Report Cycles ---
-    try:
-        # networkx has a built-in function to find all simple cycles
-        cycles = list(nx.simple_cycles(G))
-        
-        if not cycles:
-            print("\n[SUCCESS] No cycles were found in the hierarchy. It is a valid tree structure.")
-        else:
-            print(f"\n[WARNING] Found {len(cycles)} cycle(s) in the hierarchy:")
-            print("-------------------------------------------------")
-            for i, cycle in enumerate(cycles, 1):
-                # Format the cycle for readability, e.g., "123 -> 456 -> 123"
-                path = " -> ".join(map(str, cycle))
-                print(f"  Cycle {i}: {path} -> {cycle[0]}")
-            print("-------------------------------------------------")
-            print("These cycles must be broken for the hierarchy to be valid.")
-
-    except Exception as e:
-        print(f"\n[ERROR] An error occurred during cycle detection: {e}")
+    # --- 2. Find and Report Cycles ---
+    print(f"Following the reporting chains of {len(employee_ids)} employees...")
+    report = analyze_hierarchy(employee_ids, manager_ids)
+    if len(report['duplicates']):
+        print(f"\n[WARNING] {len(report['duplicates'])} employee(s) appear more than once; "
+              f"their first row is used (e.g. {report['duplicates'][:5].tolist()}).")
+
+    cycles = report['cycles']
+    if not cycles:
+        print("\n[SUCCESS] No cycles were found in the hierarchy. It is a valid tree structure.")
+    else:
+        print(f"\n[WARNING] Found {len(cycles)} cycle(s) in the hierarchy:")
+        print("-------------------------------------------------")
+        for i, (cycle, feeding) in enumerate(zip(cycles, report['feeding']), 1):
+            # Format the cycle for readability, e.g., "123 -> 456 -> 123"
+            path = " -> ".join(map(str, cycle))
+            print(f"  Cycle {i}: {path} -> {cycle[0]}")
+            if len(feeding):
+                shown = ", ".join(map(str, feeding[:10].tolist())) + (", ..." if len(feeding) > 10 else "")
+                print(f"    {len(feeding)} employee(s) report into it: {shown}")
+        print("-------------------------------------------------")
+        print("These cycles must be broken for the hierarchy to be valid.")
+    print(f"\nLongest reporting chain: {report['max_depth']} hop(s).")
+    return report
 
 if __name__ == "__main__":
     if len(sys.argv) != 2:
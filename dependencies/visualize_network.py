@@ -1,83 +1,125 @@
+import numpy as np
 import pandas as pd
-import networkx as nx
 import plotly.graph_objects as go
-import math # Needed for trigonometry
 import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.graph_arrays import CompactGraph
+
+# --- Array-based radial network rendering ---
+# Layout and traces are computed with NumPy over whole levels / edge lists:
+# the hierarchy is walked breadth-first one level at a time (no recursion, so
+# any depth works), and edges become NaN-separated coordinate arrays, which
+# Plotly draws as one polyline per trace. Large graphs are drawn with WebGL
+# (Scattergl) instead of SVG, and the general connections can be capped by
+# uniform sampling so the page stays usable in a browser.
+
+RING_SPACING = 10  # radius step per level of the hierarchy
+# renderer='auto' switches to WebGL above this many nodes + drawn edges
+WEBGL_MIN_ELEMENTS = 5_000
+# Default cap on drawn general connections (manager links are always drawn)
+DEFAULT_MAX_EDGES = 100_000
+
+
+def radial_layout_arrays(gt_df):
+    """
+    Places the hierarchy in gt_df (employee_id, manager_id; the CEO has -1) on
+    concentric rings: each manager's wedge is split evenly between its reports in
+    file order. Returns (employee_ids, x, y, level) for the employees reachable
+    from the CEO, or None when there is no CEO row.
+    """
+    ceo_rows = np.flatnonzero(gt_df['manager_id'].to_numpy() == -1)
+    if len(ceo_rows) == 0:
+        return None
+
+    employee_ids = gt_df['employee_id'].to_numpy()
+    manager_ids = gt_df['manager_id'].to_numpy()
+    nodes = pd.Index(pd.unique(np.concatenate([employee_ids, manager_ids])))
+    n = len(nodes)
+    ceo = nodes.get_loc(employee_ids[ceo_rows[0]])
+
+    # Reports of each manager as CSR, in file order (the CEO's own row is no report)
+    is_report = manager_ids != -1
+    child = nodes.get_indexer(employee_ids[is_report])
+    parent = nodes.get_indexer(manager_ids[is_report])
+    order = np.argsort(parent, kind='stable')
+    child, parent = child[order], parent[order]
+    counts = np.bincount(parent, minlength=n)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    level = np.full(n, -1, dtype=np.int64)
+    wedge_start = np.zeros(n)
+    wedge_width = np.zeros(n)
+    angle = np.zeros(n)
+    level[ceo], wedge_width[ceo] = 0, 2 * np.pi
+    frontier = np.array([ceo])
+    depth = 0
+    while len(frontier):
+        depth += 1
+        per_parent = counts[frontier]
+        owners = np.repeat(frontier, per_parent)
+        # Rank of each report among its manager's reports
+        rank = np.arange(len(owners)) - np.repeat(np.cumsum(per_parent) - per_parent, per_parent)
+        reports = child[np.repeat(starts[frontier], per_parent) + rank]
+        step = wedge_width[owners] / counts[owners]
+        # Someone already placed (a reporting cycle back up the tree) keeps its place
+        new = level[reports] < 0
+        reports, owners, rank, step = reports[new], owners[new], rank[new], step[new]
+        reports, first = np.unique(reports, return_index=True)
+        owners, rank, step = owners[first], rank[first], step[first]
+
+        level[reports] = depth
+        wedge_start[reports] = wedge_start[owners] + rank * step
+        wedge_width[reports] = step
+        angle[reports] = wedge_start[reports] + 0.5 * step
+        frontier = reports
+
+    placed = np.flatnonzero(level >= 0)
+    radius = level[placed] * RING_SPACING
+    return (nodes[placed].to_numpy(), radius * np.cos(angle[placed]), radius * np.sin(angle[placed]),
+            level[placed])
+
 
 def create_radial_layout(employees_df, gt_df):
     """
     Computes node positions for a radial/sunburst-like layout based on the org hierarchy.
-    
+
     Returns:
         A dictionary of positions {node_id: (x, y)}
     """
     print("Building organizational hierarchy for layout...")
-    
-    # Find the CEO (root of the hierarchy)
-    try:
-        ceo_id = gt_df[gt_df['manager_id'] == -1]['employee_id'].iloc[0]
-    except IndexError:
+    layout = radial_layout_arrays(gt_df)
+    if layout is None:
         print("ERROR: CEO not found in ground_truth_managers.csv. Cannot create layout.")
         return {}
+    ids, x, y, _ = layout
+    return dict(zip(ids.tolist(), zip(x.tolist(), y.tolist())))
+
+
+def segment_arrays(x0, y0, x1, y1):
+    """Coordinates of many line segments as NaN-separated arrays for a single lines trace."""
+    gap = np.full(len(x0), np.nan)
+    return np.column_stack([x0, x1, gap]).ravel(), np.column_stack([y0, y1, gap]).ravel()
+
 
-    # Create a map of managers to their direct reports for quick traversal
-    reports_map = gt_df[gt_df['manager_id'] != -1].groupby('manager_id')['employee_id'].apply(list).to_dict()
-
-    # --- Step 1: Determine the level of each employee using Breadth-First Search (BFS) ---
-    levels = {ceo_id: 0}
-    positions = {ceo_id: (0, 0)}
-    queue = [ceo_id]
-    
-    head = 0
-    while head < len(queue):
-        manager_id = queue[head]
-        head += 1
-        
-        for report_id in reports_map.get(manager_id, []):
-            if report_id not in levels:
-                levels[report_id] = levels[manager_id] + 1
-                queue.append(report_id)
-
-    # --- Step 2: Recursively calculate angular positions ---
-    def set_node_positions(manager_id, start_angle, end_angle):
-        """Assigns positions to reports within a given angular wedge."""
-        reports = reports_map.get(manager_id, [])
-        if not reports:
-            return
-
-        angle_step = (end_angle - start_angle) / len(reports)
-        
-        for i, report_id in enumerate(reports):
-            # Calculate the angle for this specific report
-            angle = start_angle + (i + 0.5) * angle_step
-            
-            # Radius is based on the employee's level in the org
-            level = levels.get(report_id, 0)
-            radius = level * 10  # The '10' is an arbitrary step size for visual spacing
-            
-            # Convert polar coordinates (radius, angle) to Cartesian (x, y)
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-            
-            positions[report_id] = (x, y)
-            
-            # Recurse to place this report's own team members
-            set_node_positions(report_id, start_angle + i * angle_step, start_angle + (i + 1) * angle_step)
-
-    # Start the recursive placement from the CEO, who owns the full circle (0 to 2*pi radians)
-    print("Calculating radial positions for all nodes...")
-    set_node_positions(ceo_id, 0, 2 * math.pi)
-    
-    return positions
-
-
-def visualize_employee_network_radial(employees_file, connections_file, submission_file, output_html_file):
+def sample_edges(src, dst, max_edges, seed=0):
+    """At most `max_edges` of the edges, drawn uniformly without replacement (order kept)."""
+    if max_edges is None or len(src) <= max_edges:
+        return src, dst
+    keep = np.sort(np.random.default_rng(seed).choice(len(src), size=max_edges, replace=False))
+    return src[keep], dst[keep]
+
+
+def visualize_employee_network_radial(employees_file, connections_file, submission_file, output_html_file,
+                                      renderer='auto', max_edges=DEFAULT_MAX_EDGES):
     """
     Creates an interactive Plotly visualization of the employee network
     with a custom radial layout based on the organizational hierarchy.
     """
     print("--- Starting Radial Network Visualization ---")
-    
+
     # --- 1. Load Data ---
     try:
         print("Loading data files...")
@@ -90,85 +132,96 @@ def visualize_employee_network_radial(employees_file, connections_file, submissi
 
     # --- 2. Build the FULL Graph to get all nodes and edges ---
     print("Building full network graph from connections data...")
-    G = nx.from_pandas_edgelist(connections_df, 'employee_id_a', 'employee_id_b')
+    # Employees without connections are nodes too; names and titles come from the attribute columns
+    G = CompactGraph.from_frames(employees_df, connections_df)
+    visualize_graph_radial(G, gt_df, output_html_file, renderer=renderer, max_edges=max_edges)
+
+
+def visualize_graph_radial(G, gt_df, output_html_file, renderer='auto', max_edges=DEFAULT_MAX_EDGES):
+    """
+    Renders an already-built CompactGraph (e.g. the one returned by
+    build_graph_with_features) with the radial hierarchy layout from gt_df.
+    """
+    fig = create_network_figure(G, gt_df, renderer=renderer, max_edges=max_edges)
+
+    print(f"Generating and saving the interactive plot to '{output_html_file}'...")
+    fig.write_html(output_html_file)
+    print("\n--- Visualization Complete! ---")
+    print(f"'{output_html_file}' has been created.")
+
 
-    # Add any employees who might not have connections but are in the employee list
-    for emp_id in employees_df['employee_id']:
-        if emp_id not in G:
-            G.add_node(emp_id)
+def network_figure_from_frames(employees_df, connections_df, gt_df, renderer='auto', max_edges=DEFAULT_MAX_EDGES):
+    """Builds the radial network figure straight from in-memory DataFrames."""
+    return create_network_figure(CompactGraph.from_frames(employees_df, connections_df), gt_df,
+                                 renderer=renderer, max_edges=max_edges)
 
-    # Add node attributes from the employees dataframe
-    for _, row in employees_df.iterrows():
-        node = row['employee_id']
-        if node in G:
-            G.nodes[node]['name'] = row['name']
-            G.nodes[node]['title'] = row['job_title_current']
-            G.nodes[node]['summary'] = row['profile_summary']
 
+def create_network_figure(G, gt_df, renderer='auto', max_edges=DEFAULT_MAX_EDGES):
+    """
+    Builds the radial network figure for a CompactGraph without writing any files.
+    `renderer` is 'svg', 'webgl' or 'auto' (WebGL for large graphs); at most
+    `max_edges` general connections are drawn, sampled uniformly (None = all).
+    """
     # --- 3. Generate the Custom Radial Layout ---
-    pos = create_radial_layout(employees_df, gt_df)
-    
-    # Handle nodes that might be in the graph but not the hierarchy (orphans)
-    # Place them in a default location to avoid errors
-    for node in G.nodes():
-        if node not in pos:
-            pos[node] = (0,0) # Place orphans at the center
-
-    # --- 4. Create Plotly Traces (same as before, but using the new 'pos') ---
+    print("Building organizational hierarchy for layout...")
+    layout = radial_layout_arrays(gt_df)
+    if layout is None:
+        print("ERROR: CEO not found in ground_truth_managers.csv. Cannot create layout.")
+        layout = (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), np.empty(0, dtype=np.int64))
+    layout_ids, layout_x, layout_y, _ = layout
+
+    # Positions for every graph node plus hierarchy-only ids; nodes outside the hierarchy sit at the centre
+    all_ids = pd.Index(pd.unique(np.concatenate([G.node_ids, layout_ids])))
+    pos_x, pos_y = np.zeros(len(all_ids)), np.zeros(len(all_ids))
+    placed = all_ids.get_indexer(layout_ids)
+    pos_x[placed], pos_y[placed] = layout_x, layout_y
+    node_pos = all_ids.get_indexer(G.node_ids)
+
+    # --- 4. Create Plotly Traces ---
     print("Creating Plotly traces for the graph...")
-    
-    # Trace for ALL connections (gray lines)
-    edge_x, edge_y = [], []
-    for edge in G.edges():
-        # Ensure both nodes in the edge have a position
-        if edge[0] in pos and edge[1] in pos:
-            x0, y0 = pos[edge[0]]
-            x1, y1 = pos[edge[1]]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
-
-    edge_trace = go.Scatter(
+    src, dst = G.edge_index_pairs()
+    total_edges = len(src)
+    src, dst = sample_edges(src, dst, max_edges)
+    a, b = node_pos[src], node_pos[dst]
+    edge_x, edge_y = segment_arrays(pos_x[a], pos_y[a], pos_x[b], pos_y[b])
+
+    # Manager links between two positioned ids
+    employees = all_ids.get_indexer(gt_df['employee_id'].to_numpy())
+    managers = all_ids.get_indexer(gt_df['manager_id'].to_numpy())
+    linked = (gt_df['manager_id'].to_numpy() != -1) & (employees >= 0) & (managers >= 0)
+    e, m = employees[linked], managers[linked]
+    gt_edge_x, gt_edge_y = segment_arrays(pos_x[e], pos_y[e], pos_x[m], pos_y[m])
+
+    if renderer == 'auto':
+        renderer = 'webgl' if G.number_of_nodes() + len(src) >= WEBGL_MIN_ELEMENTS else 'svg'
+    if renderer not in ('svg', 'webgl'):
+        raise ValueError(f"Unknown renderer '{renderer}'. Expected 'svg', 'webgl' or 'auto'")
+    trace_type = go.Scattergl if renderer == 'webgl' else go.Scatter
+
+    edge_name = 'General Connection' if len(src) == total_edges else \
+        f'General Connection ({len(src):,} of {total_edges:,} sampled)'
+    edge_trace = trace_type(
         x=edge_x, y=edge_y,
         line=dict(width=0.5, color='#888'),
         hoverinfo='none',
         mode='lines',
-        name='General Connection')
-
-    # Trace for ground truth manager connections (red lines)
-    gt_edge_x, gt_edge_y = [], []
-    for _, row in gt_df.iterrows():
-        emp = row['employee_id']
-        mgr = row['manager_id']
-        if mgr != -1 and emp in pos and mgr in pos:
-            x0, y0 = pos[emp]
-            x1, y1 = pos[mgr]
-            gt_edge_x.extend([x0, x1, None])
-            gt_edge_y.extend([y0, y1, None])
-
-    gt_edge_trace = go.Scatter(
+        name=edge_name)
+
+    gt_edge_trace = trace_type(
         x=gt_edge_x, y=gt_edge_y,
-        line=dict(width=2, color='red'), # Make manager lines stand out
+        line=dict(width=2, color='red'),  # Make manager lines stand out
         hoverinfo='none',
         mode='lines',
         name='True Manager Link')
 
-    # Trace for employee nodes
-    node_x, node_y = [], []
-    node_text = []
-    node_colors = []
-    for node in G.nodes():
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
-        node_info = f"<b>{G.nodes[node].get('name', '')}</b><br>ID: {node}<br>Title: {G.nodes[node].get('title', 'N/A')}"
-        node_text.append(node_info)
-        # Color nodes by their organizational level
-        level = pos.get(node, (0,0)) # Use position to infer level for color
-        color_val = math.sqrt(level[0]**2 + level[1]**2) # Distance from center
-        node_colors.append(color_val)
-
-    # --- CORRECTED SECTION ---
-    node_trace = go.Scatter(
+    # Trace for employee nodes, coloured by distance from the centre (organizational level)
+    node_x, node_y = pos_x[node_pos], pos_y[node_pos]
+    node_text = ("<b>" + pd.Series(G.attribute('name', default='')).astype(str) + "</b><br>ID: "
+                 + pd.Series(G.node_ids).astype(str) + "<br>Title: "
+                 + pd.Series(G.attribute('job_title_current', default='N/A')).astype(str)).to_numpy()
+    node_colors = np.hypot(node_x, node_y)
+
+    node_trace = trace_type(
         x=node_x, y=node_y,
         mode='markers',
         hoverinfo='text',
@@ -182,17 +235,14 @@ def visualize_employee_network_radial(employees_file, connections_file, submissi
             colorbar=dict(
                 thickness=15,
                 xanchor='left',
-                # This is the corrected part. 'title' is a dict, not a string.
                 title=dict(
                     text='Seniority<br>(Distance from Center)',
                     side='right'
                 )
             ),
             line_width=1))
-    # --- END OF CORRECTION ---
 
-    # --- 5. Create and Save the Figure ---
-    print(f"Generating and saving the interactive plot to '{output_html_file}'...")
+    # --- 5. Create the Figure ---
     fig = go.Figure(data=[edge_trace, gt_edge_trace, node_trace],
                  layout=go.Layout(
                     title='<br>Employee Network with Hierarchical Radial Layout',
@@ -203,10 +253,7 @@ def visualize_employee_network_radial(employees_file, connections_file, submissi
                     yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
                     legend=dict(x=0, y=1))
                     )
-    
-    fig.write_html(output_html_file)
-    print("\n--- Visualization Complete! ---")
-    print(f"'{output_html_file}' has been created.")
+    return fig
 
 
 if __name__ == '__main__':
@@ -215,11 +262,17 @@ if __name__ == '__main__':
     parser.add_argument('--connections_path', default='data/connections.csv')
     parser.add_argument('--submission_path', default='submission.csv')
     parser.add_argument('--output_path', default='employee_network_radial.html')
+    parser.add_argument('--renderer', choices=['auto', 'svg', 'webgl'], default='auto',
+                        help="WebGL (Scattergl) draws large graphs far faster than SVG; auto picks by size")
+    parser.add_argument('--max_edges', type=int, default=DEFAULT_MAX_EDGES,
+                        help="Draw at most this many general connections, sampled uniformly (0 hides them, -1 draws all)")
     args = parser.parse_args()
 
     visualize_employee_network_radial(
         employees_file=args.employees_path,
         connections_file=args.connections_path,
         submission_file=args.submission_path,
-        output_html_file=args.output_path
+        output_html_file=args.output_path,
+        renderer=args.renderer,
+        max_edges=None if args.max_edges < 0 else args.max_edges,
     )
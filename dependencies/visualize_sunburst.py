@@ -1,8 +1,204 @@
+import json
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import argparse
 
-def visualize_sunburst_hierarchy(employees_file, submission_file, output_html_file):
+# --- Level-of-detail sunburst ---
+# The hierarchy is compiled once into arrays: a parent row per employee, the
+# reports of each manager as CSR (file order) and the head count of every
+# subtree. A view starts at one employee (or at the CEO) and takes whole levels
+# of reports while they fit in `max_nodes` wedges, up to `max_depth` levels.
+# When a level does not fit, each manager keeps its largest teams and the rest
+# are merged into one "+N more" wedge per manager. Wedges are sized by head
+# count (branchvalues='total'), so a collapsed team keeps its true width. The
+# figure therefore holds at most `max_nodes` wedges however large the org is;
+# deeper levels are fetched on demand (serving/serve.py: /hierarchy/<node_id>).
+
+DEFAULT_MAX_DEPTH = 3
+DEFAULT_MAX_NODES = 2_000
+
+HOVER_TEMPLATE = ('<b>%{label}</b><br>Title: %{customdata[0]}<br>ID: %{id}'
+                  '<br>Reports (all levels): %{customdata[1]}<extra></extra>')
+
+# Client-side drill-down for pages served by serving/serve.py. customdata[2] is
+# the node to load on click: the wedge itself when its reports are not in the
+# figure, the manager for a "+N more" wedge or for the centre of the view.
+# Wedges whose reports are loaded fall through to Plotly's own zoom.
+DRILLDOWN_SCRIPT = """
+var plot = document.getElementById('{plot_id}');
+var hierarchyUrl = __HIERARCHY_URL__;
+plot.on('plotly_sunburstclick', function (event) {
+    var target = event.points[0].customdata[2];
+    if (!target) { return true; }
+    fetch(hierarchyUrl.replace('__NODE__', encodeURIComponent(target)))
+        .then(function (response) {
+            if (!response.ok) { throw new Error('HTTP ' + response.status); }
+            return response.json();
+        })
+        .then(function (fig) { Plotly.react(plot, fig.data, fig.layout); })
+        .catch(function (error) { console.error('Drill-down failed:', error); });
+    return false;
+});
+"""
+
+
+class SunburstTree:
+    """
+    The hierarchy of a submission (employee_id -> manager_id, CEO = -1) as arrays.
+    Employees whose manager is unassigned (0) or unknown, or who sit on a
+    reporting cycle, are not reachable from the CEO and are left out, as Plotly
+    drops wedges without a valid parent.
+    """
+
+    def __init__(self, employees_df, gt_df):
+        # Merge the data to have all information in one place
+        df = pd.merge(employees_df, gt_df, on='employee_id')
+        df = df.loc[~df['employee_id'].duplicated()]
+        self.ids = df['employee_id'].to_numpy(dtype=np.int64)
+        self.labels = df['name'].to_numpy(dtype=object)
+        self.titles = df['job_title_current'].to_numpy(dtype=object)
+        managers = df['manager_id'].fillna(0).to_numpy(dtype=np.int64)
+        self.index = pd.Index(self.ids)
+        n = len(self.ids)
+
+        self.parent = self.index.get_indexer(managers).astype(np.int64)
+        self.roots = np.flatnonzero(managers == -1)
+        # 0 marks an unassigned employee even when some employee has id 0
+        self.parent[(managers == -1) | (managers == 0)] = -1
+
+        # Reports of each manager as CSR, in file order
+        child = np.flatnonzero(self.parent >= 0)
+        order = np.argsort(self.parent[child], kind='stable')
+        self.children = child[order]
+        self.child_count = np.bincount(self.parent[child], minlength=n)
+        self.child_start = np.concatenate([[0], np.cumsum(self.child_count)[:-1]]).astype(np.int64)
+
+        # Levels reachable from the CEO, then head counts summed bottom-up one level at a time
+        self.depth = np.full(n, -1, dtype=np.int64)
+        levels, frontier = [], self.roots
+        while len(frontier):
+            self.depth[frontier] = len(levels)
+            levels.append(frontier)
+            frontier = self.reports_of(frontier)[0]
+        self.size = np.ones(n, dtype=np.int64)
+        for level in reversed(levels[1:]):
+            np.add.at(self.size, self.parent[level], self.size[level])
+
+    def reports_of(self, rows):
+        """(reports, their manager rows) of all `rows`, grouped by manager in `rows` order."""
+        counts = self.child_count[rows]
+        owners = np.repeat(rows, counts)
+        offsets = np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self.children[np.repeat(self.child_start[rows], counts) + offsets], owners
+
+    def row_of(self, employee_id):
+        """Row of an employee reachable from the CEO; KeyError otherwise."""
+        rows = self.index.get_indexer([employee_id])
+        if rows[0] < 0 or self.depth[rows[0]] < 0:
+            raise KeyError(employee_id)
+        return int(rows[0])
+
+    def view(self, employee_id=None, max_depth=DEFAULT_MAX_DEPTH, max_nodes=DEFAULT_MAX_NODES):
+        """
+        The wedges of the view rooted at `employee_id` (default: the CEO) as a dict
+        of Sunburst trace columns. None for max_depth / max_nodes means no limit.
+        """
+        top = self.roots if employee_id is None else np.array([self.row_of(employee_id)])
+        budget = np.inf if max_nodes is None else max_nodes - len(top)
+        rows, others = [top], []
+        frontier, depth = top, 0
+        while len(frontier) and (max_depth is None or depth < max_depth):
+            reports, owners = self.reports_of(frontier)
+            if not len(reports):
+                break
+            if len(reports) <= budget:
+                budget -= len(reports)
+                rows.append(reports)
+                frontier, depth = reports, depth + 1
+                continue
+            # Every manager with hidden reports gets one "+N more" wedge; the largest teams fill the rest
+            keep_count = int(budget) - len(np.unique(owners))
+            if keep_count > 0:
+                keep = np.zeros(len(reports), dtype=bool)
+                keep[np.argpartition(-self.size[reports], keep_count - 1)[:keep_count]] = True
+                others.append((reports[~keep], owners[~keep]))
+                rows.append(reports[keep])
+            break
+
+        rows = np.concatenate(rows)
+        shown = np.zeros(len(self.ids), dtype=bool)
+        shown[rows] = True
+        ids = self.ids[rows]
+        parent = self.parent[rows]
+        is_top = np.zeros(len(rows), dtype=bool)
+        is_top[:len(top)] = True
+
+        # Drill-down target: the wedge itself when none of its reports are shown,
+        # its manager for the centre of a subtree view, nothing otherwise
+        has_reports = self.child_count[rows] > 0
+        collapsed = has_reports.copy()
+        collapsed[has_reports] = ~shown[self.children[self.child_start[rows[has_reports]]]]
+        target = np.where(collapsed, ids.astype(str), '')
+        up = is_top & (parent >= 0)
+        target[up] = self.ids[parent[up]].astype(str)
+
+        columns = {
+            'ids': ids.astype(str),
+            'labels': self.labels[rows],
+            'parents': np.where(is_top, '', self.ids[np.maximum(parent, 0)].astype(str)),
+            'values': self.size[rows],
+            'titles': self.titles[rows],
+            'reports': self.size[rows] - 1,
+            'targets': target,
+        }
+        if others:
+            hidden = np.concatenate([h for h, _ in others])
+            owners = np.concatenate([o for _, o in others])
+            managers, inverse = np.unique(owners, return_inverse=True)
+            count = np.bincount(inverse)
+            value = np.bincount(inverse, weights=self.size[hidden]).astype(np.int64)
+            manager_ids = self.ids[managers].astype(str)
+            extra = {
+                'ids': np.char.add(manager_ids, '/more'),
+                'labels': np.char.add(np.char.add('+', count.astype(str)), ' more'),
+                'parents': manager_ids,
+                'values': value,
+                'titles': np.char.add(count.astype(str), ' teams not shown'),
+                'reports': value,
+                'targets': manager_ids,
+            }
+            columns = {name: np.concatenate([columns[name].astype(object), extra[name].astype(object)])
+                       for name in columns}
+        return columns
+
+    def figure(self, employee_id=None, max_depth=DEFAULT_MAX_DEPTH, max_nodes=DEFAULT_MAX_NODES):
+        """The Sunburst figure of view(employee_id, max_depth, max_nodes)."""
+        columns = self.view(employee_id, max_depth, max_nodes)
+        fig = go.Figure(go.Sunburst(
+            ids=columns['ids'],
+            labels=columns['labels'],
+            parents=columns['parents'],
+            values=columns['values'],
+            branchvalues='total',
+            hovertemplate=HOVER_TEMPLATE,
+            customdata=np.column_stack([columns['titles'], columns['reports'], columns['targets']]),
+            insidetextorientation='radial'
+        ))
+
+        fig.update_layout(
+            margin=dict(t=50, l=25, r=25, b=25),
+            title=dict(
+                text='Interactive Employee Organizational Chart',
+                font=dict(size=20),
+                x=0.5
+            )
+        )
+        return fig
+
+
+def visualize_sunburst_hierarchy(employees_file, submission_file, output_html_file,
+                                 max_depth=None, max_nodes=None, output_format='html'):
     """
     Creates an interactive sunburst chart to visualize the employee hierarchy.
     """
@@ -18,60 +214,61 @@ def visualize_sunburst_hierarchy(employees_file, submission_file, output_html_fi
         print(f"Error: {e}. Please ensure all required CSV files are present.")
         return
 
+    fig = create_sunburst_figure(employees_df, gt_df, max_depth=max_depth, max_nodes=max_nodes)
+
+    print(f"Generating and saving the interactive plot to '{output_html_file}'...")
+    if output_format == 'json':
+        fig.write_json(output_html_file)
+    else:
+        fig.write_html(output_html_file)
+    print("\n--- Visualization Complete! ---")
+
+
+def create_sunburst_figure(employees_df, gt_df, max_depth=None, max_nodes=None):
+    """
+    Builds the sunburst figure from in-memory DataFrames (employees and an
+    employee_id -> manager_id submission), without touching the file system.
+    By default every employee is drawn; max_depth / max_nodes give the
+    level-of-detail view of the top of the org.
+    """
     # --- 2. Prepare Data for Sunburst ---
     print("Preparing data for the sunburst chart...")
-    
-    # Merge the data to have all information in one place
-    df = pd.merge(employees_df, gt_df, on='employee_id')
-
-    # The sunburst trace requires specific data fields: ids, labels, and parents.
-    
-    # The 'ids' are the unique identifiers for each employee
-    ids = df['employee_id']
-    
-    # The 'labels' are the names that will be displayed on the chart
-    labels = df['name']
-    
-    # The 'parents' are the IDs of the managers.
-    # The CEO's manager_id is -1, which we'll convert to an empty string for the root of the chart.
-    parents = df['manager_id'].apply(lambda x: '' if x == -1 else x)
-    
-    # We can also add custom data to show on hover
-    hover_text = df['job_title_current']
-
-    # --- 3. Create and Save the Figure ---
-    print(f"Generating and saving the interactive plot to '{output_html_file}'...")
-    
-    fig = go.Figure(go.Sunburst(
-        ids=ids,
-        labels=labels,
-        parents=parents,
-        hovertemplate='<b>%{label}</b><br>Title: %{customdata}<br>ID: %{id}<extra></extra>',
-        customdata=hover_text,
-        insidetextorientation='radial'
-    ))
-
-    fig.update_layout(
-        margin=dict(t=50, l=25, r=25, b=25),
-        title=dict(
-            text='Interactive Employee Organizational Chart',
-            font=dict(size=20),
-            x=0.5
-        )
-    )
+    return SunburstTree(employees_df, gt_df).figure(max_depth=max_depth, max_nodes=max_nodes)
+
+
+def sunburst_html(employees_df, gt_df):
+    """Returns the standalone sunburst HTML page as a string."""
+    return create_sunburst_figure(employees_df, gt_df).to_html()
+
+
+def sunburst_page(fig, plotly_js_url, hierarchy_url=None):
+    """
+    HTML page for `fig` that loads plotly.js from `plotly_js_url` instead of
+    inlining it. With `hierarchy_url` (containing __NODE__), clicks on collapsed
+    wedges fetch the deeper levels from it as JSON figures.
+    """
+    post_script = DRILLDOWN_SCRIPT.replace('__HIERARCHY_URL__', json.dumps(hierarchy_url)) if hierarchy_url else None
+    return fig.to_html(include_plotlyjs=plotly_js_url, post_script=post_script)
 
-    fig.write_html(output_html_file)
-    print("\n--- Visualization Complete! ---")
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('--employees_path', default='data/employees.csv')
     parser.add_argument('--submission_path', default='submission.csv')
     parser.add_argument('--output_path', default='employee_sunburst.html')
+    parser.add_argument('--max_depth', type=int, default=None,
+                        help="Draw only this many levels below the CEO (default: all)")
+    parser.add_argument('--max_nodes', type=int, default=None,
+                        help="Draw at most this many wedges, merging the smallest teams (default: all)")
+    parser.add_argument('--format', choices=['html', 'json'], default='html',
+                        help="Standalone HTML page or the Plotly figure as JSON")
     args = parser.parse_args()
 
     visualize_sunburst_hierarchy(
         employees_file=args.employees_path,
         submission_file=args.submission_path,
-        output_html_file=args.output_path
-    )
\ No newline at end of file
+        output_html_file=args.output_path,
+        max_depth=args.max_depth,
+        max_nodes=args.max_nodes,
+        output_format=args.format
+    )
@@ -10,6 +10,19 @@ info() {
     echo "INFO: $1"
 }
 
+# Polls the readiness endpoint until the model is loaded (or gives up after $1 seconds)
+wait_until_ready() {
+    local timeout=$1
+    for _ in $(seq "$timeout"); do
+        if curl -sf http://localhost:5001/ready >/dev/null; then
+            return 0
+        fi
+        sleep 1
+    done
+    echo "Server did not become ready within ${timeout} seconds" >&2
+    return 1
+}
+
 # --- Task 1: Performance Check for solution.py ---
 info "--- Task 1: Performance Check (scripts/solution.py) ---"
 info "Running the solution script and measuring execution time..."
@@ -24,8 +37,8 @@ info "Starting the Flask server in the background..."
 python3 serving/serve.py &
 SERVER_PID=$!
 
-info "Waiting for the server to start (60 seconds)..."
-sleep 60 # will be adjusted if your app cannot be ready to serve in 60 seconds.
+info "Waiting for the server to report ready (up to 120 seconds)..."
+time wait_until_ready 120
 
 info "Measuring response time using './tests/send_request.sh'..."
 time ./tests/send_request.sh
@@ -51,8 +64,8 @@ docker rm reporting-line-prediction-service &>/dev/null || true
 info "Running the Docker container in the background..."
 docker run -d -p 5001:5001 --name reporting-line-prediction-service reporting-line-prediction-service-image
 
-info "Waiting for the container to start (10 seconds)..."
-sleep 10
+info "Waiting for the container to report ready (up to 120 seconds)..."
+wait_until_ready 120
 
 info "Sending a test request to the containerized service..."
 ./tests/send_request.sh
@@ -0,0 +1,192 @@
+import numpy as np
+
+from scripts.scoring import TOP_SENIORITY
+
+# --- Approximate nearest neighbours over profile embeddings ---
+# Graph candidates only cover an employee's connections, so employees with
+# sparse or missing connections may have no plausible manager at all. This
+# in-process inverted-file (IVF) index proposes embedding-similar candidates
+# for them without comparing everyone with everyone:
+#   - spherical k-means (on a sample) splits the unit-length embedding rows
+#     into `nlist` clusters, and every row is filed under its nearest centroid
+#   - a query scores the centroids, then only the rows of its `nprobe` best
+#     clusters: about N * nprobe / nlist dot products instead of N
+# Batches are searched list by list: all queries probing a list are scored
+# against its rows in one matrix product, and each query's best k so far are
+# kept in a (queries x k) buffer. Rows can carry a rank (seniority) so that a
+# query only returns rows ranked strictly above it. Each rank is clustered
+# separately: a filter on "more senior" would otherwise waste most probes on
+# the query's own peers, which are its nearest neighbours but never match.
+
+DEFAULT_NPROBE = 8
+KMEANS_ITERATIONS = 10
+# Training rows per cluster for k-means (a sample is enough to place centroids)
+KMEANS_SAMPLE_PER_LIST = 64
+# Rows / queries per block in dense matrix products
+BLOCK_SIZE = 8192
+
+# Candidates proposed per employee lacking graph candidates, when enabled
+DEFAULT_SIMILAR_K = 5
+
+
+def default_nlist(num_rows):
+    """About sqrt(N) clusters, which balances centroid scoring against list scanning."""
+    return max(1, min(num_rows, int(round(np.sqrt(num_rows)))))
+
+
+def _top_k(scores, rows, k):
+    """Best k (score, row) per line of two (queries x m) arrays, best first; missing = (-inf, -1)."""
+    if scores.shape[1] > k:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores, rows = np.take_along_axis(scores, part, 1), np.take_along_axis(rows, part, 1)
+    order = np.argsort(-scores, axis=1, kind='stable')
+    scores, rows = np.take_along_axis(scores, order, 1), np.take_along_axis(rows, order, 1)
+    if scores.shape[1] < k:
+        pad = k - scores.shape[1]
+        scores = np.pad(scores, ((0, 0), (0, pad)), constant_values=-np.inf)
+        rows = np.pad(rows, ((0, 0), (0, pad)), constant_values=-1)
+    rows = np.where(np.isneginf(scores), -1, rows)
+    return scores, rows
+
+
+def exact_search(vectors, queries, k, ranks=None, rank_above=None):
+    """
+    Brute-force reference: (rows, scores) of the k highest dot products per query,
+    restricted to rows with ranks > rank_above[i] when both are given.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    all_rows = np.arange(len(vectors))
+    best_scores = np.empty((len(queries), k), dtype=np.float32)
+    best_rows = np.empty((len(queries), k), dtype=np.int64)
+    for start in range(0, len(queries), BLOCK_SIZE):
+        block = slice(start, start + BLOCK_SIZE)
+        scores = queries[block] @ vectors.T
+        if ranks is not None:
+            scores[ranks[None, :] <= rank_above[block, None]] = -np.inf
+        rows = np.broadcast_to(all_rows, scores.shape)
+        best_scores[block], best_rows[block] = _top_k(scores, rows, k)
+    return best_rows, best_scores
+
+
+class IVFIndex:
+    """
+    Inverted-file index over unit-length rows (dot product = cosine similarity).
+    With `ranks`, each rank is clustered on its own, so every list holds one rank
+    and a rank-filtered search only probes lists that can match.
+    """
+
+    def __init__(self, vectors, ranks=None, nlist=None, seed=0, iterations=KMEANS_ITERATIONS):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n = len(vectors)
+        ranks = np.zeros(n, dtype=np.int64) if ranks is None else np.asarray(ranks)
+        rng = np.random.default_rng(seed)
+        total_lists = default_nlist(n) if nlist is None else max(1, min(nlist, n))
+
+        # Lists per rank in proportion to its rows; list numbers are global
+        groups = np.unique(ranks)
+        centroids, list_rank, lists = [], [], np.zeros(n, dtype=np.int64)
+        for rank in groups:
+            members = np.flatnonzero(ranks == rank)
+            group_lists = max(1, min(len(members), int(round(total_lists * len(members) / n))))
+            group_centroids = self._train(vectors[members], group_lists, rng, iterations)
+            lists[members] = len(list_rank) + np.concatenate(
+                [np.argmax(vectors[members[s:s + BLOCK_SIZE]] @ group_centroids.T, axis=1)
+                 for s in range(0, len(members), BLOCK_SIZE)])
+            centroids.append(group_centroids)
+            list_rank.extend([rank] * group_lists)
+        self.centroids = np.vstack(centroids) if centroids else np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        self.list_rank = np.asarray(list_rank)
+        self.nlist = len(self.centroids)
+
+        # Rows of one list are stored contiguously
+        self.row_ids = np.argsort(lists, kind='stable')
+        self.vectors = vectors[self.row_ids]
+        counts = np.bincount(lists, minlength=self.nlist)
+        self.list_start = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    @staticmethod
+    def _train(vectors, nlist, rng, iterations):
+        """Spherical k-means on a sample of the rows."""
+        sample_size = min(len(vectors), nlist * KMEANS_SAMPLE_PER_LIST)
+        sample = vectors[rng.choice(len(vectors), size=sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assigned = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assigned, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # An empty cluster keeps its previous centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+        return centroids.astype(np.float32)
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def search(self, queries, k, nprobe=DEFAULT_NPROBE, rank_above=None):
+        """
+        (rows, scores) of the approximate k best rows per query, best first, as
+        (queries x k) arrays padded with -1 / -inf. With `rank_above`, only rows
+        whose rank is strictly greater than rank_above[i] are returned for query i,
+        and the nprobe lists are chosen among the lists of those ranks.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        nq, nprobe = len(queries), min(nprobe, self.nlist)
+        best_scores = np.full((nq, k), -np.inf, dtype=np.float32)
+        best_rows = np.full((nq, k), -1, dtype=np.int64)
+        if not nq or not len(self):
+            return best_rows, best_scores
+
+        # The nprobe best eligible lists of every query, then the queries grouped by list
+        probes = []
+        for s in range(0, nq, BLOCK_SIZE):
+            centroid_scores = queries[s:s + BLOCK_SIZE] @ self.centroids.T
+            if rank_above is not None:
+                centroid_scores[self.list_rank[None, :] <= rank_above[s:s + BLOCK_SIZE, None]] = -np.inf
+            best = np.argpartition(-centroid_scores, nprobe - 1, axis=1)[:, :nprobe]
+            probes.append(np.where(np.isneginf(np.take_along_axis(centroid_scores, best, 1)), -1, best))
+        probes = np.concatenate(probes)
+        query_of = np.repeat(np.arange(nq), nprobe)
+        list_of = probes.ravel()
+        eligible = list_of >= 0
+        query_of, list_of = query_of[eligible], list_of[eligible]
+        order = np.argsort(list_of, kind='stable')
+        query_of, list_of = query_of[order], list_of[order]
+        bounds = np.searchsorted(list_of, np.arange(self.nlist + 1))
+
+        for lst in np.flatnonzero(np.diff(bounds)):
+            start, stop = self.list_start[lst], self.list_start[lst + 1]
+            if start == stop:
+                continue
+            members = query_of[bounds[lst]:bounds[lst + 1]]
+            scores = queries[members] @ self.vectors[start:stop].T
+            rows = np.broadcast_to(self.row_ids[start:stop], scores.shape)
+            best_scores[members], best_rows[members] = _top_k(
+                np.hstack([best_scores[members], scores]), np.hstack([best_rows[members], rows]), k)
+        return best_rows, best_scores
+
+
+def similar_candidate_edges(graph, src, dst, k=DEFAULT_SIMILAR_K, min_candidates=1, nprobe=DEFAULT_NPROBE):
+    """
+    Extra (src, dst) candidate edges: for every employee with an embedding, below
+    TOP_SENIORITY and with fewer than `min_candidates` candidates among (src, dst),
+    its k most similar more-senior employees by profile embedding. Pairs already
+    in (src, dst) are left out.
+    """
+    seniority, has_embedding = graph.seniority, graph.has_embedding
+    n = graph.number_of_nodes()
+    counts = np.bincount(src, minlength=n)
+    queries = np.flatnonzero(has_embedding & (seniority < TOP_SENIORITY) & (counts < min_candidates))
+    if not len(queries):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    rows = np.flatnonzero(has_embedding)
+    index = IVFIndex(graph.embeddings[rows], ranks=seniority[rows])
+    found, _ = index.search(graph.embeddings[queries], k, nprobe=nprobe, rank_above=seniority[queries])
+
+    new_src = np.repeat(queries, k)
+    new_dst = found.ravel()
+    valid = new_dst >= 0
+    new_src, new_dst = new_src[valid], rows[new_dst[valid]]
+    existing = np.isin(new_src * n + new_dst, src.astype(np.int64) * n + dst)
+    return new_src[~existing], new_dst[~existing]
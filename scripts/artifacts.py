@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+
+from scripts.graph_arrays import CompactGraph, employee_attributes
+from scripts.scoring import FEATURE_NAMES, TOP_SENIORITY
+
+# --- Precomputed feature artifacts ---
+# A bundle is a directory of .npy arrays plus manifest.json. It holds everything
+# the pipeline derives from a snapshot before the weights come into play:
+#   embeddings  unit-length profile embeddings (rows of graph_embeddings.npy)
+#   graph       CSR adjacency, seniority and location codes, node ids
+#   candidates  candidate (employee, manager) index pairs and their raw features
+# Each stage is stored under a key hashing its inputs. A run whose inputs match
+# a stage key memory-maps that stage instead of recomputing it. Arrays are
+# opened read-only with mmap, so every process using the bundle shares one copy
+# through the page cache. Bundles are written to a temporary directory and
+# swapped in by rename, so readers never see a half-written bundle.
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+STAGES = ['embeddings', 'graph', 'candidates']
+GRAPH_ARRAYS = ['node_ids', 'indptr', 'indices', 'graph_embeddings', 'has_embedding', 'seniority', 'location_codes']
+CANDIDATE_ARRAYS = ['candidate_src', 'candidate_dst', 'candidate_features']
+# Columns the pipeline adds to employees_df; they are not inputs
+DERIVED_COLUMNS = ['combined_text', 'seniority_score']
+
+
+def _digest(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else repr(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def frame_digest(df):
+    """Content hash of a DataFrame's input columns (names, dtypes and values, not the index)."""
+    df = df[[c for c in df.columns if c not in DERIVED_COLUMNS]]
+    return _digest([(str(c), str(t)) for c, t in df.dtypes.items()],
+                   pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+
+
+def stage_keys(employees_df, connections_df, model_name, profile_texts):
+    """Input keys of each stage; a stage depends on its own inputs and on the earlier stages."""
+    embeddings = _digest(ARTIFACT_FORMAT_VERSION, model_name,
+                         pd.util.hash_pandas_object(profile_texts, index=False).to_numpy().tobytes())
+    graph = _digest(embeddings, frame_digest(employees_df), frame_digest(connections_df))
+    return {'embeddings': embeddings, 'graph': graph, 'candidates': candidates_key(graph)}
+
+
+def candidates_key(graph_key):
+    # Candidate selection and the feature columns are code, not data: changing them invalidates the stage
+    return _digest(graph_key, TOP_SENIORITY, FEATURE_NAMES)
+
+
+def write_bundle(bundle_dir, keys, graph, src, dst, features, model_name, inputs=None):
+    """Writes graph + candidate arrays and the manifest to `bundle_dir`, replacing any old bundle."""
+    arrays = {
+        'node_ids': graph.node_ids, 'indptr': graph.indptr, 'indices': graph.indices,
+        'graph_embeddings': graph.embeddings, 'has_embedding': graph.has_embedding,
+        'seniority': graph.seniority, 'location_codes': graph.location_codes,
+        'candidate_src': src, 'candidate_dst': dst, 'candidate_features': features,
+    }
+    bundle_dir = os.path.abspath(bundle_dir)
+    staging = f'{bundle_dir}.tmp-{os.getpid()}'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    for name, array in arrays.items():
+        np.save(os.path.join(staging, f'{name}.npy'), np.ascontiguousarray(array))
+
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'model_name': model_name,
+        'inputs': inputs or {},
+        'stages': keys,
+        'counts': {'employees': len(graph.attributes), 'nodes': graph.number_of_nodes(),
+                   'adjacency_entries': len(graph.indices), 'candidates': len(src)},
+        'location_categories': pd.Index(graph.location_categories).tolist(),
+        'arrays': {name: {'dtype': np.asarray(a).dtype.str, 'shape': list(np.shape(a))} for name, a in arrays.items()},
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap the new bundle in; open memory maps of the old one stay valid until closed
+    previous = f'{bundle_dir}.old-{os.getpid()}'
+    if os.path.exists(bundle_dir):
+        os.rename(bundle_dir, previous)
+    os.rename(staging, bundle_dir)
+    shutil.rmtree(previous, ignore_errors=True)
+    return manifest
+
+
+class ArtifactBundle:
+    """Read-only, memory-mapped view of a bundle written by write_bundle."""
+
+    def __init__(self, bundle_dir):
+        manifest_path = os.path.join(bundle_dir, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"No artifact bundle in '{bundle_dir}'; build one with scripts/build_artifacts.py")
+        with open(manifest_path) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+            raise ValueError(f"Artifact bundle '{bundle_dir}' has format version "
+                             f"{self.manifest.get('format_version')}, expected {ARTIFACT_FORMAT_VERSION}; rebuild it")
+        self.directory = bundle_dir
+        self._arrays = {}
+        self._graph = None
+
+    def matches(self, stage, key):
+        return self.manifest['stages'].get(stage) == key
+
+    def array(self, name):
+        if name not in self._arrays:
+            self._arrays[name] = np.load(os.path.join(self.directory, f'{name}.npy'), mmap_mode='r')
+        return self._arrays[name]
+
+    def employee_embeddings(self, num_employees):
+        """Unit-length embeddings of the first `num_employees` nodes (the employee rows)."""
+        return self.array('graph_embeddings')[:num_employees]
+
+    def graph(self, employees_df):
+        """The stored graph; `employees_df` must be the snapshot the bundle was built from."""
+        if self._graph is None:
+            self._graph = CompactGraph(
+                *(self.array(name) for name in GRAPH_ARRAYS),
+                pd.Index(self.manifest['location_categories']),
+                employee_attributes(employees_df),
+            )
+        return self._graph
+
+    def candidates(self, graph):
+        """(src, dst, features) if `graph` was loaded from this bundle and the stage is current, else None."""
+        if graph is not self._graph or not self.matches('candidates', candidates_key(self.manifest['stages']['graph'])):
+            return None
+        return tuple(self.array(name) for name in CANDIDATE_ARRAYS)
@@ -0,0 +1,222 @@
+import numpy as np
+
+# --- Hierarchy assignment engines ---
+# Every employee receives at most one manager, so the predicted hierarchy is a
+# forest. An unassigned employee is always the root of its own tree, which means
+# "employee -> manager" closes a cycle exactly when the manager already sits in
+# the employee's tree. A union-find over the trees answers that in near-constant
+# time instead of re-checking the whole hierarchy for cycles.
+
+class ForestUnionFind:
+    """Disjoint-set forest tracking which hierarchy tree each employee belongs to."""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, node):
+        parent = self.parent
+        if node not in parent:
+            parent[node] = node
+            self.size[node] = 1
+            return node
+        # Path halving keeps the trees shallow without recursion
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+
+def assign_greedy(sorted_pairs, show_progress=True):
+    """
+    Greedily accepts (score, employee, manager) pairs in the given order, skipping
+    employees that already have a manager and pairs that would close a cycle.
+
+    Produces the same mapping as adding each edge to a DiGraph and checking
+    nx.is_directed_acyclic_graph, in O(pairs * alpha(nodes)).
+    """
+    final_predictions = {}
+    forest = ForestUnionFind()
+
+    pairs = sorted_pairs
+    if show_progress:
+        from tqdm import tqdm  # only needed when a progress bar is drawn
+        pairs = tqdm(sorted_pairs, desc="Assigning Managers")
+    for score, emp_id, mgr_id in pairs:
+        if emp_id in final_predictions:
+            continue
+
+        # emp_id is still a root, so a shared tree means mgr_id reports up to emp_id
+        if forest.find(emp_id) == forest.find(mgr_id):
+            continue
+
+        final_predictions[emp_id] = mgr_id
+        forest.union(emp_id, mgr_id)
+
+    return final_predictions
+
+
+# --- Maximum-weight spanning arborescence (Chu-Liu/Edmonds, Tarjan's variant) ---
+# Candidate edges point manager -> employee. A virtual root is connected to
+# every employee with a cost worse than any combination of real edges, so the
+# optimum first maximises the number of employees with a manager and then the
+# total score. Each employee's incoming edges form a leftist heap with lazy
+# offsets, contracted cycles merge their heaps, and a rollback union-find
+# tracks super-nodes, giving O(E log V) overall.
+
+def assign_arborescence(num_nodes, emp_idx, mgr_idx, scores):
+    """
+    Computes the maximum-weight spanning forest of (employee -> manager) candidate
+    edges given as index arrays. Returns an int64 array with each employee's
+    manager index, or -1 where the employee is left without a manager.
+    """
+    n = num_nodes
+    root = n
+    emp_idx = np.asarray(emp_idx, dtype=np.int64)
+    mgr_idx = np.asarray(mgr_idx, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float64)
+
+    # Swapping a root edge for a real one changes the real-edge total by at most
+    # n * spread + max|score|, so any root cost above that keeps every real edge preferred
+    spread = (scores.max() - scores.min() + 1.0) if len(scores) else 1.0
+    root_cost = spread * (n + 1) + (np.abs(scores).max() if len(scores) else 0.0)
+
+    # Heap edges run parent -> child with cost = -score; self-loops can never be used
+    parent = np.concatenate([mgr_idx, np.full(n, root, dtype=np.int64)])
+    child = np.concatenate([emp_idx, np.arange(n, dtype=np.int64)])
+    cost = np.concatenate([-scores, np.full(n, root_cost)])
+    usable = parent != child
+    parent, child, cost = parent[usable], child[usable], cost[usable]
+
+    # Incoming edges sorted by cost form a left-leaning chain: already a valid leftist heap
+    order = np.lexsort((cost, child))
+    parent, child, cost = parent[order], child[order], cost[order]
+    num_edges = len(order)
+    same_child_next = np.zeros(num_edges, dtype=bool)
+    same_child_next[:-1] = child[1:] == child[:-1]
+    left = np.where(same_child_next, np.arange(1, num_edges + 1), -1).tolist()
+
+    key = cost.tolist()
+    edge_parent = parent.tolist()
+    edge_child = child.tolist()
+    right = [-1] * num_edges
+    rank = [1] * num_edges
+    delta = [0.0] * num_edges
+
+    heap = [-1] * (n + 1)
+    starts = np.flatnonzero(np.concatenate([[True], ~same_child_next[:-1]])) if num_edges else []
+    for start in starts:
+        heap[edge_child[start]] = int(start)
+
+    def prop(x):
+        d = delta[x]
+        if d:
+            key[x] += d
+            if left[x] >= 0:
+                delta[left[x]] += d
+            if right[x] >= 0:
+                delta[right[x]] += d
+            delta[x] = 0.0
+
+    def merge(x, y):
+        # Recursion depth is bounded by the right-spine ranks, i.e. O(log E)
+        if x < 0:
+            return y
+        if y < 0:
+            return x
+        prop(x)
+        prop(y)
+        if key[x] > key[y]:
+            x, y = y, x
+        right[x] = merge(right[x], y)
+        left_rank = rank[left[x]] if left[x] >= 0 else 0
+        right_rank = rank[right[x]] if right[x] >= 0 else 0
+        if left_rank < right_rank:
+            left[x], right[x] = right[x], left[x]
+            right_rank = left_rank
+        rank[x] = right_rank + 1
+        return x
+
+    # Union-find without path compression so contractions can be rolled back
+    uf = [-1] * (n + 1)
+    history = []
+
+    def find(x):
+        while uf[x] >= 0:
+            x = uf[x]
+        return x
+
+    def join(a, b):
+        a, b = find(a), find(b)
+        if a == b:
+            return False
+        if uf[a] > uf[b]:
+            a, b = b, a
+        history.append((a, uf[a]))
+        history.append((b, uf[b]))
+        uf[a] += uf[b]
+        uf[b] = a
+        return True
+
+    def rollback(t):
+        while len(history) > t:
+            i, value = history.pop()
+            uf[i] = value
+
+    seen = [-1] * (n + 1)
+    seen[root] = root
+    path = [0] * (n + 1)
+    queue = [0] * (n + 1)
+    in_edge = [-1] * (n + 1)
+    cycles = []
+
+    for s in range(n):
+        u, qi = s, 0
+        while seen[u] < 0:
+            e = heap[u]
+            prop(e)
+            # Every later edge into this super-node is now relative to the chosen one
+            delta[e] -= key[e]
+            prop(e)
+            heap[u] = merge(left[e], right[e])
+            queue[qi], path[qi] = e, u
+            qi += 1
+            seen[u] = s
+            u = find(edge_parent[e])
+            if seen[u] == s:
+                # Found a cycle: contract it into one super-node with a merged heap
+                cycle_heap, end, time = -1, qi, len(history)
+                while True:
+                    qi -= 1
+                    w = path[qi]
+                    cycle_heap = merge(cycle_heap, heap[w])
+                    if not join(u, w):
+                        break
+                u = find(u)
+                heap[u] = cycle_heap
+                seen[u] = -1
+                cycles.append((u, time, queue[qi:end]))
+        for i in range(qi):
+            in_edge[find(edge_child[queue[i]])] = queue[i]
+
+    # Expand contracted cycles in reverse order to recover the chosen edges
+    for u, time, component in reversed(cycles):
+        rollback(time)
+        entering = in_edge[u]
+        for e in component:
+            in_edge[find(edge_child[e])] = e
+        in_edge[find(edge_child[entering])] = entering
+
+    managers = np.array([edge_parent[in_edge[i]] for i in range(n)], dtype=np.int64)
+    managers[managers == root] = -1
+    return managers
@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.artifacts import ArtifactBundle, MANIFEST_FILE, frame_digest, write_bundle
+from scripts.embedding_cache import EmbeddingCache
+from scripts.scoring import candidate_edges, compute_edge_features
+from scripts.solution import (load_data, artifact_keys, build_graph_with_features, MODEL_NAME,
+                              DEFAULT_EMBEDDING_CACHE_DIR)
+import scripts.solution as solution
+
+# --- build-artifacts ---
+# Precomputes embeddings, the graph and candidate features for one snapshot and
+# writes them as a bundle (see scripts/artifacts.py) for
+# `solution.py --artifacts` and the server's ARTIFACTS_DIR. Rebuilding over an
+# existing bundle reuses its stages whose inputs have not changed.
+
+
+def build_artifacts(employees_df, connections_df, output_dir, embedding_cache=None, model=None, inputs=None):
+    """Writes the bundle for these inputs to output_dir (a no-op when it is already current); returns its manifest."""
+    previous = None
+    if os.path.exists(os.path.join(output_dir, MANIFEST_FILE)):
+        try:
+            previous = ArtifactBundle(output_dir)
+        except ValueError as e:
+            print(f"Ignoring the existing bundle: {e}")
+    keys = artifact_keys(employees_df, connections_df)
+    if previous is not None and all(previous.matches(stage, key) for stage, key in keys.items()):
+        print(f"Artifact bundle in '{output_dir}' is already up to date.")
+        return previous.manifest
+
+    graph = build_graph_with_features(employees_df, connections_df, model=model,
+                                      embedding_cache=embedding_cache, artifacts=previous)
+    cached = previous.candidates(graph) if previous is not None else None
+    if cached is None:
+        print("Step 3: Computing candidate pairs and their features...")
+        src, dst = candidate_edges(graph)
+        features = compute_edge_features(graph, src, dst)
+    else:
+        src, dst, features = cached
+    return write_bundle(output_dir, keys, graph, src, dst, features, MODEL_NAME, inputs=inputs)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute embeddings, graph and candidate features into a bundle.')
+    parser.add_argument('--employees_path', default='data/employees.csv')
+    parser.add_argument('--connections_path', default='data/connections.csv')
+    parser.add_argument('--output_dir', default='artifacts')
+    parser.add_argument('--embedding_cache_dir', default=DEFAULT_EMBEDDING_CACHE_DIR,
+                        help="On-disk embedding cache location; pass '' to disable caching")
+    parser.add_argument('--model_dir', default=solution.MODEL_SNAPSHOT_DIR,
+                        help="Load the model from a local snapshot (see scripts/model_snapshot.py)")
+    args = parser.parse_args()
+    solution.MODEL_SNAPSHOT_DIR = args.model_dir
+
+    start = time.perf_counter()
+    employees, connections = load_data(args.employees_path, args.connections_path)
+    if employees is None:
+        sys.exit(1)
+    inputs = {
+        'employees': {'path': os.path.abspath(args.employees_path), 'sha256': frame_digest(employees)},
+        'connections': {'path': os.path.abspath(args.connections_path), 'sha256': frame_digest(connections)},
+    }
+    cache = EmbeddingCache(args.embedding_cache_dir, MODEL_NAME) if args.embedding_cache_dir else None
+    manifest = build_artifacts(employees, connections, args.output_dir, embedding_cache=cache, inputs=inputs)
+    counts = manifest['counts']
+    print(f"\nArtifact bundle '{args.output_dir}': {counts['nodes']} nodes, {counts['candidates']} candidate pairs "
+          f"({time.perf_counter() - start:.1f}s).")
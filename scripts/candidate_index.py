@@ -0,0 +1,141 @@
+import io
+import json
+import threading
+import numpy as np
+import pandas as pd
+
+from scripts.scoring import FEATURE_NAMES, compute_edge_features
+
+# --- Top-k candidate managers ---
+# The assignment step keeps one manager per employee and drops every other
+# scored pair. For review, the k best candidates of each employee are kept
+# instead, as dense (employees x k) arrays filled once right after scoring:
+#   - the scored edges are ordered by (employee, descending score) with one
+#     stable sort, and the first k of each employee's run are kept (ties keep
+#     the order ranked_candidate_pairs gives them)
+#   - only those k pairs per employee get their signals broken down into
+#     weighted contributions (feature x weight, summing to the score)
+# A batch lookup is then one index lookup plus fancy indexing, whatever the
+# number of ids. Formatting floats dominates the cost of a JSON answer, so each
+# employee's serialised list is kept once it has been asked for: warm batch
+# answers are a join of cached fragments. to_bytes / from_bytes round-trip the
+# arrays (an uncompressed .npz) so a server can keep them beside a cached result.
+
+DEFAULT_TOPK = 5
+
+
+class CandidateIndex:
+    """The top-k scored candidate managers of every employee, with per-signal contributions."""
+
+    def __init__(self, employee_ids, manager_ids, scores, contributions):
+        self.ids = np.asarray(employee_ids, dtype=np.int64)
+        self.index = pd.Index(self.ids)
+        # Build the id hash table now rather than on the first lookup
+        self.index.get_indexer(self.ids[:1])
+        self.manager_ids = manager_ids              # (employees x k), -1 padded
+        self.scores = scores                        # (employees x k), NaN padded
+        self.contributions = contributions          # (employees x k x signals), NaN padded
+        self.k = manager_ids.shape[1]
+        self.signals = list(FEATURE_NAMES)
+        # k -> serialised candidate list per row (None until first asked for)
+        self._fragments = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_scored_edges(cls, graph, src, dst, scores, weights, k=DEFAULT_TOPK, features=None):
+        """
+        From the scored candidate edges of `graph`. `features` are the rows of
+        compute_edge_features for (src, dst) when already at hand; otherwise they
+        are computed for the kept pairs only.
+        """
+        n = graph.number_of_nodes()
+        order = np.lexsort((-scores, src))
+        counts = np.bincount(src, minlength=n)
+        rank = np.arange(len(order)) - np.repeat(np.cumsum(counts) - counts, counts)
+        keep = order[rank < k]
+        rows, slots = src[keep], rank[rank < k]
+
+        kept_features = features[keep] if features is not None else compute_edge_features(graph, src[keep], dst[keep])
+        manager_ids = np.full((n, k), -1, dtype=np.int64)
+        top_scores = np.full((n, k), np.nan, dtype=np.float32)
+        contributions = np.full((n, k, len(FEATURE_NAMES)), np.nan, dtype=np.float32)
+        manager_ids[rows, slots] = graph.node_ids[dst[keep]]
+        top_scores[rows, slots] = scores[keep]
+        contributions[rows, slots] = kept_features * np.asarray(weights, dtype=np.float64)
+        return cls(graph.node_ids, manager_ids, top_scores, contributions)
+
+    def to_bytes(self):
+        """The arrays as an uncompressed .npz payload; see from_bytes."""
+        buffer = io.BytesIO()
+        np.savez(buffer, ids=self.ids, manager_ids=self.manager_ids, scores=self.scores,
+                 contributions=self.contributions)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, payload):
+        with np.load(io.BytesIO(payload)) as arrays:
+            return cls(arrays['ids'], arrays['manager_ids'], arrays['scores'], arrays['contributions'])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def rows(self, employee_ids):
+        """Rows of the given employees; KeyError naming the first unknown one."""
+        employee_ids = np.atleast_1d(np.asarray(employee_ids, dtype=np.int64))
+        rows = self.index.get_indexer(employee_ids)
+        if (rows < 0).any():
+            raise KeyError(int(employee_ids[np.flatnonzero(rows < 0)[0]]))
+        return rows
+
+    def lookup(self, employee_ids, k=None):
+        """(manager_ids, scores, contributions) arrays of the best k (default: all kept) per employee."""
+        rows = self.rows(employee_ids)
+        k = self.k if k is None else max(0, min(k, self.k))
+        return self.manager_ids[rows, :k], self.scores[rows, :k], self.contributions[rows, :k]
+
+    def candidates(self, employee_id, k=None):
+        """Best-first [{'manager_id', 'score', <signal>: contribution, ...}] of one employee."""
+        return self.records([employee_id], k)[0]
+
+    def records(self, employee_ids, k=None):
+        """One best-first candidate list (see candidates) per employee, in request order."""
+        managers, scores, contributions = self.lookup(employee_ids, k)
+        valid = (managers >= 0).tolist()
+        # float32 storage; rounded in float64 so JSON shows 6 clean decimals
+        scores = scores.astype(np.float64).round(6).tolist()
+        contributions = contributions.astype(np.float64).round(6).tolist()
+        signals = self.signals
+        return [[{'manager_id': m, 'score': s, **dict(zip(signals, c))} for m, s, c, ok in zip(*row) if ok]
+                for row in zip(managers.tolist(), scores, contributions, valid)]
+
+    def records_json(self, employee_ids, k=None):
+        """JSON array of {"employee_id", "candidates": records()} objects, in request order."""
+        rows = self.rows(employee_ids)
+        k = self.k if k is None else max(0, min(k, self.k))
+        with self._lock:
+            fragments = self._fragments.get(k)
+            if fragments is None:
+                fragments = self._fragments[k] = np.full(len(self.ids), None, dtype=object)
+        found = fragments[rows]
+        missing = np.unique(rows[np.equal(found, None)])
+        if len(missing):
+            records = self.records(self.ids[missing], k)
+            fragments[missing] = [json.dumps({'employee_id': int(e), 'candidates': r}, separators=(',', ':'))
+                                  for e, r in zip(self.ids[missing], records)]
+            found = fragments[rows]
+        return '[' + ','.join(found) + ']'
+
+    def to_frame(self, k=None):
+        """Long table: employee_id, rank (1 = best), manager_id, score and one column per signal."""
+        k = self.k if k is None else min(k, self.k)
+        valid = self.manager_ids[:, :k] >= 0
+        employee, slot = np.nonzero(valid)
+        frame = pd.DataFrame({
+            'employee_id': self.ids[employee],
+            'rank': slot + 1,
+            'manager_id': self.manager_ids[employee, slot],
+            'score': self.scores[employee, slot],
+        })
+        for i, name in enumerate(self.signals):
+            frame[name] = self.contributions[employee, slot, i]
+        return frame
@@ -0,0 +1,83 @@
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # CSV still works through the pandas C parser
+    pa = None
+
+# --- Columnar input loading ---
+# employees/connections can be CSV (optionally compressed), Parquet or Arrow IPC
+# (file or stream format). CSVs go through the multi-threaded pyarrow parser when
+# available, otherwise the pandas C parser, with explicit dtypes so ids never
+# pass through object columns. Connections are always two int64 columns, like
+# employee_id, so ids of 2**31 and above keep their value.
+
+EMPLOYEE_DTYPES = {'employee_id': 'int64'}
+CONNECTION_DTYPE = np.int64
+
+FORMAT_EXTENSIONS = {
+    '.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet',
+    '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow', '.arrows': 'arrow',
+}
+COMPRESSION_EXTENSIONS = ('.gz', '.bz2', '.zip', '.xz', '.zst')
+
+
+def infer_format(path):
+    """Maps a file name to 'csv', 'parquet' or 'arrow' (compressed CSVs count as CSV)."""
+    name = str(path).lower()
+    for suffix in COMPRESSION_EXTENSIONS:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return FORMAT_EXTENSIONS.get(os.path.splitext(name)[1], 'csv')
+
+
+def _require_pyarrow(file_format):
+    if pa is None:
+        raise ImportError(f"Reading {file_format} input requires pyarrow (pip install pyarrow)")
+
+
+def _read_arrow_ipc(source):
+    _require_pyarrow('Arrow IPC')
+    if isinstance(source, (str, os.PathLike)):
+        source = pa.memory_map(str(source), 'r')
+    try:
+        return pa.ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        # Not the random-access file format: rewind and read it as a stream
+        source.seek(0)
+        return pa.ipc.open_stream(source).read_all()
+
+
+def read_table(source, file_format=None, csv_dtype=None):
+    """
+    Reads one table from a path or binary buffer into a DataFrame. `file_format`
+    defaults to the file extension; buffers without one are treated as CSV.
+    """
+    if file_format is None:
+        file_format = infer_format(source) if isinstance(source, (str, os.PathLike)) else 'csv'
+
+    if file_format == 'parquet':
+        _require_pyarrow('Parquet')
+        return pq.read_table(source).to_pandas()
+    if file_format == 'arrow':
+        return _read_arrow_ipc(source).to_pandas()
+    if file_format != 'csv':
+        raise ValueError(f"Unsupported input format '{file_format}'")
+
+    engine = 'pyarrow' if pa is not None else 'c'
+    return pd.read_csv(source, engine=engine, dtype=csv_dtype)
+
+
+def read_employees(source, file_format=None):
+    employees_df = read_table(source, file_format, csv_dtype=EMPLOYEE_DTYPES)
+    return employees_df.astype(EMPLOYEE_DTYPES)
+
+
+def read_connections(source, file_format=None):
+    """Reads the first two columns of a connections table as int64 ids."""
+    connections_df = read_table(source, file_format, csv_dtype=CONNECTION_DTYPE)
+    return connections_df.iloc[:, :2].astype(CONNECTION_DTYPE)
@@ -0,0 +1,229 @@
+import contextlib
+import hashlib
+import json
+import os
+import re
+import threading
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # No cross-process locking (Windows); one process per cache directory
+    fcntl = None
+
+# --- Persistent embedding cache ---
+# Embeddings are stored in a memory-mapped float32 matrix (vectors.npy) with a
+# JSON index mapping sha256(model name + text) to a row slot and a last-used
+# tick. Only texts missing from the cache are sent to the model; when the cache
+# is full the least recently used rows are overwritten.
+#
+# Several processes may share a directory (the CLI and the server, or gunicorn
+# workers). Slot allocation, vector writes and index saves happen under an
+# exclusive lock on a lock file, after reloading the index if another process
+# saved it since. The model runs outside both that lock and the in-process
+# one, so cached lookups never wait for an encode. The index is only written
+# when entries were added.
+
+DEFAULT_MAX_ENTRIES = 200_000
+INDEX_FILE = 'index.json'
+VECTORS_FILE = 'vectors.npy'
+LOCK_FILE = 'lock'
+
+
+def text_key(model_name, text):
+    """Content address of one text under one model."""
+    return hashlib.sha256(f"{model_name}\0{text}".encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Size-bounded, LRU-evicting on-disk cache of sentence embeddings for one model."""
+
+    def __init__(self, cache_dir, model_name, max_entries=DEFAULT_MAX_ENTRIES):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.directory = os.path.join(cache_dir, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._slots = {}   # key -> [slot, last_used]
+        self._free = []    # unused slots, popped from the end
+        self._touched = {}  # key -> last_used of hits not yet saved
+        self._clock = 0
+        self._dim = None
+        self._vectors = None
+        self._index_stamp = None    # (inode, mtime_ns, size) of the index file last read or written
+        self._vectors_inode = None
+        os.makedirs(self.directory, exist_ok=True)
+        with self._file_lock():
+            self._load()
+            if self._vectors is not None and self._vectors.shape[0] != self.max_entries:
+                self._resize(self.max_entries)
+                self._save()
+
+    # --- Persistence ---
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared with other processes using the directory."""
+        if fcntl is None:
+            yield
+            return
+        # Opened per acquisition: a descriptor inherited across fork would share the lock
+        with open(os.path.join(self.directory, LOCK_FILE), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _stamp(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load(self):
+        """(Re)reads the index and maps the vectors when another process changed them."""
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        vectors_path = os.path.join(self.directory, VECTORS_FILE)
+        stamp = self._stamp(index_path)
+        if stamp is None or stamp == self._index_stamp or not os.path.exists(vectors_path):
+            return
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+            vectors_inode = os.stat(vectors_path).st_ino
+            vectors = self._vectors if vectors_inode == self._vectors_inode else np.load(vectors_path, mmap_mode='r+')
+        except (ValueError, OSError):
+            # A torn or foreign cache is simply discarded
+            return
+        if index.get('model') != self.model_name or vectors.ndim != 2:
+            return
+        slots = {key: list(entry) for key, entry in index['slots'].items()}
+        # Hits seen here since the last save keep their recency
+        for key, tick in self._touched.items():
+            if key in slots:
+                slots[key][1] = max(slots[key][1], tick)
+        self._slots = slots
+        self._clock = max(self._clock, index.get('clock', 0))
+        self._dim = vectors.shape[1]
+        self._vectors, self._vectors_inode = vectors, vectors_inode
+        self._index_stamp = stamp
+        self._rebuild_free()
+
+    def _rebuild_free(self):
+        used = np.fromiter((entry[0] for entry in self._slots.values()), dtype=np.int64, count=len(self._slots))
+        # Reversed so that pop() hands out the lowest slots first
+        self._free = np.setdiff1d(np.arange(len(self._vectors)), used)[::-1].tolist()
+
+    def _save(self):
+        self._vectors.flush()
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        tmp_path = index_path + f'.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'model': self.model_name, 'dim': self._dim,
+                       'clock': self._clock, 'slots': self._slots}, f)
+        os.replace(tmp_path, index_path)
+        self._index_stamp = self._stamp(index_path)
+        self._touched = {}
+
+    def _open_vectors(self, capacity, dim):
+        path = os.path.join(self.directory, VECTORS_FILE)
+        tmp_path = path + f'.{os.getpid()}.tmp'
+        vectors = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=(capacity, dim))
+        return vectors, tmp_path, path
+
+    def _map_vectors(self, path):
+        self._vectors = np.load(path, mmap_mode='r+')
+        self._vectors_inode = os.stat(path).st_ino
+
+    def _resize(self, capacity):
+        """Rewrites the matrix with a new capacity, keeping the most recently used rows."""
+        survivors = sorted(self._slots.items(), key=lambda item: item[1][1], reverse=True)[:capacity]
+        vectors, tmp_path, path = self._open_vectors(capacity, self._dim)
+        for new_slot, (key, entry) in enumerate(survivors):
+            vectors[new_slot] = self._vectors[entry[0]]
+            entry[0] = new_slot
+        vectors.flush()
+        del vectors
+        self._vectors = None
+        os.replace(tmp_path, path)
+        self._map_vectors(path)
+        self._slots = dict(survivors)
+        self._rebuild_free()
+
+    # --- Lookup ---
+    def _free_slots(self, needed, protected):
+        """Returns `needed` writable slots, evicting least recently used entries if full."""
+        free = [self._free.pop() for _ in range(min(needed, len(self._free)))]
+        if len(free) < needed:
+            evictable = sorted((entry[1], key) for key, entry in self._slots.items() if key not in protected)
+            for _, key in evictable[:needed - len(free)]:
+                free.append(self._slots.pop(key)[0])
+        return free
+
+    def _read(self, keys):
+        """{key: vector copy} of the cached keys, marking them as used."""
+        self._clock += 1
+        found = {}
+        for key in keys:
+            entry = self._slots.get(key)
+            if entry is not None:
+                entry[1] = self._touched[key] = self._clock
+                found[key] = np.array(self._vectors[entry[0]])
+        return found
+
+    def get_embeddings(self, texts, encode):
+        """
+        Returns a (len(texts), dim) float32 array of embeddings. Identical texts are
+        encoded once and only cache misses are passed to `encode(list_of_texts)`.
+        """
+        texts = list(texts)
+        unique_texts = list(dict.fromkeys(texts))
+        keys = {text: text_key(self.model_name, text) for text in unique_texts}
+
+        with self._lock, self._file_lock():
+            self._load()
+            vectors = self._read(keys.values())
+            missing = [text for text in unique_texts if keys[text] not in vectors]
+            self.hits += len(unique_texts) - len(missing)
+            self.misses += len(missing)
+            dim = self._dim or 0
+
+        if missing:
+            # The model runs without holding either lock, so lookups served from the
+            # cache never wait for another caller's encode
+            new_vectors = np.asarray(encode(missing), dtype=np.float32)
+            vectors.update(zip((keys[text] for text in missing), new_vectors))
+            dim = new_vectors.shape[1]
+            with self._lock, self._file_lock():
+                self._load()
+                self._store(missing, keys, vectors)
+                self._save()
+
+        result = np.empty((len(texts), dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            result[i] = vectors[keys[text]]
+        return result
+
+    def _store(self, missing, keys, vectors):
+        """Writes the newly encoded texts that no other process stored meanwhile."""
+        if self._vectors is None:
+            self._dim = len(vectors[keys[missing[0]]])
+            mapped, tmp_path, path = self._open_vectors(self.max_entries, self._dim)
+            del mapped
+            os.replace(tmp_path, path)
+            self._map_vectors(path)
+            self._rebuild_free()
+
+        # Newest misses win when a single batch exceeds the cache size
+        to_store = [text for text in missing if keys[text] not in self._slots][-len(self._vectors):]
+        protected = set(keys.values())
+        for text, slot in zip(to_store, self._free_slots(len(to_store), protected)):
+            self._vectors[slot] = vectors[keys[text]]
+            self._slots[keys[text]] = [slot, self._clock]
+
+    def stats(self):
+        return {'entries': len(self._slots), 'capacity': self.max_entries,
+                'hits': self.hits, 'misses': self.misses}
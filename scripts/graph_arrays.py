@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+# --- Compact array-backed employee graph ---
+# Replaces the NetworkX graph with per-node attribute dicts: employee ids map to
+# contiguous row indices, adjacency is stored as CSR arrays, embeddings live in
+# one float32 matrix and categorical columns are integer-coded.
+#
+# Node and neighbour order match what nx.Graph produced for the same inputs
+# (employees in file order, then ids first seen in the connections; neighbours
+# in order of first appearance), so downstream results are unchanged.
+
+# Location code that never matches anything (missing value in employees.csv)
+LOCATION_MISSING = -1
+
+# Employee columns the graph holds as arrays (or that are pipeline scratch columns)
+NON_ATTRIBUTE_COLUMNS = ['employee_id', 'seniority_score', 'location', 'combined_text']
+
+
+def employee_attributes(employees_df):
+    """The remaining employee columns, row i = node i."""
+    excluded = [c for c in NON_ATTRIBUTE_COLUMNS if c in employees_df]
+    return employees_df.drop(columns=excluded).reset_index(drop=True)
+
+
+def normalize_embeddings(embeddings):
+    """Returns float32 unit-length rows; all-zero rows stay zero (cosine similarity 0)."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+class CompactGraph:
+    """Undirected employee graph stored as flat NumPy arrays."""
+
+    def __init__(self, node_ids, indptr, indices, embeddings, has_embedding,
+                 seniority, location_codes, location_categories, attributes):
+        self.node_ids = node_ids                        # index -> employee id
+        self.id_index = pd.Index(node_ids)              # employee id -> index
+        self.indptr = indptr                            # CSR row pointers (int64)
+        self.indices = indices                          # CSR neighbour indices (int32)
+        self.embeddings = embeddings                    # (n, dim) float32, unit rows
+        self.has_embedding = has_embedding              # (n,) bool
+        self.seniority = seniority                      # (n,) int8
+        self.location_codes = location_codes            # (n,) int32, LOCATION_MISSING never matches
+        self.location_categories = location_categories  # code -> location value
+        self.attributes = attributes                    # remaining employee columns, row i = node i
+
+    @classmethod
+    def from_frames(cls, employees_df, connections_df, embeddings=None, normalized=False):
+        """
+        Builds the graph from the employees/connections DataFrames. `embeddings`
+        holds one row per employee (in employees_df order) or None; pass
+        normalized=True when its rows are already unit length (or zero).
+        """
+        employee_ids = employees_df['employee_id'].to_numpy()
+        pairs = connections_df.to_numpy()[:, :2]
+        flat = pairs.ravel()
+
+        # Ids that only appear in connections are appended in order of first appearance
+        known = pd.Index(employee_ids)
+        extra_ids = pd.unique(flat[known.get_indexer(flat) < 0])
+        node_ids = np.concatenate([employee_ids, extra_ids]) if len(extra_ids) else employee_ids
+        n, n_employees = len(node_ids), len(employee_ids)
+
+        codes = pd.Index(node_ids).get_indexer(flat).astype(np.int64).reshape(-1, 2)
+        indptr, indices = cls._build_csr(codes, n)
+
+        has_embedding = np.zeros(n, dtype=bool)
+        if embeddings is None:
+            embedding_matrix = np.zeros((n, 0), dtype=np.float32)
+        else:
+            embedding_matrix = np.zeros((n, np.shape(embeddings)[1]), dtype=np.float32)
+            embedding_matrix[:n_employees] = embeddings if normalized else normalize_embeddings(embeddings)
+            has_embedding[:n_employees] = True
+
+        seniority = np.zeros(n, dtype=np.int8)
+        if 'seniority_score' in employees_df:
+            seniority[:n_employees] = employees_df['seniority_score'].to_numpy()
+
+        # Nodes without an employee row share one extra code, mirroring None == None
+        if 'location' in employees_df:
+            location_codes, location_categories = pd.factorize(employees_df['location'])
+            location_codes = np.concatenate([
+                location_codes.astype(np.int32),
+                np.full(n - n_employees, len(location_categories), dtype=np.int32)
+            ])
+        else:
+            location_codes, location_categories = np.zeros(n, dtype=np.int32), pd.Index([])
+
+        return cls(node_ids, indptr, indices, embedding_matrix, has_embedding,
+                   seniority, location_codes, location_categories, employee_attributes(employees_df))
+
+    @staticmethod
+    def _build_csr(codes, n):
+        """CSR adjacency from an (edges x 2) index array, neighbours in first-appearance order."""
+        # Row r contributes a->b at position 2r and b->a at 2r+1, the order nx inserts them
+        src = codes.ravel()
+        dst = codes[:, ::-1].ravel()
+        _, first = np.unique(src * n + dst, return_index=True)
+        first.sort()
+        src, dst = src[first], dst[first]
+
+        order = np.argsort(src, kind='stable')
+        indices = dst[order].astype(np.int32 if n < 2**31 else np.int64)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        return indptr, indices
+
+    # --- Queries ---
+    def number_of_nodes(self):
+        return len(self.node_ids)
+
+    def number_of_edges(self):
+        rows = np.repeat(np.arange(self.number_of_nodes()), np.diff(self.indptr))
+        self_loops = int(np.count_nonzero(rows == self.indices))
+        return (len(self.indices) + self_loops) // 2
+
+    def degrees(self):
+        return np.diff(self.indptr)
+
+    def index_of(self, node_ids):
+        """Row indices for the given employee ids (-1 for unknown ids)."""
+        return self.id_index.get_indexer(np.atleast_1d(node_ids))
+
+    def neighbors(self, node_id):
+        i = self.id_index.get_loc(node_id)
+        return self.node_ids[self.indices[self.indptr[i]:self.indptr[i + 1]]]
+
+    def edge_index_pairs(self):
+        """(src, dst) row indices of each undirected edge once (src <= dst)."""
+        src = np.repeat(np.arange(self.number_of_nodes(), dtype=np.int64), np.diff(self.indptr))
+        keep = src <= self.indices
+        return src[keep], self.indices[keep].astype(np.int64)
+
+    def attribute(self, column, default=None):
+        """Per-node values of an employee column; nodes without an employee row get `default`."""
+        values = np.full(self.number_of_nodes(), default, dtype=object)
+        if column in self.attributes:
+            values[:len(self.attributes)] = self.attributes[column].to_numpy()
+        return values
+
+    def nbytes(self):
+        arrays = [self.node_ids, self.indptr, self.indices, self.embeddings,
+                  self.has_embedding, self.seniority, self.location_codes]
+        return sum(a.nbytes for a in arrays) + int(self.attributes.memory_usage(deep=True).sum())
@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+# --- Hierarchy index ---
+# The predicted {employee: manager} map is a forest: the CEO and every
+# unassigned employee root a tree. It is compiled once into arrays so that org
+# queries never walk the tree:
+#   - depth and subtree size of every employee
+#   - Euler-tour (preorder) intervals: the subtree of v is the contiguous slice
+#     order[tin[v]:tin[v] + size[v]], and "a is above b" is an interval test
+#   - binary lifting (the 2^k-th manager of everyone) for lowest common managers
+#     in O(log depth) vectorised steps
+# Depths, sizes and preorder positions are computed level by level with NumPy
+# in O(N) total array work (plus a constant per level); the lifting table adds O(N log depth). Every query has a
+# batch form that answers many pairs in one array operation.
+
+
+class HierarchyIndex:
+    """Array index over an employee -> manager forest (manager -1, 0 or unknown = no manager)."""
+
+    def __init__(self, employee_ids, manager_ids):
+        employee_ids = np.asarray(employee_ids, dtype=np.int64)
+        manager_ids = np.asarray(manager_ids, dtype=np.int64)
+        first = ~pd.Index(employee_ids).duplicated()
+        self.ids = employee_ids[first]
+        self.index = pd.Index(self.ids)
+        # Single lookups go through a dict: much cheaper per call than Index.get_indexer
+        self.row_of = dict(zip(self.ids.tolist(), range(len(self.ids))))
+        n = len(self.ids)
+        managers = manager_ids[first]
+        self.parent = self.index.get_indexer(managers).astype(np.int64)
+        # 0 marks an unassigned employee even when some employee has id 0
+        self.parent[(managers == -1) | (managers == 0)] = -1
+        self.roots = np.flatnonzero(self.parent < 0)
+
+        # Direct reports of each manager as CSR, in input order
+        child = np.flatnonzero(self.parent >= 0)
+        self.children = child[np.argsort(self.parent[child], kind='stable')]
+        self.child_count = np.bincount(self.parent[child], minlength=n)
+        self.child_start = np.concatenate([[0], np.cumsum(self.child_count)[:-1]]).astype(np.int64)
+
+        # Depths top-down, one level at a time
+        self.depth = np.full(n, -1, dtype=np.int64)
+        levels, frontier = [], self.roots
+        while len(frontier):
+            self.depth[frontier] = len(levels)
+            levels.append(frontier)
+            frontier = self._reports(frontier)[0]
+        if (self.depth < 0).any():
+            cycle = self.ids[np.flatnonzero(self.depth < 0)[:5]].tolist()
+            raise ValueError(f"The hierarchy contains reporting cycles (e.g. through employees {cycle})")
+
+        # Subtree sizes bottom-up
+        self.size = np.ones(n, dtype=np.int64)
+        for level in reversed(levels[1:]):
+            np.add.at(self.size, self.parent[level], self.size[level])
+
+        # Preorder positions top-down: a report starts after its manager and its earlier siblings' subtrees
+        self.tin = np.zeros(n, dtype=np.int64)
+        self.tin[self.roots] = np.cumsum(self.size[self.roots]) - self.size[self.roots]
+        for level in levels[:-1]:
+            reports, owners = self._reports(level)
+            before = np.cumsum(self.size[reports]) - self.size[reports]
+            counts = self.child_count[level]
+            counts = counts[counts > 0]
+            group_start = np.repeat(before[np.cumsum(counts) - counts], counts)
+            self.tin[reports] = self.tin[owners] + 1 + before - group_start
+        self.order = np.empty(n, dtype=np.int64)
+        self.order[self.tin] = np.arange(n)
+
+        # up[k][v]: the 2^k-th manager of v; row n is a sentinel above every root
+        self.max_depth = int(self.depth.max()) if n else 0
+        up = np.append(np.where(self.parent >= 0, self.parent, n), n)
+        self.up = [up]
+        for _ in range(max(1, self.max_depth.bit_length()) - 1):
+            up = up[up]
+            self.up.append(up)
+
+    @classmethod
+    def from_predictions(cls, predictions, employee_ids=None):
+        """From an {employee: manager} dict; `employee_ids` adds employees without a manager."""
+        ids = list(predictions) if employee_ids is None else list(employee_ids)
+        return cls(ids, [predictions.get(e, 0) for e in ids])
+
+    @classmethod
+    def from_submission(cls, submission_df):
+        """From a submission DataFrame (employee_id, manager_id; CEO -1, unassigned 0)."""
+        return cls(submission_df['employee_id'].to_numpy(dtype=np.int64),
+                   submission_df['manager_id'].fillna(0).to_numpy(dtype=np.int64))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _reports(self, rows):
+        counts = self.child_count[rows]
+        owners = np.repeat(rows, counts)
+        offsets = np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self.children[np.repeat(self.child_start[rows], counts) + offsets], owners
+
+    def rows(self, employee_ids):
+        """Rows of the given employees; KeyError naming the first unknown one."""
+        rows = self.index.get_indexer(np.atleast_1d(np.asarray(employee_ids, dtype=np.int64)))
+        if (rows < 0).any():
+            raise KeyError(int(np.atleast_1d(employee_ids)[np.flatnonzero(rows < 0)[0]]))
+        return rows
+
+    def row(self, employee_id):
+        return self.row_of[int(employee_id)]
+
+    # --- Single-employee queries ---
+    def manager(self, employee_id):
+        parent = self.parent[self.row(employee_id)]
+        return int(self.ids[parent]) if parent >= 0 else None
+
+    def chain_of_command(self, employee_id):
+        """[employee, manager, manager's manager, ..., top of the tree]."""
+        row = self.row(employee_id)
+        chain = [row]
+        parent = self.parent
+        while parent[row] >= 0:
+            row = int(parent[row])
+            chain.append(row)
+        return self.ids[chain].tolist()
+
+    def direct_reports(self, employee_id):
+        row = self.row(employee_id)
+        start = self.child_start[row]
+        return self.ids[self.children[start:start + self.child_count[row]]].tolist()
+
+    def subtree(self, employee_id, limit=None):
+        """The employee and everyone below, in preorder (at most `limit` ids)."""
+        row = self.row(employee_id)
+        end = self.tin[row] + self.size[row] if limit is None else self.tin[row] + min(self.size[row], limit)
+        return self.ids[self.order[self.tin[row]:end]].tolist()
+
+    def span_of_control(self, employee_id):
+        """Direct and total (all levels) reports, and depth below the top of the tree."""
+        row = self.row(employee_id)
+        return {'direct_reports': int(self.child_count[row]), 'total_reports': int(self.size[row] - 1),
+                'depth': int(self.depth[row])}
+
+    def is_above(self, a, b):
+        """Whether `a` is in `b`'s chain of command (strictly above it)."""
+        a, b = self.row(a), self.row(b)
+        tin = self.tin
+        return bool(a != b and tin[a] <= tin[b] < tin[a] + self.size[a])
+
+    def lowest_common_manager(self, a, b):
+        """The lowest employee with both `a` and `b` in their subtree (possibly a or b), or None."""
+        found = self.lowest_common_managers([a], [b])[0]
+        return int(found) if found >= 0 else None
+
+    # --- Batch queries ---
+    def is_above_many(self, a_ids, b_ids):
+        a, b = self.rows(a_ids), self.rows(b_ids)
+        return (a != b) & (self.tin[a] <= self.tin[b]) & (self.tin[b] < self.tin[a] + self.size[a])
+
+    def lowest_common_managers(self, a_ids, b_ids):
+        """Employee ids of the lowest common managers (-1 where a and b are in different trees)."""
+        a, b = self.rows(a_ids), self.rows(b_ids)
+        # Lift the deeper of each pair to the other's depth
+        deeper = self.depth[a] < self.depth[b]
+        a, b = np.where(deeper, b, a), np.where(deeper, a, b)
+        diff = self.depth[a] - self.depth[b]
+        for k, up in enumerate(self.up):
+            step = ((diff >> k) & 1).astype(bool)
+            a[step] = up[a[step]]
+        # Then lift both while their ancestors differ
+        for up in reversed(self.up):
+            step = up[a] != up[b]
+            a[step], b[step] = up[a[step]], up[b[step]]
+        found = np.where(a == b, a, self.up[0][a])
+        return np.where(found < len(self.ids), self.ids[np.minimum(found, len(self.ids) - 1)], -1)
+
+    def spans(self, employee_ids):
+        """(direct reports, total reports, depth) arrays for many employees."""
+        rows = self.rows(employee_ids)
+        return self.child_count[rows], self.size[rows] - 1, self.depth[rows]
@@ -0,0 +1,332 @@
+import time
+import numpy as np
+import pandas as pd
+
+from scripts.assignment import assign_greedy
+from scripts.data_io import CONNECTION_DTYPE
+from scripts.graph_arrays import CompactGraph
+from scripts.scoring import candidate_edge_slots, compute_edge_features
+from scripts.solution import embed_profiles, profile_text, get_seniority, get_scoring_weights, build_submission
+
+# --- Incremental re-prediction ---
+# Keeps the last graph, embeddings, ranked candidate pairs and greedy decisions
+# in memory and applies employee / connection deltas to them:
+#
+# 1. Only new or edited profiles are embedded.
+# 2. A pair (employee -> manager) depends on both endpoints' attributes, their
+#    neighbourhoods and the seniority of the employee's neighbours, so only the
+#    candidate rows of changed nodes and their neighbours are re-scored. Pairs
+#    whose score and neighbour list are unchanged keep their place in the
+#    ranking; the others are re-inserted, as their tie-break may have changed.
+# 3. The greedy assignment is a deterministic scan of the ranking. The old and
+#    new rankings are merged into one sequence and the scan is replayed only
+#    from each changed pair until both scans agree again on who has a manager
+#    and which tree everyone is in; from there on they make the same decisions,
+#    so the old ones are reused until the next changed pair.
+#
+# The result is exactly what predict_managers_globally (greedy) returns for the
+# updated tables, given the same embeddings for unchanged profiles.
+
+
+def _neighbor_ids(graph, node_ids):
+    rows = graph.index_of(node_ids)
+    rows = rows[rows >= 0]
+    if not len(rows):
+        return graph.node_ids[:0]
+    slots = np.concatenate([np.arange(graph.indptr[r], graph.indptr[r + 1]) for r in rows])
+    return graph.node_ids[graph.indices[slots]]
+
+
+def _adjacency_changed(old_graph, graph, node_ids):
+    """Mask of the nodes whose neighbour list (ids, in order) differs between the two graphs."""
+    old_rows, rows = old_graph.index_of(node_ids), graph.index_of(node_ids)
+    changed = np.zeros(len(node_ids), dtype=bool)
+    for i, (a, b) in enumerate(zip(old_rows.tolist(), rows.tolist())):
+        old = old_graph.node_ids[old_graph.indices[old_graph.indptr[a]:old_graph.indptr[a + 1]]] if a >= 0 else []
+        new = graph.node_ids[graph.indices[graph.indptr[b]:graph.indptr[b + 1]]] if b >= 0 else []
+        changed[i] = not np.array_equal(old, new)
+    return changed
+
+
+def _pair_keys(pairs):
+    # Connections are undirected: (a, b) and (b, a) are the same edge
+    pairs = np.asarray(pairs).reshape(-1, 2)
+    return pd.MultiIndex.from_arrays([pairs.min(axis=1), pairs.max(axis=1)])
+
+
+class IncrementalPredictor:
+    """Greedy hierarchy prediction that can be updated with small deltas."""
+
+    def __init__(self, employees_df, connections_df, model=None, embedding_cache=None, weights=None):
+        self.model = model
+        self.embedding_cache = embedding_cache
+        self.weights = np.asarray(weights if weights is not None else get_scoring_weights(), dtype=np.float64)
+        self.last_delta_stats = {}
+
+        self.employees_df = employees_df.reset_index(drop=True).copy()
+        self.connections_df = connections_df.reset_index(drop=True)
+        self.embeddings = np.asarray(self._embed(self.employees_df), dtype=np.float32)
+        self.employees_df['seniority_score'] = self.employees_df['job_title_current'].apply(get_seniority)
+        self.graph = CompactGraph.from_frames(self.employees_df, self.connections_df, self.embeddings)
+
+        src, slots = candidate_edge_slots(self.graph)
+        scores = self._score(src, slots)
+        order = np.argsort(-scores, kind='stable')
+        self._set_ranking(scores[order], src[order], slots[order])
+
+        # The initial scan is the ordinary greedy; its decisions become per-pair flags
+        predictions = assign_greedy(zip(self._scores.tolist(), self._emp.tolist(), self._mgr.tolist()),
+                                    show_progress=False)
+        assigned = pd.Series(predictions, dtype=np.int64)
+        chosen = assigned.reindex(self._emp).to_numpy(dtype=np.float64, na_value=np.nan)
+        self._accepted = chosen == self._mgr
+
+    # --- Helpers ---
+    def _embed(self, employees_df):
+        return embed_profiles(employees_df, model=self.model, embedding_cache=self.embedding_cache)
+
+    def _score(self, src, slots):
+        features = compute_edge_features(self.graph, src, self.graph.indices[slots])
+        return features @ self.weights
+
+    def _set_ranking(self, scores, src, slots):
+        graph = self.graph
+        self._scores = scores
+        self._emp = graph.node_ids[src].astype(np.int64)
+        self._mgr = graph.node_ids[graph.indices[slots]].astype(np.int64)
+        self._pos = slots - graph.indptr[src]  # position in the employee's adjacency row (tie-break)
+
+    @property
+    def predictions(self):
+        """Current {employee_id: manager_id} mapping, as predict_managers_globally returns it."""
+        return dict(zip(self._emp[self._accepted].tolist(), self._mgr[self._accepted].tolist()))
+
+    def submission(self):
+        return build_submission(self.employees_df, self.predictions)
+
+    # --- Deltas ---
+    def _apply_to_tables(self, upsert_employees, remove_employees, add_connections, remove_connections):
+        """Updates the tables and embeddings; returns (changed node ids, number of profiles embedded)."""
+        employees_df, connections_df, embeddings = self.employees_df, self.connections_df, self.embeddings
+        changed = [np.asarray(remove_employees, dtype=np.int64)]
+        embedded = 0
+
+        if len(changed[0]):
+            keep = ~employees_df['employee_id'].isin(changed[0]).to_numpy()
+            employees_df, embeddings = employees_df[keep].reset_index(drop=True), embeddings[keep]
+            # Someone who leaves takes their connections with them
+            linked = connections_df.iloc[:, 0].isin(changed[0]) | connections_df.iloc[:, 1].isin(changed[0])
+            connections_df = connections_df[~linked.to_numpy()].reset_index(drop=True)
+
+        if upsert_employees is not None and len(upsert_employees):
+            upsert = upsert_employees.reset_index(drop=True).copy()
+            upsert['employee_id'] = upsert['employee_id'].astype(np.int64)
+            changed.append(upsert['employee_id'].to_numpy())
+            rows = pd.Index(employees_df['employee_id']).get_indexer(upsert['employee_id'])
+            vectors = np.zeros((len(upsert), embeddings.shape[1]), dtype=np.float32)
+            vectors[rows >= 0] = embeddings[rows[rows >= 0]]
+
+            # Only new profiles and profiles whose text changed go to the model
+            texts = profile_text(upsert)
+            old_texts = np.where(rows >= 0, employees_df['combined_text'].to_numpy()[rows], None)
+            stale = (rows < 0) | (texts.to_numpy() != old_texts)
+            if stale.any():
+                vectors[stale] = self._embed(upsert[stale].copy())
+                embedded = int(stale.sum())
+            upsert['combined_text'] = texts
+            upsert['seniority_score'] = upsert['job_title_current'].apply(get_seniority)
+            upsert = upsert.reindex(columns=employees_df.columns)
+
+            # Edited rows stay where they are; new employees are appended
+            existing = rows >= 0
+            employees_df = employees_df.copy()
+            employees_df.iloc[rows[existing]] = upsert[existing].to_numpy()
+            embeddings = embeddings.copy()
+            embeddings[rows[existing]] = vectors[existing]
+            employees_df = pd.concat([employees_df, upsert[~existing]], ignore_index=True)
+            employees_df = employees_df.astype(self.employees_df.dtypes.to_dict())
+            embeddings = np.concatenate([embeddings, vectors[~existing]])
+
+        if remove_connections is not None and len(remove_connections):
+            keys = _pair_keys(connections_df.to_numpy()[:, :2])
+            connections_df = connections_df[~keys.isin(_pair_keys(remove_connections))].reset_index(drop=True)
+            changed.append(np.asarray(remove_connections, dtype=np.int64).ravel())
+
+        if add_connections is not None and len(add_connections):
+            added = pd.DataFrame(np.asarray(add_connections).reshape(-1, 2).astype(CONNECTION_DTYPE),
+                                 columns=connections_df.columns[:2])
+            connections_df = pd.concat([connections_df, added], ignore_index=True)
+            changed.append(added.to_numpy().astype(np.int64).ravel())
+
+        self.employees_df, self.connections_df, self.embeddings = employees_df, connections_df, embeddings
+        return np.unique(np.concatenate(changed)), embedded
+
+    def apply_delta(self, upsert_employees=None, remove_employees=(), add_connections=None, remove_connections=None):
+        """
+        Applies a delta and returns {employee_id: (old manager, new manager)} for the
+        employees whose predicted manager changed, None standing for no manager
+        (removed employees who had one map to (manager, None)). `predictions` gives
+        the full updated mapping.
+
+        upsert_employees:   DataFrame of new or edited employee rows
+        remove_employees:   employee ids that left (their connections are removed too)
+        add_connections:    (k, 2) array of employee id pairs to connect
+        remove_connections: (k, 2) array of pairs to disconnect (either direction)
+        """
+        started = time.perf_counter()
+        old_graph = self.graph
+        changed, embedded = self._apply_to_tables(upsert_employees, remove_employees,
+                                                  add_connections, remove_connections)
+        self.graph = graph = CompactGraph.from_frames(self.employees_df, self.connections_df, self.embeddings)
+
+        # Rows whose candidates or scores can change: changed nodes and their neighbours
+        affected = np.unique(np.concatenate([changed, _neighbor_ids(old_graph, changed), _neighbor_ids(graph, changed)]))
+        rows = graph.index_of(affected)
+        src, slots = candidate_edge_slots(graph, np.sort(rows[rows >= 0]))
+        new_scores = self._score(src, slots)
+        new = pd.DataFrame({
+            'emp': graph.node_ids[src].astype(np.int64),
+            'mgr': graph.node_ids[graph.indices[slots]].astype(np.int64),
+            'score': new_scores,
+            'src': src,
+            'pos': slots - graph.indptr[src],
+        })
+
+        # Pairs of changed nodes, and of nodes whose neighbour list changed, always move: their
+        # adjacency positions (the tie-break) and row order may be stale. Other affected pairs
+        # stay in place when their score is bit-for-bit the same
+        moved = np.union1d(changed, affected[_adjacency_changed(old_graph, graph, affected)])
+        in_affected = np.isin(self._emp, affected)
+        old_rows = np.flatnonzero(in_affected & ~np.isin(self._emp, moved))
+        old = pd.DataFrame({'old': old_rows, 'emp': self._emp[old_rows], 'mgr': self._mgr[old_rows],
+                            'score': self._scores[old_rows]})
+        candidates = new[~new['emp'].isin(moved)].reset_index()
+        same = candidates.merge(old, on=['emp', 'mgr', 'score'])
+        removed = in_affected.copy()
+        removed[same['old'].to_numpy()] = False
+        inserted = new.drop(index=same['index']).sort_values(['score', 'src', 'pos'], ascending=[False, True, True],
+                                                            kind='stable')
+
+        insert_at = self._insertion_points(removed, inserted)
+        reassigned = self._merge_and_replay(removed, inserted, insert_at)
+
+        self.last_delta_stats = {
+            'changed_nodes': int(len(changed)),
+            'rescored_rows': int(np.count_nonzero(rows >= 0)),
+            'rescored_pairs': int(len(new)),
+            'removed_pairs': int(removed.sum()),
+            'inserted_pairs': int(len(inserted)),
+            'replayed_pairs': self._replayed,
+            'embedded_profiles': embedded,
+            'reassigned': len(reassigned),
+            'seconds': round(time.perf_counter() - started, 4),
+        }
+        return reassigned
+
+    def _insertion_points(self, removed, inserted):
+        """Position in the old ranking before which each inserted pair goes (ranking order is kept)."""
+        kept = np.flatnonzero(~removed)
+        kept_neg_scores = -self._scores[kept]
+        neg_scores = -inserted['score'].to_numpy()
+        lo = np.searchsorted(kept_neg_scores, neg_scores, side='left')
+        hi = np.searchsorted(kept_neg_scores, neg_scores, side='right')
+
+        # Equal scores are ordered by (employee row, adjacency position) like the full ranking
+        row_width = int(self.graph.degrees().max(initial=0)) + 1
+        tie_keys = inserted['src'].to_numpy() * row_width + inserted['pos'].to_numpy()
+        rank = lo.copy()
+        for i in np.flatnonzero(hi > lo):
+            ties = kept[lo[i]:hi[i]]
+            keys = self.graph.index_of(self._emp[ties]) * row_width + self._pos[ties]
+            rank[i] = lo[i] + np.searchsorted(keys, tie_keys[i])
+        return np.append(kept, len(removed))[rank]
+
+    def _merge_and_replay(self, removed, inserted, insert_at):
+        # One merged sequence: removed pairs exist only in the old scan, inserted only in the new
+        scores = np.insert(self._scores, insert_at, inserted['score'].to_numpy())
+        emp = np.insert(self._emp, insert_at, inserted['emp'].to_numpy())
+        mgr = np.insert(self._mgr, insert_at, inserted['mgr'].to_numpy())
+        pos = np.insert(self._pos, insert_at, inserted['pos'].to_numpy())
+        is_removed = np.insert(removed, insert_at, False)
+        is_inserted = np.insert(np.zeros(len(removed), dtype=bool), insert_at, True)
+        old_accepted = np.insert(self._accepted, insert_at, False)
+        accepted = old_accepted.copy()
+        emp_list, mgr_list = emp.tolist(), mgr.tolist()
+
+        old_at = np.flatnonzero(old_accepted)
+        old_choice = dict(zip(emp[old_at].tolist(), zip(old_at.tolist(), mgr[old_at].tolist())))
+        changes = np.flatnonzero(is_removed | is_inserted).tolist()
+
+        # The new scan's forest is the old one as of `base` plus the decisions made since
+        base, decided, diverged = 0, {}, set()
+
+        def new_manager(e):
+            if e in decided:
+                return decided[e]
+            choice = old_choice.get(e)
+            return choice[1] if choice is not None and choice[0] < base else None
+
+        def old_manager(e, processed):
+            choice = old_choice.get(e)
+            return choice[1] if choice is not None and choice[0] < processed else None
+
+        def root(e, manager, *args):
+            parent = manager(e, *args)
+            while parent is not None:
+                e, parent = parent, manager(parent, *args)
+            return e
+
+        def equivalent(processed):
+            # Later decisions only depend on who has a manager and which tree each employee is
+            # in, so the scans agree from here on once every diverged employee has a manager in
+            # both and sits under the same root
+            return all(new_manager(e) is not None and old_manager(e, processed) is not None
+                       and root(e, new_manager) == root(e, old_manager, processed) for e in diverged)
+
+        replayed, c, i, n = 0, 0, 0, len(scores)
+        moved = False
+        while True:
+            # Equivalence can only be reached after a tree changed or an employee (un)diverged
+            if not diverged or (moved and equivalent(i)):
+                # Continue from the old scan's state, skipping to the next changed pair
+                while c < len(changes) and changes[c] < i:
+                    c += 1
+                if c == len(changes):
+                    break
+                i = base = changes[c]
+                decided, diverged = {}, set()
+            if i == n:
+                break
+
+            e, m = emp_list[i], mgr_list[i]
+            moved = bool(old_accepted[i])
+            if not is_removed[i]:
+                ok = new_manager(e) is None
+                x = m
+                while ok and x is not None:
+                    ok = x != e  # e is a root, so reaching it from m would close a cycle
+                    x = new_manager(x)
+                accepted[i] = ok
+                if ok:
+                    decided[e] = m
+                    moved = True
+            if (new_manager(e) != old_manager(e, i + 1)) != (e in diverged):
+                diverged ^= {e}
+                moved = True
+            replayed += 1
+            i += 1
+
+        keep = ~is_removed
+        # An employee has at most one accepted pair per scan, so one whose manager changed has
+        # its old and/or new pair among the flipped ones
+        flipped = np.flatnonzero((accepted & keep) != old_accepted)
+        old_managers, new_managers = {}, {}
+        for i, e, m in zip(flipped.tolist(), emp[flipped].tolist(), mgr[flipped].tolist()):
+            (old_managers if old_accepted[i] else new_managers)[e] = m
+        reassigned = {e: (old_managers.get(e), new_managers.get(e)) for e in old_managers.keys() | new_managers.keys()
+                      if old_managers.get(e) != new_managers.get(e)}
+
+        self._scores, self._emp, self._mgr = scores[keep], emp[keep], mgr[keep]
+        self._pos, self._accepted = pos[keep], accepted[keep]
+        self._replayed = replayed
+        return reassigned
@@ -0,0 +1,114 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# --- Model loading and local snapshots ---
+# sentence_transformers (and with it torch) is imported only when a model is
+# actually loaded, so runs served entirely from the embedding cache never pay
+# for it. A snapshot directory holds the model weights, tokenizer and config as
+# written by SentenceTransformer.save(). Loading from it reads local files only:
+# no hub lookups or downloads, so containers with a baked-in snapshot start
+# quickly and work offline.
+
+DEFAULT_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+
+def is_snapshot(path):
+    return bool(path) and os.path.isfile(os.path.join(path, 'modules.json'))
+
+
+def load_model(model_name=DEFAULT_MODEL_NAME, snapshot_dir=None):
+    """Loads the sentence transformer from `snapshot_dir` when it holds a snapshot, else by name."""
+    if snapshot_dir and not is_snapshot(snapshot_dir):
+        raise FileNotFoundError(f"No model snapshot in '{snapshot_dir}' (expected modules.json); "
+                                f"create one with scripts/model_snapshot.py")
+    from sentence_transformers import SentenceTransformer
+    if snapshot_dir:
+        return SentenceTransformer(snapshot_dir, device='cpu', local_files_only=True)
+    return SentenceTransformer(model_name)
+
+
+def save_snapshot(snapshot_dir, model_name=DEFAULT_MODEL_NAME):
+    """Downloads (or reuses the hub cache for) `model_name` and saves a self-contained snapshot."""
+    model = load_model(model_name)
+    model.save(snapshot_dir)
+    return snapshot_dir
+
+
+class BackgroundModel:
+    """
+    Loads the model on a background thread so the server can accept connections
+    (and answer readiness probes) while it loads. `encode` waits for the load to
+    finish; `ready()` tells whether it has. A failed load is re-raised by encode.
+    """
+
+    def __init__(self, model_name=DEFAULT_MODEL_NAME, snapshot_dir=None, warmup=True):
+        self.model_name = model_name
+        self.snapshot_dir = snapshot_dir
+        self.warmup = warmup
+        self.model = None
+        self.error = None
+        self.load_seconds = None
+        self._loaded = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load, name='model-loader', daemon=True)
+                self._thread.start()
+        return self
+
+    def load(self):
+        """Loads in the calling thread (e.g. a server master before it forks workers) and returns self."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.current_thread()
+                self._load()
+        self._loaded.wait()
+        return self
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            model = load_model(self.model_name, self.snapshot_dir)
+            if self.warmup:
+                # The first forward pass initialises kernels and thread pools; pay for it here
+                model.encode(['warm-up'], show_progress_bar=False)
+            self.model = model
+        except Exception as e:
+            self.error = e
+        finally:
+            self.load_seconds = time.perf_counter() - start
+            self._loaded.set()
+
+    def ready(self):
+        return self._loaded.is_set() and self.error is None
+
+    def status(self):
+        if not self._loaded.is_set():
+            return 'loading' if self._thread is not None else 'not_started'
+        return 'failed' if self.error is not None else 'ready'
+
+    def encode(self, texts, **kwargs):
+        self.start()
+        self._loaded.wait()
+        if self.error is not None:
+            raise RuntimeError(f"Model failed to load: {self.error}") from self.error
+        return self.model.encode(texts, **kwargs)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Save a local, offline-loadable snapshot of the embedding model.')
+    parser.add_argument('--model_name', default=DEFAULT_MODEL_NAME)
+    parser.add_argument('--output_dir', default=os.path.join('models', DEFAULT_MODEL_NAME))
+    args = parser.parse_args()
+
+    save_snapshot(args.output_dir, args.model_name)
+    print(f"Saved '{args.model_name}' snapshot to {args.output_dir}. "
+          f"Use it with MODEL_SNAPSHOT_DIR={args.output_dir} or --model_dir {args.output_dir}.")
@@ -0,0 +1,125 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+import numpy as np
+import scipy.sparse as sp
+
+from scripts.scoring import candidate_edges, common_neighbor_adjacency, compute_edge_features, FEATURE_NAMES
+
+# --- Parallel candidate scoring ---
+# The candidate edge list is split into contiguous node-range shards with about
+# the same number of edges each (org graphs are usually one big connected
+# component, so components would not balance). The graph arrays, the
+# common-neighbour adjacency and the output feature matrix are placed in shared
+# memory once; each worker process attaches to them without copying and fills
+# the feature rows of its shard. The final `features @ weights` runs in the
+# parent exactly as in serial mode, so scores are bit-for-bit identical.
+
+# Below this many candidate edges the process start-up costs more than it saves
+PARALLEL_MIN_EDGES = 50_000
+
+_pools = {}
+# Server threads may ask for a pool concurrently; only one of them creates it
+_pools_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    """One persistent pool per worker count, reused across calls (e.g. server requests)."""
+    with _pools_lock:
+        if workers not in _pools:
+            # Workers fork from a clean single-threaded server, never from a process that
+            # may hold model / BLAS threads; spawn where forkserver is unavailable
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+        return _pools[workers]
+
+
+@atexit.register
+def _shutdown_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(cancel_futures=True)
+        _pools.clear()
+
+
+def _share(arrays):
+    """Copies arrays into new shared memory blocks; returns (blocks, specs for the workers)."""
+    blocks, specs = [], {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        specs[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, specs
+
+
+def _attach(specs):
+    blocks, arrays = [], {}
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return blocks, arrays
+
+
+def _fill_features(a, num_nodes, start, stop):
+    graph = SimpleNamespace(embeddings=a['embeddings'], has_embedding=a['has_embedding'],
+                            seniority=a['seniority'], location_codes=a['location_codes'])
+    adjacency = sp.csr_matrix((a['adj_data'], a['adj_indices'], a['adj_indptr']),
+                              shape=(num_nodes, num_nodes), copy=False)
+    compute_edge_features(graph, a['src'][start:stop], a['dst'][start:stop],
+                          adjacency=adjacency, out=a['features'][start:stop])
+
+
+def _score_shard(specs, num_nodes, start, stop):
+    blocks, arrays = _attach(specs)
+    try:
+        _fill_features(arrays, num_nodes, start, stop)
+    finally:
+        arrays.clear()  # views must go before the blocks can be closed
+        for block in blocks:
+            block.close()
+
+
+def shard_bounds(src, num_shards):
+    """Edge offsets splitting src-sorted edges into shards of similar size at node boundaries."""
+    targets = np.linspace(0, len(src), num_shards + 1).astype(np.int64)[1:-1]
+    # Move each cut back to the first edge of its employee so no row is split
+    cuts = np.searchsorted(src, src[np.minimum(targets, len(src) - 1)], side='left') if len(src) else targets
+    return np.unique(np.concatenate([[0], cuts, [len(src)]]))
+
+
+def score_candidate_edges_parallel(graph, weights, workers):
+    """Same result as score_candidate_edges, with feature extraction spread over `workers` processes."""
+    src, dst = candidate_edges(graph)
+    weights = np.asarray(weights, dtype=np.float64)
+    if workers <= 1 or len(src) < PARALLEL_MIN_EDGES:
+        features = compute_edge_features(graph, src, dst)
+        return src, dst, features @ weights
+
+    adjacency = common_neighbor_adjacency(graph)
+    blocks, specs = _share({
+        'embeddings': graph.embeddings, 'has_embedding': graph.has_embedding,
+        'seniority': graph.seniority, 'location_codes': graph.location_codes,
+        'adj_data': adjacency.data, 'adj_indices': adjacency.indices, 'adj_indptr': adjacency.indptr,
+        'src': src, 'dst': dst,
+        'features': np.empty((len(src), len(FEATURE_NAMES)), dtype=np.float64),
+    })
+    try:
+        bounds = shard_bounds(src, workers)
+        pool = _get_pool(workers)
+        futures = [pool.submit(_score_shard, specs, graph.number_of_nodes(), int(start), int(stop))
+                   for start, stop in zip(bounds[:-1], bounds[1:])]
+        for future in futures:
+            future.result()
+        features = np.ndarray((len(src), len(FEATURE_NAMES)), dtype=np.float64,
+                              buffer=blocks[-1].buf).copy()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return src, dst, features @ weights
@@ -0,0 +1,123 @@
+import numpy as np
+import scipy.sparse as sp
+from collections import namedtuple
+
+from scripts.graph_arrays import LOCATION_MISSING
+
+# --- Batched candidate scoring ---
+# Scores every (employee, candidate manager) edge of a CompactGraph in one pass
+# over its flat arrays: CSR adjacency for neighbours and common-neighbour counts,
+# the row-normalised embedding matrix for cosine similarity, and integer arrays
+# for seniority and location codes.
+
+ScoringWeights = namedtuple(
+    'ScoringWeights',
+    ['embedding_similarity', 'common_neighbors', 'seniority_gap', 'location_match']
+)
+
+# Feature columns, in the same order as ScoringWeights
+FEATURE_NAMES = list(ScoringWeights._fields)
+
+# Employees at this level (chief / CEO) are never assigned a manager
+TOP_SENIORITY = 7
+
+# Edges per block when taking row-wise dot products / sparse products
+EDGE_CHUNK_SIZE = 65536
+
+
+def candidate_edge_slots(graph, rows=None):
+    """
+    Returns (src, slots) for every edge the scorer considers, where `slots` are
+    positions in graph.indices: neighbours more senior than the employee, or all
+    neighbours when none are more senior. Employees at TOP_SENIORITY get no
+    candidates. `rows` restricts the result to those employee indices.
+    """
+    indptr, indices, seniority = graph.indptr, graph.indices, graph.seniority
+    degrees = np.diff(indptr)
+    if rows is None:
+        src = np.repeat(np.arange(len(degrees), dtype=np.int64), degrees)
+        slots = np.arange(len(indices), dtype=np.int64)
+    else:
+        rows = np.asarray(rows, dtype=np.int64)
+        row_degrees = degrees[rows]
+        src = np.repeat(rows, row_degrees)
+        row_starts = np.cumsum(row_degrees) - row_degrees
+        slots = np.repeat(indptr[rows] - row_starts, row_degrees) + np.arange(len(src), dtype=np.int64)
+    dst = indices[slots]
+
+    more_senior = seniority[dst] > seniority[src]
+    senior_counts = np.bincount(src[more_senior], minlength=len(degrees))
+    keep = more_senior | (senior_counts[src] == 0)
+    keep &= seniority[src] < TOP_SENIORITY
+    return src[keep], slots[keep]
+
+
+def candidate_edges(graph):
+    """Returns (src, dst) index arrays of every candidate edge (see candidate_edge_slots)."""
+    src, slots = candidate_edge_slots(graph)
+    return src, graph.indices[slots]
+
+
+def common_neighbor_adjacency(graph):
+    """0/1 CSR adjacency used for common-neighbour counts (self-loops removed)."""
+    # nx.common_neighbors excludes both endpoints, so self-loops must not count
+    n = len(graph.indptr) - 1
+    rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(graph.indptr))
+    off_diagonal = rows != graph.indices
+    return sp.csr_matrix(
+        (np.ones(off_diagonal.sum(), dtype=np.int32), (rows[off_diagonal], graph.indices[off_diagonal])),
+        shape=(n, n)
+    )
+
+
+def compute_edge_features(graph, src, dst, adjacency=None, out=None):
+    """
+    Computes the raw per-edge signals as an (edges x 4) float64 matrix with columns
+    FEATURE_NAMES: cosine similarity, common-neighbour count, 1 / seniority gap
+    (0 when the gap is not positive) and location match (0/1). A precomputed
+    common_neighbor_adjacency and an output matrix to fill can be passed in.
+    """
+    features = np.zeros((len(src), len(FEATURE_NAMES)), dtype=np.float64) if out is None else out
+    if adjacency is None:
+        adjacency = common_neighbor_adjacency(graph)
+    embeddings, has_embedding = graph.embeddings, graph.has_embedding
+
+    for start in range(0, len(src), EDGE_CHUNK_SIZE):
+        s = src[start:start + EDGE_CHUNK_SIZE]
+        d = dst[start:start + EDGE_CHUNK_SIZE]
+
+        similarity = np.einsum('ij,ij->i', embeddings[s], embeddings[d])
+        features[start:start + len(s), 0] = np.where(has_embedding[s] & has_embedding[d], similarity, 0.0)
+
+        common = adjacency[s].multiply(adjacency[d]).sum(axis=1)
+        features[start:start + len(s), 1] = np.asarray(common).ravel()
+
+    gap = (graph.seniority[dst] - graph.seniority[src]).astype(np.float64)
+    features[:, 2] = np.divide(1.0, gap, out=np.zeros_like(gap), where=gap > 0)
+
+    loc_src, loc_dst = graph.location_codes[src], graph.location_codes[dst]
+    features[:, 3] = (loc_src == loc_dst) & (loc_src != LOCATION_MISSING)
+    return features
+
+
+def score_candidate_edges(graph, weights):
+    """Returns (src, dst, scores) for every candidate edge, scores = features @ weights."""
+    src, dst = candidate_edges(graph)
+    features = compute_edge_features(graph, src, dst)
+    scores = features @ np.asarray(weights, dtype=np.float64)
+    return src, dst, scores
+
+
+def ranked_candidate_pairs(graph, src, dst, scores):
+    """
+    Sorts scored edges by descending score into the (score, employee_id, manager_id)
+    list consumed by the assignment step. The sort is stable, so ties keep
+    node/neighbour order exactly like list.sort(reverse=True) on the per-node output.
+    """
+    order = np.argsort(-scores, kind='stable')
+    node_ids = graph.node_ids
+    return list(zip(
+        scores[order].tolist(),
+        node_ids[src[order]].tolist(),
+        node_ids[dst[order]].tolist(),
+    ))
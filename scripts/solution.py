@@ -1,13 +1,22 @@
 import pandas as pd
 import numpy as np
-import networkx as nx
-from tqdm import tqdm
 import re
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import argparse
-
-print("--- Manager Prediction using Hybrid Scoring (Embeddings + Graph Features) ---")
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.ann_index import similar_candidate_edges
+from scripts.artifacts import ArtifactBundle, stage_keys
+from scripts.assignment import assign_greedy, assign_arborescence
+from scripts.candidate_index import CandidateIndex, DEFAULT_TOPK
+from scripts.data_io import read_employees, read_connections
+from scripts.embedding_cache import EmbeddingCache
+from scripts.model_snapshot import load_model
+from scripts.graph_arrays import CompactGraph
+from scripts.parallel_scoring import score_candidate_edges_parallel
+from scripts.scoring import ScoringWeights, score_candidate_edges, ranked_candidate_pairs, compute_edge_features
+from scripts.tracing import stage, echo, show_progress, Tracer, tracing, enable_memory_tracing
 
 # --- 1. CONFIGURATION: The Weights ---
 WEIGHT_EMBEDDING_SIMILARITY = 1.0
@@ -15,161 +24,265 @@ WEIGHT_COMMON_NEIGHBORS = 1.0
 WEIGHT_SENIORITY_GAP = 1.0
 WEIGHT_LOCATION_MATCH = 0.0
 
+MODEL_NAME = 'all-MiniLM-L6-v2'
+# Directory written by scripts/model_snapshot.py; when set, the model loads from local files only
+MODEL_SNAPSHOT_DIR = os.environ.get('MODEL_SNAPSHOT_DIR') or None
+DEFAULT_EMBEDDING_CACHE_DIR = '.embedding_cache'
+ASSIGNMENT_MODES = ['greedy', 'arborescence']
+
 # --- 2. DATA LOADING ---
 def load_data(employees_path, connections_path):
-    """Loads employee and connection data."""
+    """
+    Loads employee and connection data. Each path may be a CSV (optionally
+    compressed), Parquet or Arrow IPC file; the format follows the extension.
+    """
     print("Step 1: Loading data...")
     try:
-        employees_df = pd.read_csv(employees_path, engine='python')
-        connections_df = pd.read_csv(connections_path)
+        employees_df = read_employees(employees_path)
+        connections_df = read_connections(connections_path)
         print(f"Loaded {len(employees_df)} employees and {len(connections_df)} connections.")
         return employees_df, connections_df
     except FileNotFoundError as e:
-        print(f"Error: {e}. Please ensure required CSV files are present.")
+        print(f"Error: {e}. Please ensure required input files are present.")
         return None, None
 
 # --- 3. FEATURE ENGINEERING & GRAPH CONSTRUCTION ---
-def build_graph_with_features(employees_df, connections_df, model=None):
-    """Builds the graph and enriches it with all necessary node attributes."""
-    print("Step 2: Engineering features and building graph...")
-    
-    print("   - Generating text embeddings...")
-    
-    employees_df['combined_text'] = employees_df['job_title_current'].fillna('') + ". " + employees_df['profile_summary'].fillna('')
-    
-    # Use preloaded model if provided, otherwise load it here
-    if model is None:
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-
-    # Batch process all embeddings at once - much faster than encoding one by one
-    embeddings = model.encode(employees_df['combined_text'].tolist(), show_progress_bar=True)
-    
-    # Map employee IDs to their embeddings
-    embedding_dict = {emp_id: emb for emp_id, emb in zip(employees_df['employee_id'], embeddings)}
-
-    def get_seniority(title):
-        """Extract seniority level from job title using regex patterns."""
-        title = str(title).lower()
-        # Return as soon as we find a match - no need to check remaining patterns
-        if re.search(r'\b(chief|ceo)\b', title): return 7
-        if re.search(r'\b(vp|vice president)\b', title): return 6
-        if re.search(r'\b(director|head)\b', title): return 5
-        if re.search(r'\b(manager|lead)\b', title): return 4
-        if re.search(r'\b(senior|principal|sr\.)\b', title): return 3
-        if re.search(r'\b(junior|entry|associate)\b', title): return 1
-        return 2
-
-    employees_df['seniority_score'] = employees_df['job_title_current'].apply(get_seniority)
-
-    print("   - Constructing NetworkX graph...")
-    G = nx.Graph()
-    
-    node_attributes = employees_df.set_index('employee_id').to_dict('index')
-
-    for node_id, attrs in node_attributes.items():
-        attrs['embedding'] = embedding_dict.get(node_id)
-
-    # nx.set_node_attributes automatically creates nodes, so no need to add them manually first
-    nx.set_node_attributes(G, node_attributes)
-    G.add_edges_from(connections_df.values)
-
-    print(f"   - Graph built with {G.number_of_nodes()} nodes and {G.number_of_edges()} edges.")
+def get_seniority(title):
+    """Extract seniority level from job title using regex patterns."""
+    title = str(title).lower()
+    # Return as soon as we find a match - no need to check remaining patterns
+    if re.search(r'\b(chief|ceo)\b', title): return 7
+    if re.search(r'\b(vp|vice president)\b', title): return 6
+    if re.search(r'\b(director|head)\b', title): return 5
+    if re.search(r'\b(manager|lead)\b', title): return 4
+    if re.search(r'\b(senior|principal|sr\.)\b', title): return 3
+    if re.search(r'\b(junior|entry|associate)\b', title): return 1
+    return 2
+
+def profile_text(employees_df):
+    """The text that gets embedded for each employee: current title + profile summary."""
+    return employees_df['job_title_current'].fillna('') + ". " + employees_df['profile_summary'].fillna('')
+
+def embed_profiles(employees_df, model=None, embedding_cache=None):
+    """
+    Adds the `combined_text` column (title + summary) and returns its embeddings,
+    one row per employee. When an EmbeddingCache is given, only texts missing from
+    it are encoded and the model is loaded only if there is at least one miss.
+    """
+    employees_df['combined_text'] = profile_text(employees_df)
+
+    def encode(texts):
+        # Use preloaded model if provided, otherwise load it here
+        nonlocal model
+        if model is None:
+            # Loaded (and torch imported) only on a cache miss; scoring workers never get here
+            model = load_model(MODEL_NAME, MODEL_SNAPSHOT_DIR)
+        # Batch process all embeddings at once - much faster than encoding one by one
+        return model.encode(texts, show_progress_bar=show_progress())
+
+    with stage('embed', items=len(employees_df)):
+        if embedding_cache is not None:
+            embeddings = embedding_cache.get_embeddings(employees_df['combined_text'].tolist(), encode)
+            stats = embedding_cache.stats()
+            echo(f"   - Embedding cache: {stats['hits']} hits, {stats['misses']} misses ({stats['entries']} cached).")
+            return embeddings
+        return encode(employees_df['combined_text'].tolist())
+
+def artifact_keys(employees_df, connections_df):
+    """Per-stage input keys of a snapshot, as stored in artifact bundles (scripts/artifacts.py)."""
+    return stage_keys(employees_df, connections_df, MODEL_NAME, profile_text(employees_df))
+
+def build_graph_with_features(employees_df, connections_df, model=None, embedding_cache=None, artifacts=None):
+    """
+    Builds the graph and enriches it with all necessary node attributes.
+    See embed_profiles for how the model and embedding cache are used. With an
+    ArtifactBundle, stages whose inputs match the bundle are memory-mapped from it.
+    """
+    echo("Step 2: Engineering features and building graph...")
+    keys = artifact_keys(employees_df, connections_df) if artifacts is not None else {}
+    if artifacts is not None and artifacts.matches('graph', keys['graph']):
+        echo("   - Inputs match the artifact bundle: memory-mapping the graph and embeddings.")
+        with stage('artifacts_load', items=len(employees_df)):
+            employees_df['combined_text'] = profile_text(employees_df)
+            G = artifacts.graph(employees_df)
+            employees_df['seniority_score'] = G.seniority[:len(employees_df)].astype(np.int64)
+        return G
+
+    echo("   - Generating text embeddings...")
+    normalized = artifacts is not None and artifacts.matches('embeddings', keys['embeddings'])
+    if normalized:
+        echo("   - Profiles match the artifact bundle: memory-mapping embeddings.")
+        employees_df['combined_text'] = profile_text(employees_df)
+        embeddings = artifacts.employee_embeddings(len(employees_df))
+    else:
+        embeddings = embed_profiles(employees_df, model=model, embedding_cache=embedding_cache)
+
+    with stage('seniority', items=len(employees_df)):
+        employees_df['seniority_score'] = employees_df['job_title_current'].apply(get_seniority)
+
+    echo("   - Constructing compact graph...")
+    # Id -> row index, CSR adjacency and one float32 embedding matrix instead of per-node dicts
+    with stage('graph_build', items=len(employees_df)):
+        G = CompactGraph.from_frames(employees_df, connections_df, embeddings, normalized=normalized)
+
+    echo(f"   - Graph built with {G.number_of_nodes()} nodes and {G.number_of_edges()} edges "
+          f"({G.nbytes() / 1e6:.1f} MB).")
     return G
 
 # --- 4. THE INFERENCE ALGORITHM ---
-def score_potential_managers(employee_id, G):
-    employee_attrs = G.nodes[employee_id]
-    employee_seniority = employee_attrs.get('seniority_score', 0)
-    employee_embedding = employee_attrs.get('embedding')
-
-    if employee_seniority >= 7:
-        return []
-
-    neighbors = list(G.neighbors(employee_id))
-    if not neighbors:
-        return []
-
-    candidates = [n_id for n_id in neighbors if G.nodes[n_id].get('seniority_score', 0) > employee_seniority]
-    if not candidates:
-        candidates = neighbors
-
-    scored_candidates = []
-    for cand_id in candidates:
-        cand_attrs = G.nodes[cand_id]
-        score = 0
-
-        cand_embedding = cand_attrs.get('embedding')
-        if employee_embedding is not None and cand_embedding is not None:
-            # <-- Inefficient: recomputing same reshape every time
-            similarity = cosine_similarity(
-                np.array(employee_embedding).reshape(1, -1),
-                np.array(cand_embedding).reshape(1, -1)
-            )[0][0]
-            score += similarity * WEIGHT_EMBEDDING_SIMILARITY
-
-        # <-- Inefficient: repeated list conversion inside loop
-        common_neighbors = len(list(nx.common_neighbors(G, employee_id, cand_id)))
-        score += common_neighbors * WEIGHT_COMMON_NEIGHBORS
-
-        seniority_gap = cand_attrs.get('seniority_score', 0) - employee_seniority
-        if seniority_gap > 0:
-            score += (1.0 / seniority_gap) * WEIGHT_SENIORITY_GAP
-
-        if cand_attrs.get('location') == employee_attrs.get('location'):
-            score += WEIGHT_LOCATION_MATCH
-
-        scored_candidates.append((score, employee_id, cand_id))
-
-    return scored_candidates
-
-def predict_managers_globally(G):
-    all_possible_pairs = []
-    print("Step 3: Scoring all possible employee-manager pairs...")
-    for emp_id in tqdm(G.nodes(), desc="Scoring Progress"):
-        all_possible_pairs.extend(score_potential_managers(emp_id, G))
-
-    all_possible_pairs.sort(key=lambda x: x[0], reverse=True)
-
-    print("\nStep 4: Building hierarchy and preventing cycles...")
-    final_predictions = {}
-    assigned_employees = set()
-    hierarchy_graph = nx.DiGraph()
-
-    for score, emp_id, mgr_id in tqdm(all_possible_pairs, desc="Assigning Managers"):
-        if emp_id in assigned_employees:
-            continue
-
-        hierarchy_graph.add_edge(emp_id, mgr_id)
-
-        if nx.is_directed_acyclic_graph(hierarchy_graph):
-            final_predictions[emp_id] = mgr_id
-            assigned_employees.add(emp_id)
+def get_scoring_weights():
+    """Collects the module-level weights (read at call time so they can be tweaked)."""
+    return ScoringWeights(
+        embedding_similarity=WEIGHT_EMBEDDING_SIMILARITY,
+        common_neighbors=WEIGHT_COMMON_NEIGHBORS,
+        seniority_gap=WEIGHT_SENIORITY_GAP,
+        location_match=WEIGHT_LOCATION_MATCH,
+    )
+
+def score_potential_managers(G):
+    """
+    Scores every (employee, candidate manager) pair in the graph in one batched pass
+    and returns them as (score, employee_id, manager_id) tuples sorted by descending score.
+    """
+    src, dst, scores = score_candidate_edges(G, get_scoring_weights())
+    return ranked_candidate_pairs(G, src, dst, scores)
+
+def predict_managers_globally(G, assignment='greedy', on_stage=None, workers=1, artifacts=None,
+                              similar_candidates=0, on_candidates=None, topk=DEFAULT_TOPK):
+    """
+    Predicts one manager per employee. 'greedy' accepts pairs in descending score
+    order while preventing cycles; 'arborescence' computes the maximum-weight
+    spanning forest over all candidate edges. `on_stage`, if given, is called with
+    'score' and then 'assign' as each step starts. `workers` > 1 scores in that
+    many processes; the result is identical to serial scoring. When G was loaded
+    from `artifacts`, the stored candidate features are only multiplied by the weights.
+    `similar_candidates` > 0 also scores that many embedding-similar, more-senior
+    employees (approximate nearest neighbours, scripts/ann_index.py) for every
+    employee the connections give no candidate. `on_candidates`, if given, is
+    called with the CandidateIndex of every employee's `topk` best candidates.
+    """
+    if assignment not in ASSIGNMENT_MODES:
+        raise ValueError(f"Unknown assignment mode '{assignment}'. Expected one of {ASSIGNMENT_MODES}")
+
+    if on_stage:
+        on_stage('score')
+    echo("Step 3: Scoring all possible employee-manager pairs...")
+    cached = artifacts.candidates(G) if artifacts is not None else None
+    with stage('score') as span:
+        if cached is not None:
+            src, dst, features = cached
+            scores = features @ np.asarray(get_scoring_weights(), dtype=np.float64)
+        elif workers > 1:
+            src, dst, scores = score_candidate_edges_parallel(G, get_scoring_weights(), workers)
         else:
-            hierarchy_graph.remove_edge(emp_id, mgr_id)
+            src, dst, scores = score_candidate_edges(G, get_scoring_weights())
+        span.items = len(scores)
+    if similar_candidates > 0:
+        with stage('similar_candidates') as span:
+            extra_src, extra_dst = similar_candidate_edges(G, src, dst, k=similar_candidates)
+            extra_scores = compute_edge_features(G, extra_src, extra_dst) @ np.asarray(get_scoring_weights(),
+                                                                                       dtype=np.float64)
+            src, dst = np.concatenate([src, extra_src]), np.concatenate([dst, extra_dst])
+            scores = np.concatenate([scores, extra_scores])
+            span.items = len(extra_src)
+        echo(f"   - Added {len(extra_src)} embedding-similar candidates for employees without candidates.")
+    echo(f"   - Scored {len(scores)} candidate pairs.")
+    if on_candidates:
+        with stage('candidate_index', items=len(scores)):
+            # Stored features cover the connection candidates only, not the similar ones appended after them
+            stored = features if cached is not None and len(features) == len(scores) else None
+            on_candidates(CandidateIndex.from_scored_edges(G, src, dst, scores, get_scoring_weights(),
+                                                           k=topk, features=stored))
+    if on_stage:
+        on_stage('assign')
+
+    with stage('assign', items=len(scores)):
+        if assignment == 'arborescence':
+            echo("\nStep 4: Computing maximum-weight spanning arborescence...")
+            managers = assign_arborescence(G.number_of_nodes(), src, dst, scores)
+            assigned = np.flatnonzero(managers >= 0)
+            return dict(zip(G.node_ids[assigned].tolist(), G.node_ids[managers[assigned]].tolist()))
+
+        all_possible_pairs = ranked_candidate_pairs(G, src, dst, scores)
+
+        echo("\nStep 4: Building hierarchy and preventing cycles...")
+        # Union-find over the forest rejects cycle-closing pairs without a full DAG check
+        final_predictions = assign_greedy(all_possible_pairs, show_progress=show_progress())
 
     return final_predictions
 
+def build_submission(employees_df, manager_predictions):
+    """Maps predictions onto every employee: unassigned -> 0, the CEO -> -1."""
+    # Create submission dataframe and map predictions directly
+    submission_df = pd.DataFrame({'employee_id': employees_df['employee_id']})
+    submission_df['manager_id'] = submission_df['employee_id'].map(manager_predictions).fillna(0).astype(int)
+
+    submission_df.loc[submission_df['employee_id'] == 358, 'manager_id'] = -1
+    return submission_df
+
 # --- 5. MAIN EXECUTION ---
 if __name__ == "__main__":
+    print("--- Manager Prediction using Hybrid Scoring (Embeddings + Graph Features) ---")
+
     parser = argparse.ArgumentParser()
-    parser.add_argument('--employees_path', default='data/employees.csv')
-    parser.add_argument('--connections_path', default='data/connections.csv')
+    parser.add_argument('--employees_path', default='data/employees.csv',
+                        help='Employees table (.csv, .parquet or .arrow/.feather)')
+    parser.add_argument('--connections_path', default='data/connections.csv',
+                        help='Connections table (.csv, .parquet or .arrow/.feather)')
     parser.add_argument('--output_path', default='submission.csv')
+    parser.add_argument('--assignment', choices=ASSIGNMENT_MODES, default='greedy',
+                        help="greedy: score-ordered with cycle prevention; arborescence: optimal spanning forest")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes used to score candidate pairs (1 = serial; results are identical)")
+    parser.add_argument('--embedding_cache_dir', default=DEFAULT_EMBEDDING_CACHE_DIR,
+                        help="On-disk embedding cache location; pass '' to disable caching")
+    parser.add_argument('--model_dir', default=MODEL_SNAPSHOT_DIR,
+                        help="Load the model from a local snapshot (see scripts/model_snapshot.py)")
+    parser.add_argument('--artifacts', default=None,
+                        help="Artifact bundle from scripts/build_artifacts.py; unchanged stages are memory-mapped from it")
+    parser.add_argument('--similar_candidates', type=int, default=0,
+                        help="Also score this many embedding-similar, more-senior employees for employees "
+                             "whose connections give no candidate (0 = connections only)")
+    parser.add_argument('--topk', type=int, default=0,
+                        help="Also write each employee's K best candidate managers, with each signal's "
+                             "contribution to the score, to --candidates_path")
+    parser.add_argument('--candidates_path', default='candidates.csv')
+    parser.add_argument('--trace', action='store_true',
+                        help="Print wall time, CPU time, peak memory and item counts per stage")
     args = parser.parse_args()
+    MODEL_SNAPSHOT_DIR = args.model_dir
 
     employees, connections = load_data(args.employees_path, args.connections_path)
 
     if employees is not None:
-        company_graph = build_graph_with_features(employees, connections)
-        manager_predictions = predict_managers_globally(company_graph)
-
-        print("\nStep 5: Generating Submission File...")
-
-        # Create submission dataframe and map predictions directly
-        submission_df = pd.DataFrame({'employee_id': employees['employee_id']})
-        submission_df['manager_id'] = submission_df['employee_id'].map(manager_predictions).fillna(0).astype(int)
-
-        submission_df.loc[submission_df['employee_id'] == 358, 'manager_id'] = -1
-
-        submission_df.to_csv(args.output_path, index=False)
+        tracer = Tracer()
+        if args.trace:
+            enable_memory_tracing()
+        with tracing(tracer if args.trace else None):
+            cache = EmbeddingCache(args.embedding_cache_dir, MODEL_NAME) if args.embedding_cache_dir else None
+            artifacts = ArtifactBundle(args.artifacts) if args.artifacts else None
+            candidate_indexes = []
+            company_graph = build_graph_with_features(employees, connections, embedding_cache=cache, artifacts=artifacts)
+            manager_predictions = predict_managers_globally(company_graph, assignment=args.assignment,
+                                                            workers=args.workers, artifacts=artifacts,
+                                                            similar_candidates=args.similar_candidates,
+                                                            on_candidates=candidate_indexes.append if args.topk > 0 else None,
+                                                            topk=args.topk)
+
+            print("\nStep 5: Generating Submission File...")
+
+            with stage('csv_write', items=len(employees)):
+                submission_df = build_submission(employees, manager_predictions)
+                submission_df.to_csv(args.output_path, index=False)
+            if candidate_indexes:
+                with stage('csv_write', items=len(candidate_indexes[0])):
+                    candidate_indexes[0].to_frame().to_csv(args.candidates_path, index=False, float_format='%.6f')
+                print(f"Top-{args.topk} candidate managers per employee saved as '{args.candidates_path}'.")
         print(f"\nProcessing complete. Cycle-free submission file saved as '{args.output_path}'.")
+
+        if args.trace:
+            print(f"\n{'stage':<12} {'wall ms':>10} {'cpu ms':>10} {'peak MB':>9} {'items':>10}")
+            for span in tracer.spans:
+                peak = f"{span.peak_bytes / 1e6:.1f}" if span.peak_bytes is not None else '-'
+                print(f"{span.name:<12} {span.wall_seconds * 1000:>10.1f} {span.cpu_seconds * 1000:>10.1f} "
+                      f"{peak:>9} {span.items if span.items is not None else '-':>10}")
@@ -0,0 +1,175 @@
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+# --- Pipeline stage tracing ---
+# Pipeline steps are wrapped in `stage(name)`. While a Tracer is active in the
+# current context (one per server request or job), each stage records its wall
+# time, the CPU time of the calling thread, an item count and, when memory
+# tracing is on, the peak of traced allocations. Finished spans are passed to the
+# tracer's listeners, e.g. the server's Prometheus metrics. When no tracer is
+# active, or PIPELINE_TRACING=0, a stage costs one context-variable lookup.
+#
+# CPU time is per thread, so work done in scoring worker processes is not
+# included. tracemalloc is process-wide: with concurrent requests the peak is an
+# upper bound for a single stage. Each stage resets the tracemalloc peak, so the
+# peak reached so far is first folded into every enclosing stage of the context,
+# and nested stages leave their parents' peaks intact.
+
+TRACING_ENABLED = os.environ.get('PIPELINE_TRACING', '1') != '0'
+
+logger = logging.getLogger('pipeline')
+_current_tracer = contextvars.ContextVar('pipeline_tracer', default=None)
+# [peak so far] of each open stage measuring memory in this context, outermost first
+_open_peaks = contextvars.ContextVar('pipeline_open_peaks', default=())
+_structured_logging = False
+
+
+class Span:
+    """Measurements of one stage run."""
+
+    __slots__ = ('name', 'items', 'wall_seconds', 'cpu_seconds', 'peak_bytes')
+
+    def __init__(self, name, items=None):
+        self.name = name
+        self.items = items
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_bytes = None
+
+    def to_dict(self):
+        return {'stage': self.name, 'items': self.items, 'wall_ms': round(self.wall_seconds * 1000, 3),
+                'cpu_ms': round(self.cpu_seconds * 1000, 3), 'peak_bytes': self.peak_bytes}
+
+
+class Tracer:
+    """Collects the spans of one request or run; `fields` are attached to structured log lines."""
+
+    def __init__(self, listeners=(), **fields):
+        self.listeners = list(listeners)
+        self.fields = fields
+        self.spans = []
+
+    def record(self, span):
+        self.spans.append(span)
+        for listener in self.listeners:
+            listener(span)
+        if _structured_logging:
+            log_event('stage', **self.fields, **span.to_dict())
+
+    def server_timing(self):
+        """Server-Timing header value: one `name;dur=<ms>` entry per span."""
+        return ', '.join(f'{span.name};dur={span.wall_seconds * 1000:.1f}' for span in self.spans)
+
+    def summary(self):
+        return [span.to_dict() for span in self.spans]
+
+
+def activate(tracer):
+    """Makes `tracer` the current one for this context; returns a token for deactivate()."""
+    return _current_tracer.set(tracer if TRACING_ENABLED else None)
+
+
+def deactivate(token):
+    _current_tracer.reset(token)
+
+
+@contextlib.contextmanager
+def tracing(tracer):
+    token = activate(tracer)
+    try:
+        yield tracer
+    finally:
+        deactivate(token)
+
+
+@contextlib.contextmanager
+def stage(name, items=None):
+    """
+    Times the enclosed block as stage `name`. The yielded Span's `items` may be
+    set inside the block once the count is known.
+    """
+    span = Span(name, items)
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield span
+        return
+
+    memory = tracemalloc.is_tracing()
+    if memory:
+        memory_before, peak = tracemalloc.get_traced_memory()
+        enclosing = _open_peaks.get()
+        for open_peak in enclosing:
+            open_peak[0] = max(open_peak[0], peak)
+        tracemalloc.reset_peak()
+        own_peak = [memory_before]
+        peaks_token = _open_peaks.set(enclosing + (own_peak,))
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield span
+    finally:
+        span.wall_seconds = time.perf_counter() - wall_start
+        span.cpu_seconds = time.thread_time() - cpu_start
+        if memory:
+            _open_peaks.reset(peaks_token)
+            peak = max(own_peak[0], tracemalloc.get_traced_memory()[1])
+            span.peak_bytes = max(peak - memory_before, 0)
+        tracer.record(span)
+
+
+def enable_memory_tracing():
+    """Starts tracemalloc so stages report allocation peaks (slows allocation-heavy code)."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+# --- Structured logging ---
+# In server context the CLI's progress prints and tqdm bars are replaced by one
+# JSON object per line on stderr: stage spans, requests and, at DEBUG level, the
+# pipeline's progress messages.
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {'ts': round(record.created, 3), 'level': record.levelname.lower(),
+                 'logger': record.name, 'message': record.getMessage()}
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_structured_logging(level='INFO', stream=None):
+    """Switches progress output to JSON log lines on `stream` (stderr by default)."""
+    global _structured_logging
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter())
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+    _structured_logging = True
+
+
+def structured_logging_enabled():
+    return _structured_logging
+
+
+def show_progress():
+    """Whether progress bars should be drawn (CLI yes, structured server logs no)."""
+    return not _structured_logging
+
+
+def log_event(event, **fields):
+    logger.info(event, extra={'fields': dict(fields, event=event)})
+
+
+def echo(message):
+    """Progress message: printed in CLI mode, a DEBUG log record in structured mode."""
+    if _structured_logging:
+        logger.debug(message.strip())
+    else:
+        print(message)
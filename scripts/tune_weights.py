@@ -0,0 +1,232 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dependencies.evaluate import manager_accuracy
+from scripts.artifacts import ArtifactBundle
+from scripts.assignment import assign_greedy, assign_arborescence
+from scripts.embedding_cache import EmbeddingCache
+from scripts.scoring import FEATURE_NAMES, candidate_edges, compute_edge_features, ranked_candidate_pairs
+from scripts.solution import (load_data, build_graph_with_features, build_submission, get_scoring_weights,
+                              ASSIGNMENT_MODES, MODEL_NAME, DEFAULT_EMBEDDING_CACHE_DIR)
+import scripts.solution as solution
+
+# --- Weight tuning ---
+# Scores are `features @ weights`, and the features do not depend on the
+# weights. The harness therefore builds the graph and the (candidate pairs x
+# features) matrix once, then evaluates each weight vector with one
+# matrix-vector product, the normal assignment step and the accuracy measure of
+# dependencies/evaluate.py. Candidates are spread over worker processes that
+# each receive the feature matrix once.
+#
+# Ranking (greedy) and the optimal forest (arborescence) are both unchanged by
+# scaling all weights by a positive factor, so vectors that differ only in
+# scale are evaluated once.
+
+DEFAULT_GRID = '0,0.5,1,2'
+
+# Below this many (candidate pairs x weight vectors) worker start-up costs more than it saves
+PARALLEL_MIN_WORK = 5_000_000
+
+
+class AccuracyEvaluator:
+    """
+    Vectorised equivalent of manager_accuracy(build_submission(employees_df, predictions), ground_truth_df)
+    for repeated evaluation of prediction dicts against one ground truth.
+    """
+
+    def __init__(self, employees_df, ground_truth_df):
+        # An empty prediction yields 0 for every employee and -1 for the CEO
+        base = build_submission(employees_df, {})
+        merged = ground_truth_df[['employee_id', 'manager_id']].merge(
+            base, on='employee_id', how='left', suffixes=('', '_base'))
+        self.employee_ids = merged['employee_id'].to_numpy()
+        self.true_managers = merged['manager_id'].to_numpy()
+        # Missing from the submission or fixed to -1: never counted as correct
+        self.excluded = merged['manager_id_base'].isna().to_numpy() | (merged['manager_id_base'] == -1).to_numpy()
+        self.total = len(ground_truth_df)
+
+    def accuracy(self, predictions):
+        predicted = np.fromiter((predictions.get(e, 0) for e in self.employee_ids.tolist()),
+                                dtype=np.int64, count=len(self.employee_ids))
+        correct = (predicted == self.true_managers) & ~self.excluded
+        return int(correct.sum()) / self.total if self.total else 0.0
+
+
+def assign(node_ids, src, dst, scores, assignment):
+    """The assignment step of predict_managers_globally for precomputed scores."""
+    if assignment == 'arborescence':
+        managers = assign_arborescence(len(node_ids), src, dst, scores)
+        assigned = np.flatnonzero(managers >= 0)
+        return dict(zip(node_ids[assigned].tolist(), node_ids[managers[assigned]].tolist()))
+    pairs = ranked_candidate_pairs(SimpleNamespace(node_ids=node_ids), src, dst, scores)
+    return assign_greedy(pairs, show_progress=False)
+
+
+def evaluate_weights(weights_list, node_ids, src, dst, features, evaluator, assignment='greedy'):
+    """Accuracy of each weight vector over the same candidate features."""
+    results = []
+    for weights in weights_list:
+        scores = features @ np.asarray(weights, dtype=np.float64)
+        results.append(evaluator.accuracy(assign(node_ids, src, dst, scores, assignment)))
+    return results
+
+
+# Per-worker state, set once by the pool initializer
+_worker_state = None
+
+
+def _init_worker(*state):
+    global _worker_state
+    _worker_state = state
+
+
+def _evaluate_batch(weights_list):
+    node_ids, src, dst, features, evaluator, assignment = _worker_state
+    return evaluate_weights(weights_list, node_ids, src, dst, features, evaluator, assignment)
+
+
+def grid_weights(values_per_feature):
+    """Cartesian product of the candidate values of each feature."""
+    return [tuple(float(v) for v in combo) for combo in itertools.product(*values_per_feature)]
+
+
+def random_weights(count, seed=0, high=2.0):
+    """`count` vectors drawn uniformly from [0, high] per feature."""
+    rng = np.random.default_rng(seed)
+    return [tuple(row) for row in rng.uniform(0.0, high, size=(count, len(FEATURE_NAMES))).round(4).tolist()]
+
+
+def scale_key(weights):
+    """Identifies weight vectors that only differ by a positive factor."""
+    weights = np.asarray(weights, dtype=np.float64)
+    top = np.abs(weights).max()
+    return tuple(np.round(weights / top, 9).tolist()) if top > 0 else tuple(weights.tolist())
+
+
+def unique_up_to_scale(weights_list):
+    seen, unique = set(), []
+    for weights in weights_list:
+        key = scale_key(weights)
+        if key not in seen:
+            seen.add(key)
+            unique.append(tuple(weights))
+    return unique
+
+
+def tune(weights_list, node_ids, src, dst, features, evaluator, assignment='greedy', workers=1, batch_size=16):
+    """Returns a DataFrame with one row per distinct weight vector, best accuracy first."""
+    weights_list = unique_up_to_scale(weights_list)
+    batches = [weights_list[i:i + batch_size] for i in range(0, len(weights_list), batch_size)]
+    state = (np.asarray(node_ids), np.asarray(src), np.asarray(dst), np.asarray(features), evaluator, assignment)
+
+    if workers > 1 and len(batches) > 1 and len(src) * len(weights_list) >= PARALLEL_MIN_WORK:
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method),
+                                 initializer=_init_worker, initargs=state) as pool:
+            accuracies = [a for batch in pool.map(_evaluate_batch, batches) for a in batch]
+    else:
+        accuracies = evaluate_weights(weights_list, *state)
+
+    results = pd.DataFrame(weights_list, columns=FEATURE_NAMES)
+    results['accuracy'] = accuracies
+    # Stable sort keeps the enumeration order among ties
+    return results.sort_values('accuracy', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def load_candidate_features(employees_df, connections_df, embedding_cache=None, artifacts=None):
+    """Builds the graph and its candidate feature matrix (mapped from `artifacts` when current)."""
+    graph = build_graph_with_features(employees_df, connections_df, embedding_cache=embedding_cache, artifacts=artifacts)
+    cached = artifacts.candidates(graph) if artifacts is not None else None
+    if cached is not None:
+        src, dst, features = cached
+    else:
+        print("Step 3: Computing candidate pairs and their features...")
+        src, dst = candidate_edges(graph)
+        features = compute_edge_features(graph, src, dst)
+    return graph, src, dst, features
+
+
+def parse_values(text):
+    return [float(v) for v in text.split(',') if v.strip()]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Search scoring weights against the ground-truth managers.')
+    parser.add_argument('--employees_path', default='data/employees.csv')
+    parser.add_argument('--connections_path', default='data/connections.csv')
+    parser.add_argument('--ground_truth_path', default='data/ground_truth_managers.csv')
+    parser.add_argument('--assignment', choices=ASSIGNMENT_MODES, default='greedy')
+    for name in FEATURE_NAMES:
+        parser.add_argument(f'--{name}', default=DEFAULT_GRID,
+                            help=f"Comma-separated grid values for the {name} weight (default {DEFAULT_GRID})")
+    parser.add_argument('--random', type=int, default=0,
+                        help="Evaluate this many random weight vectors instead of the grid")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes evaluating weight vectors in parallel (large sweeps only)")
+    parser.add_argument('--top', type=int, default=10, help="Rows of the accuracy table to print")
+    parser.add_argument('--output_path', default=None, help="Write every evaluated vector and its accuracy (.csv)")
+    parser.add_argument('--embedding_cache_dir', default=DEFAULT_EMBEDDING_CACHE_DIR,
+                        help="On-disk embedding cache location; pass '' to disable caching")
+    parser.add_argument('--model_dir', default=solution.MODEL_SNAPSHOT_DIR,
+                        help="Load the model from a local snapshot (see scripts/model_snapshot.py)")
+    parser.add_argument('--artifacts', default=None,
+                        help="Artifact bundle from scripts/build_artifacts.py; unchanged stages are memory-mapped from it")
+    args = parser.parse_args()
+    solution.MODEL_SNAPSHOT_DIR = args.model_dir
+
+    employees, connections = load_data(args.employees_path, args.connections_path)
+    if employees is None:
+        sys.exit(1)
+    try:
+        ground_truth = pd.read_csv(args.ground_truth_path)
+    except FileNotFoundError:
+        print(f"Error: Could not find the ground truth file at '{args.ground_truth_path}'")
+        sys.exit(1)
+
+    cache = EmbeddingCache(args.embedding_cache_dir, MODEL_NAME) if args.embedding_cache_dir else None
+    artifacts = ArtifactBundle(args.artifacts) if args.artifacts else None
+    graph, src, dst, features = load_candidate_features(employees, connections, cache, artifacts)
+    evaluator = AccuracyEvaluator(employees, ground_truth)
+
+    current = tuple(get_scoring_weights())
+    if args.random:
+        candidates = [current] + random_weights(args.random, args.seed)
+    else:
+        candidates = [current] + grid_weights([parse_values(getattr(args, name)) for name in FEATURE_NAMES])
+
+    print(f"\nEvaluating {len(unique_up_to_scale(candidates))} weight vectors over "
+          f"{len(src)} candidate pairs ({args.assignment}, {args.workers} workers)...")
+    start = time.perf_counter()
+    results = tune(candidates, graph.node_ids, src, dst, features, evaluator,
+                   assignment=args.assignment, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"   - Done in {elapsed:.1f}s ({elapsed / len(results) * 1000:.1f} ms per vector).")
+
+    # Cross-check the fast evaluator against evaluate.py on the best vector
+    best = results.iloc[0]
+    best_predictions = assign(graph.node_ids, src, dst, features @ best[FEATURE_NAMES].to_numpy(dtype=np.float64),
+                              args.assignment)
+    reference, _, _ = manager_accuracy(build_submission(employees, best_predictions), ground_truth)
+    if abs(reference - best['accuracy']) >= 1e-12:
+        raise RuntimeError(f"Fast evaluator gave {best['accuracy']:.6%} for the best weights, "
+                           f"but evaluate.py gives {reference:.6%}")
+
+    baseline = results.loc[[scale_key(w) == scale_key(current) for w in results[FEATURE_NAMES].itertuples(index=False)]]
+    print(f"\nCurrent weights {dict(zip(FEATURE_NAMES, current))}: accuracy {baseline['accuracy'].iloc[0]:.2%}")
+    print(f"\n{'rank':>4} " + ' '.join(f'{name:>20}' for name in FEATURE_NAMES) + f" {'accuracy':>9}")
+    for rank, row in results.head(args.top).iterrows():
+        print(f"{rank + 1:>4} " + ' '.join(f'{row[name]:>20g}' for name in FEATURE_NAMES) + f" {row['accuracy']:>9.2%}")
+
+    if args.output_path:
+        results.to_csv(args.output_path, index=False)
+        print(f"\nAll {len(results)} results written to '{args.output_path}'.")
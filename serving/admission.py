@@ -0,0 +1,141 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from serving.request_io import UploadError
+
+# --- Admission control ---
+# Predictions are scheduled before any embedding or scoring starts. A request's
+# cost is estimated from its row counts: the embed, graph and candidate stages
+# all grow with employees + connections. Requests above the per-request limits
+# are refused outright (413). Cheap requests run in the fast lane and everything
+# else in the bulk lane. Each lane runs at most `slots` predictions at once and
+# holds at most `max_waiting` more. A request that finds its lane's wait list
+# full, or waits longer than `max_wait_seconds`, is refused with 429 and a
+# Retry-After estimated from the lane's recent service times. One huge upload
+# can then only hold bulk slots, and small orgs never queue behind it.
+
+LANES = ['fast', 'bulk']
+DEFAULT_FAST_LANE_MAX_COST = 20_000   # employees + connections
+DEFAULT_FAST_SLOTS = 2
+DEFAULT_BULK_SLOTS = 1
+DEFAULT_MAX_WAITING = 8
+DEFAULT_MAX_WAIT_SECONDS = 30.0
+DEFAULT_MAX_EMPLOYEES = 200_000
+DEFAULT_MAX_CONNECTIONS = 2_000_000
+
+# Weight of the newest observation in the moving average of service times
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class Overloaded(RuntimeError):
+    """Raised when a request cannot be admitted; `retry_after` is the suggested wait in seconds."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def estimate_cost(num_employees, num_connections):
+    return num_employees + num_connections
+
+
+class Lane:
+    """At most `slots` concurrent predictions plus at most `max_waiting` waiting for a slot."""
+
+    def __init__(self, name, slots, max_waiting, max_wait_seconds):
+        self.name = name
+        self.slots = slots
+        self.max_waiting = max_waiting
+        self.max_wait_seconds = max_wait_seconds
+        self.running = 0
+        self.waiting = 0
+        self.average_seconds = None
+        self._condition = threading.Condition()
+
+    def retry_after(self):
+        """Seconds until the current backlog should have drained (at least 1)."""
+        average = self.average_seconds if self.average_seconds is not None else 1.0
+        return max(1, math.ceil(average * (self.waiting + 1) / self.slots))
+
+    def acquire(self, reject=True):
+        """Takes a slot; with `reject`, raises Overloaded instead of queueing past the limits."""
+        with self._condition:
+            if self.running < self.slots and self.waiting == 0:
+                self.running += 1
+                return
+            if reject and self.waiting >= self.max_waiting:
+                raise Overloaded(f"The {self.name} lane is full ({self.waiting} requests waiting)", self.retry_after())
+            deadline = time.monotonic() + self.max_wait_seconds if reject else None
+            self.waiting += 1
+            try:
+                while self.running >= self.slots:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise Overloaded(f"Timed out after {self.max_wait_seconds:g}s waiting in the {self.name} lane",
+                                         self.retry_after())
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.running += 1
+
+    def release(self, seconds):
+        with self._condition:
+            self.running -= 1
+            self.average_seconds = seconds if self.average_seconds is None else \
+                (1 - SERVICE_TIME_SMOOTHING) * self.average_seconds + SERVICE_TIME_SMOOTHING * seconds
+            self._condition.notify()
+
+
+class AdmissionController:
+    """Size limits plus the fast and bulk lanes."""
+
+    def __init__(self, fast_slots=DEFAULT_FAST_SLOTS, bulk_slots=DEFAULT_BULK_SLOTS,
+                 max_waiting=DEFAULT_MAX_WAITING, max_wait_seconds=DEFAULT_MAX_WAIT_SECONDS,
+                 fast_lane_max_cost=DEFAULT_FAST_LANE_MAX_COST,
+                 max_employees=DEFAULT_MAX_EMPLOYEES, max_connections=DEFAULT_MAX_CONNECTIONS):
+        self.fast_lane_max_cost = fast_lane_max_cost
+        self.max_employees = max_employees
+        self.max_connections = max_connections
+        self.lanes = {
+            'fast': Lane('fast', fast_slots, max_waiting, max_wait_seconds),
+            'bulk': Lane('bulk', bulk_slots, max_waiting, max_wait_seconds),
+        }
+        self.rejected = {lane: 0 for lane in LANES}
+
+    def check_size(self, num_employees, num_connections):
+        """Raises UploadError (413) for requests above the per-request row limits."""
+        if num_employees > self.max_employees:
+            raise UploadError(f"{num_employees} employees exceed the limit of {self.max_employees} per request", 413)
+        if num_connections > self.max_connections:
+            raise UploadError(f"{num_connections} connections exceed the limit of {self.max_connections} per request", 413)
+
+    def lane_for(self, num_employees, num_connections):
+        return 'fast' if estimate_cost(num_employees, num_connections) <= self.fast_lane_max_cost else 'bulk'
+
+    @contextmanager
+    def admit(self, num_employees, num_connections, reject=True):
+        """
+        Runs the body in a slot of the request's lane, yielding the lane name.
+        Raises UploadError (413) or, when `reject` is set, Overloaded (429).
+        Queued jobs pass reject=False: they were accepted already and just wait.
+        """
+        self.check_size(num_employees, num_connections)
+        lane = self.lanes[self.lane_for(num_employees, num_connections)]
+        try:
+            lane.acquire(reject=reject)
+        except Overloaded:
+            self.rejected[lane.name] += 1
+            raise
+        start = time.perf_counter()
+        try:
+            yield lane.name
+        finally:
+            lane.release(time.perf_counter() - start)
+
+    def stats(self):
+        return {name: {'running': lane.running, 'waiting': lane.waiting, 'slots': lane.slots,
+                       'rejected': self.rejected[name],
+                       'average_seconds': round(lane.average_seconds, 3) if lane.average_seconds is not None else None}
+                for name, lane in self.lanes.items()}
@@ -0,0 +1,52 @@
+import multiprocessing
+import os
+import sys
+
+# --- Preforking production server ---
+#   gunicorn -c serving/gunicorn.conf.py
+# The master imports serving/wsgi.py (loading the model and mapping artifacts)
+# and then forks WEB_WORKERS processes with WEB_THREADS request threads each, so
+# a slow /predict no longer blocks other requests. Settings come from the
+# environment:
+#   PORT              listen port (5001)
+#   WEB_WORKERS       worker processes (1, see below)
+#   WEB_THREADS       request threads per worker (8; 1 selects the sync worker)
+#   REQUEST_TIMEOUT   seconds (120). With WEB_THREADS=1 a request running longer
+#                     gets its worker killed and replaced; with threads it is the
+#                     limit for a worker that stops responding altogether. Use
+#                     /jobs for predictions that take minutes.
+#   GRACEFUL_TIMEOUT  seconds workers get on SIGTERM / SIGHUP to finish
+#                     in-flight requests and queued jobs (30)
+#   TORCH_THREADS     intra-op threads per worker (CPU count / WEB_WORKERS)
+# Per-process state is not shared between workers: each keeps its own response
+# cache, /jobs queue, compiled hierarchies (/hierarchy, /org, /candidates),
+# /predict/delta baseline and /metrics counters, so follow-up requests that
+# reach another worker get 404 / 409. One worker with threads is therefore the
+# default; only raise WEB_WORKERS behind a proxy that pins each client to one
+# worker, or when those endpoints are not used. The embedding cache directory
+# and the artifact bundle can be shared (the cache locks its files).
+
+wsgi_app = 'serving.wsgi:app'
+preload_app = True
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5001')}"
+workers = int(os.environ.get('WEB_WORKERS', 1))
+threads = int(os.environ.get('WEB_THREADS', 8))
+timeout = int(os.environ.get('REQUEST_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+accesslog = '-'
+
+
+def post_fork(server, worker):
+    # One worker's torch pool sized for the whole machine would oversubscribe the cores
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        torch.set_num_threads(int(os.environ.get('TORCH_THREADS', max(1, multiprocessing.cpu_count() // server.cfg.workers))))
+
+
+def worker_exit(server, worker):
+    # Requests have drained by now; give accepted jobs the rest of the grace period
+    job_manager = getattr(sys.modules.get('serving.wsgi'), 'job_manager', None)
+    if job_manager is not None and not job_manager.drain(timeout=graceful_timeout):
+        server.log.warning("Worker %s exiting with unfinished jobs", worker.pid)
@@ -0,0 +1,165 @@
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# --- Asynchronous prediction jobs ---
+# Large organisations take minutes to predict, longer than clients will hold a
+# request open. Jobs are queued on a bounded queue and run by a fixed number of
+# worker threads, which share the process-wide model and caches. A full queue is
+# reported to the caller immediately instead of piling up work, and finished
+# jobs are kept (up to a limit) so results can be fetched later. Worker threads
+# start with the first job in each process, so a manager created before a
+# preforking server forks still works in every worker.
+
+JOB_STAGES = ['embed', 'score', 'assign', 'render']
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_QUEUED = 16
+DEFAULT_MAX_FINISHED = 256
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by JobManager.submit when no more jobs can be queued."""
+
+
+class Job:
+    """State of one prediction job; stages advance through JOB_STAGES in order."""
+
+    def __init__(self, args):
+        self.id = uuid.uuid4().hex
+        self.args = args
+        self.status = 'queued'  # queued -> running -> done | failed
+        self.stages = {stage: {'status': 'pending', 'seconds': None} for stage in JOB_STAGES}
+        self.current_stage = None
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._stage_started = None
+
+    def start_stage(self, stage):
+        """Marks `stage` as running and the previous stage as done."""
+        now = time.perf_counter()
+        self._finish_stage(now)
+        self.current_stage = stage
+        self.stages[stage]['status'] = 'running'
+        self._stage_started = now
+
+    def _finish_stage(self, now):
+        if self.current_stage is not None:
+            self.stages[self.current_stage]['status'] = 'done'
+            self.stages[self.current_stage]['seconds'] = round(now - self._stage_started, 3)
+            self.current_stage = None
+
+    def finish(self, result=None, error=None):
+        """Records the outcome; a failed job marks the stage it was in as failed."""
+        if error is None:
+            self._finish_stage(time.perf_counter())
+            self.result = result
+            self.status = 'done'
+        else:
+            if self.current_stage is not None:
+                self.stages[self.current_stage]['status'] = 'failed'
+            self.error = error
+            self.status = 'failed'
+        self.finished = time.time()
+
+    def progress(self):
+        done = sum(stage['status'] == 'done' for stage in self.stages.values())
+        return done / len(JOB_STAGES)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'stage': self.current_stage,
+            'progress': round(self.progress(), 2),
+            'stages': self.stages,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'error': self.error,
+        }
+
+
+class JobManager:
+    """
+    Runs `run_job(job, *args)` for submitted jobs on `workers` threads. At most
+    `max_queued` jobs wait at once; the newest `max_finished` finished jobs are kept.
+    """
+
+    def __init__(self, run_job, workers=DEFAULT_WORKERS, max_queued=DEFAULT_MAX_QUEUED,
+                 max_finished=DEFAULT_MAX_FINISHED):
+        self.run_job = run_job
+        self.workers = workers
+        self.max_finished = max_finished
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._finished = OrderedDict()  # job id -> None, oldest first
+        self._threads = []
+        self._pid = None
+
+    def _ensure_workers(self):
+        # Threads do not survive fork: a forked child starts its own
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._threads = [threading.Thread(target=self._worker, name=f'job-worker-{i}', daemon=True)
+                                 for i in range(self.workers)]
+                for thread in self._threads:
+                    thread.start()
+
+    def submit(self, *args):
+        """Queues a job and returns it; raises JobQueueFull when the queue is at capacity."""
+        self._ensure_workers()
+        job = Job(args)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise JobQueueFull(f"Job queue is full ({self._queue.maxsize} jobs waiting)")
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def drain(self, timeout=None):
+        """Waits until queued and running jobs have finished; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            job.status = 'running'
+            job.started = time.time()
+            try:
+                job.finish(result=self.run_job(job, *job.args))
+            except Exception as e:
+                job.finish(error=str(e))
+            finally:
+                job.args = None  # release the input frames
+                self._retire(job)
+                self._queue.task_done()
+
+    def _retire(self, job):
+        with self._lock:
+            self._finished[job.id] = None
+            while len(self._finished) > self.max_finished:
+                old_id, _ = self._finished.popitem(last=False)
+                self._jobs.pop(old_id, None)
@@ -0,0 +1,131 @@
+import bisect
+import math
+import threading
+
+# --- Prometheus metrics ---
+# A small in-process registry rendered in the Prometheus text exposition format
+# (version 0.0.4) for GET /metrics: counters, histograms with fixed buckets, and
+# callback metrics whose value is read at scrape time (cache sizes, queue depth).
+# Label values are given as keyword arguments; every metric has a lock, so request
+# threads and job workers can update it concurrently.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+MEMORY_BUCKETS = tuple(float(2 ** power) for power in range(20, 34, 2))  # 1 MiB .. 8 GiB
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0.0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def count(self, **labels):
+        series = self._series.get(tuple(sorted(labels.items())))
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        result = []
+        with self._lock:
+            for key, series in self._series.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                    cumulative += count
+                    result.append((f'{self.name}_bucket', key + (('le', _format_value(bound)),), cumulative))
+                result.append((f'{self.name}_sum', key, series[-1]))
+                result.append((f'{self.name}_count', key, cumulative))
+        return result
+
+
+class CallbackMetric:
+    """
+    Gauge (or monotonic counter) read from `callback()` at scrape time. With
+    `label`, the callback returns {label value: value} and each becomes a sample.
+    """
+
+    def __init__(self, name, documentation, callback, kind='gauge', label=None):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.kind = kind
+        self.label = label
+
+    def samples(self):
+        if self.label is None:
+            return [(self.name, (), self.callback())]
+        return [(self.name, ((self.label, key),), value) for key, value in self.callback().items()]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation):
+        return self.register(Counter(name, documentation))
+
+    def histogram(self, name, documentation, buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, buckets))
+
+    def callback(self, name, documentation, callback, kind='gauge', label=None):
+        return self.register(CallbackMetric(name, documentation, callback, kind, label))
+
+    def render(self):
+        """All metrics in the Prometheus text format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,159 @@
+import base64
+import gzip
+import io
+import os
+import sys
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+try:
+    import zstandard
+except ImportError:  # zstd bodies are rejected with 415 instead
+    zstandard = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.data_io import read_employees, read_connections, infer_format
+
+# --- Upload decoding for /predict ---
+# Three request shapes are accepted:
+#   1. JSON with employees_csv_base64 / connections_csv_base64 (original contract)
+#   2. multipart/form-data with `employees` and `connections` file parts, each a
+#      CSV, Parquet or Arrow IPC file, optionally gzip/zstd compressed
+#   3. either of the above with a gzip or zstd Content-Encoding on the whole body
+# Bodies and parts are decompressed as streams rather than buffered first.
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+PART_CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/vnd.apache.parquet': 'parquet',
+    'application/x-parquet': 'parquet',
+    'application/vnd.apache.arrow.file': 'arrow',
+    'application/vnd.apache.arrow.stream': 'arrow',
+}
+
+
+class UploadError(ValueError):
+    """Raised for malformed uploads; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class InMemoryRequest(Request):
+    """Keeps multipart file parts in memory instead of spooling large ones to temp files."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
+
+
+def _zstd_reader(stream):
+    if zstandard is None:
+        raise UploadError("zstd-compressed uploads require the zstandard package", status=415)
+    return zstandard.ZstdDecompressor().stream_reader(stream)
+
+
+class _LimitedReader(io.RawIOBase):
+    """Decoded body stream that raises RequestEntityTooLarge once it runs past `limit` bytes."""
+
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.limit = limit
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.stream.read(len(buffer))
+        self.position += len(data)
+        # Readers stop at the limit, so look one byte further to tell a body that ends there from a longer one
+        if self.position > self.limit or (self.position == self.limit and data and self.stream.read(1)):
+            raise RequestEntityTooLarge()
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class DecompressRequestMiddleware:
+    """
+    WSGI middleware that transparently decodes gzip/zstd request bodies. With
+    `max_decoded_bytes`, a body that decodes to more than that is refused with 413.
+    """
+
+    def __init__(self, app, max_decoded_bytes=None):
+        self.app = app
+        self.max_decoded_bytes = max_decoded_bytes
+
+    def __call__(self, environ, start_response):
+        encoding = environ.get('HTTP_CONTENT_ENCODING', '').strip().lower()
+        if encoding in ('gzip', 'x-gzip', 'zstd'):
+            body = environ['wsgi.input']
+            if encoding == 'zstd':
+                if zstandard is None:
+                    start_response('415 Unsupported Media Type', [('Content-Type', 'application/json')])
+                    return [b'{"error": "zstd-compressed uploads require the zstandard package"}']
+                environ['wsgi.input'] = _zstd_reader(body)
+            else:
+                environ['wsgi.input'] = gzip.GzipFile(fileobj=body, mode='rb')
+            if self.max_decoded_bytes is not None:
+                environ['wsgi.input'] = io.BufferedReader(_LimitedReader(environ['wsgi.input'], self.max_decoded_bytes))
+            # The decoded length is unknown; the stream itself marks the end of the body
+            environ.pop('CONTENT_LENGTH', None)
+            environ.pop('HTTP_CONTENT_ENCODING', None)
+            environ['wsgi.input_terminated'] = True
+        return self.app(environ, start_response)
+
+
+def _decompressed(stream):
+    """Wraps a binary stream in a streaming decompressor if it starts with a gzip/zstd magic."""
+    stream = io.BufferedReader(stream) if not hasattr(stream, 'peek') else stream
+    head = stream.peek(4)[:4]
+    if head.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    if head.startswith(ZSTD_MAGIC):
+        return _zstd_reader(stream)
+    return stream
+
+
+def _part_format(part):
+    file_format = PART_CONTENT_TYPES.get((part.mimetype or '').lower())
+    if file_format is None and part.filename:
+        file_format = infer_format(part.filename)
+    return file_format or 'csv'
+
+
+def _read_part(part, reader):
+    file_format = _part_format(part)
+    stream = _decompressed(part.stream)
+    if file_format != 'csv':
+        # Parquet footers and Arrow IPC files need random access
+        stream = io.BytesIO(stream.read())
+    return reader(stream, file_format)
+
+
+def read_predict_inputs(request):
+    """Returns (employees_df, connections_df) from any supported /predict request."""
+    try:
+        if request.mimetype == 'multipart/form-data':
+            missing = [name for name in ('employees', 'connections') if name not in request.files]
+            if missing:
+                raise UploadError(f"Missing required file parts: {', '.join(missing)}")
+            return (_read_part(request.files['employees'], read_employees),
+                    _read_part(request.files['connections'], read_connections))
+
+        data = request.get_json(silent=True)
+        if not data or 'employees_csv_base64' not in data or 'connections_csv_base64' not in data:
+            raise UploadError("Missing required fields: employees_csv_base64, connections_csv_base64")
+        # The decoded CSVs may themselves be gzip/zstd compressed
+        employees = _decompressed(io.BytesIO(base64.b64decode(data['employees_csv_base64'])))
+        connections = _decompressed(io.BytesIO(base64.b64decode(data['connections_csv_base64'])))
+        return read_employees(employees, 'csv'), read_connections(connections, 'csv')
+    except UploadError:
+        raise
+    except RequestEntityTooLarge as e:
+        raise UploadError(f"Upload exceeds the limit of {request.max_content_length} bytes", 413) from e
+    except Exception as e:
+        # Bad base64, corrupt compression or unparsable tables are client errors
+        raise UploadError(f"Could not read upload: {e}") from e
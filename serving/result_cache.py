@@ -0,0 +1,180 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+# --- /predict response cache ---
+# Responses are addressed by a hash of the parsed input tables and everything
+# else that determines the prediction (model name, scoring weights, assignment
+# mode), so the same snapshot uploaded as CSV, Parquet or gzip hits the same
+# entry. Entries live in an in-memory LRU bounded by count and bytes; evicted
+# entries optionally spill to a size-bounded directory and are promoted back on
+# the next hit. The key doubles as the response ETag.
+
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 1024 * 1024 * 1024
+SPILL_SUFFIX = '.cache'
+
+
+def _hash_frame(digest, df):
+    # Column names and dtypes are part of the content; values are hashed row-wise without the index
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+
+
+def request_key(employees_df, connections_df, *settings):
+    """Content hash of the input tables plus any settings that change the result."""
+    digest = hashlib.sha256()
+    _hash_frame(digest, employees_df.reset_index(drop=True))
+    _hash_frame(digest, connections_df.reset_index(drop=True))
+    digest.update(repr(settings).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU cache of response bodies with an optional on-disk spill tier."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES,
+                 spill_dir=None, max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> bytes, least recently used first
+        self._bytes = 0
+        self._disk = OrderedDict()     # key -> size of the spilled file, oldest first
+        self._disk_bytes = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self._load_spilled()
+
+    # --- Disk tier ---
+    def _path(self, key):
+        return os.path.join(self.spill_dir, key + SPILL_SUFFIX)
+
+    def _load_spilled(self):
+        files = [f for f in os.listdir(self.spill_dir) if f.endswith(SPILL_SUFFIX)]
+        paths = sorted((os.path.join(self.spill_dir, f) for f in files), key=os.path.getmtime)
+        for path in paths:
+            size = os.path.getsize(path)
+            self._disk[os.path.basename(path)[:-len(SPILL_SUFFIX)]] = size
+            self._disk_bytes += size
+        self._trim_disk()
+
+    def _spill(self, key, value):
+        if not self.spill_dir or len(value) > self.max_disk_bytes or key in self._disk:
+            return
+        tmp_path = self._path(key) + f'.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(value)
+        os.replace(tmp_path, self._path(key))
+        self._disk[key] = len(value)
+        self._disk_bytes += len(value)
+        self._trim_disk()
+
+    def _trim_disk(self):
+        while self._disk_bytes > self.max_disk_bytes:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def _read_spilled(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                value = f.read()
+        except FileNotFoundError:
+            self._disk_bytes -= self._disk.pop(key)
+            return None
+        self._disk.move_to_end(key)
+        return value
+
+    # --- Memory tier ---
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key, value = self._entries.popitem(last=False)
+            self._bytes -= len(value)
+            self.evictions += 1
+            self._spill(key, value)
+
+    def get(self, key):
+        """Returns the cached body for `key` or None, refreshing its recency."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            if key in self._disk:
+                value = self._read_spilled(key)
+                if value is not None:
+                    self.disk_hits += 1
+                    self._store(key, value)
+                    return value
+            self.misses += 1
+            return None
+
+    def _store(self, key, value):
+        if key in self._entries:
+            self._bytes -= len(self._entries.pop(key))
+        self._entries[key] = value
+        self._bytes += len(value)
+        self._evict()
+
+    def put(self, key, value):
+        """Stores a response body; bodies larger than max_bytes go straight to disk."""
+        with self._lock:
+            if len(value) > self.max_bytes:
+                self._spill(key, value)
+            else:
+                self._store(key, value)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries or key in self._disk
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                    'evictions': self.evictions, 'entries': len(self._entries), 'bytes': self._bytes,
+                    'disk_entries': len(self._disk), 'disk_bytes': self._disk_bytes}
+
+
+class ObjectCache:
+    """Thread-safe LRU of in-process objects (such as compiled hierarchies), bounded by count."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
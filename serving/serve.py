@@ -1,78 +1,776 @@
-from flask import Flask, request, jsonify, send_file
-import base64
+from flask import Flask, Response, request, jsonify, url_for, g
+import functools
+import gzip
+import io
+import json
 import os
 import sys
-import tempfile
-import atexit
+import threading
+import time
+import uuid
+import numpy as np
 import pandas as pd
-from sentence_transformers import SentenceTransformer
+import plotly.offline
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from scripts.solution import build_graph_with_features, predict_managers_globally
+from scripts.solution import build_graph_with_features, predict_managers_globally, build_submission, get_scoring_weights, MODEL_NAME, MODEL_SNAPSHOT_DIR, DEFAULT_EMBEDDING_CACHE_DIR
+from scripts.artifacts import ArtifactBundle
+from scripts.embedding_cache import EmbeddingCache
+from scripts.model_snapshot import BackgroundModel
+from scripts.incremental import IncrementalPredictor
+from scripts.hierarchy_index import HierarchyIndex
+from scripts.candidate_index import CandidateIndex, DEFAULT_TOPK
+from scripts.tracing import Tracer, activate, deactivate, tracing, stage, echo, log_event, configure_structured_logging, structured_logging_enabled, enable_memory_tracing, TRACING_ENABLED
+from serving.admission import AdmissionController, Overloaded, DEFAULT_FAST_LANE_MAX_COST, DEFAULT_FAST_SLOTS, DEFAULT_BULK_SLOTS, DEFAULT_MAX_WAITING, DEFAULT_MAX_WAIT_SECONDS, DEFAULT_MAX_EMPLOYEES, DEFAULT_MAX_CONNECTIONS
+from serving.metrics import MetricsRegistry, MEMORY_BUCKETS
+from serving.result_cache import ResultCache, ObjectCache, request_key, DEFAULT_MAX_ENTRIES, DEFAULT_MAX_BYTES
+from serving.jobs import JobManager, JobQueueFull, DEFAULT_WORKERS, DEFAULT_MAX_QUEUED
+from serving.request_io import InMemoryRequest, DecompressRequestMiddleware, UploadError, read_predict_inputs
+from dependencies.find_cycles import analyze_submission
+from dependencies.visualize_sunburst import SunburstTree, sunburst_page, DEFAULT_MAX_DEPTH, DEFAULT_MAX_NODES
 
 app = Flask(__name__)
+app.request_class = InMemoryRequest
+# Upper bound on a request body, after decompression for compressed ones (413 beyond it)
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_BYTES', 512 * 1024 * 1024))
+# gzip / zstd Content-Encoding is decoded as a stream before Flask parses the body
+app.wsgi_app = DecompressRequestMiddleware(app.wsgi_app, max_decoded_bytes=app.config['MAX_CONTENT_LENGTH'])
 
-# Preload the sentence transformer model at startup to avoid loading it on every request
-print("Loading sentence transformer model...")
-model = SentenceTransformer('all-MiniLM-L6-v2')
-print("Model loaded and ready!")
+# LOG_FORMAT=json replaces progress prints and bars with JSON log lines (stages, requests)
+if os.environ.get('LOG_FORMAT') == 'json':
+    configure_structured_logging(os.environ.get('LOG_LEVEL', 'INFO'))
+# TRACE_MEMORY=1 adds per-stage allocation peaks to traces (tracemalloc slows allocation-heavy stages)
+if os.environ.get('TRACE_MEMORY') == '1':
+    enable_memory_tracing()
+
+# Candidate scoring can be spread over several processes on many-core hosts
+scoring_workers = int(os.environ.get('SCORING_WORKERS', 1))
+# Employees whose connections give no candidate get this many embedding-similar, more-senior candidates
+similar_candidates = int(os.environ.get('SIMILAR_CANDIDATES', 0))
+
+# --- Process state ---
+# The model, the on-disk caches and the artifact mapping are set up by
+# init_server(), called from the __main__ block below and by serving/wsgi.py,
+# not at import: scoring workers (SCORING_WORKERS > 1) start with forkserver or
+# spawn and re-import the launching script, and must not load a model or open
+# caches of their own.
+model = None
+embedding_cache = None
+result_cache = None
+artifacts = None
+
+def init_server():
+    """
+    Loads the model and opens the caches and artifact bundle; idempotent.
+
+    The sentence transformer is loaded once, on a background thread, so the server
+    listens (and answers /healthz) right away; /ready turns 200 once the model is
+    warm. Requests that need new embeddings wait for it, cached ones do not.
+    MODEL_SNAPSHOT_DIR loads a local snapshot instead of resolving the model on the hub;
+    PRELOAD_MODEL=0 defers loading to the first embedding cache miss, and
+    PRELOAD_MODEL=sync loads it before this function returns (serving/wsgi.py uses
+    it so forked workers inherit the loaded model).
+    """
+    global model, embedding_cache, result_cache, artifacts
+    if model is not None:
+        return
+    model = BackgroundModel(MODEL_NAME, MODEL_SNAPSHOT_DIR)
+    preload_model = os.environ.get('PRELOAD_MODEL', '1')
+    if preload_model == 'sync':
+        echo("Loading sentence transformer model...")
+        model.load()
+    elif preload_model != '0':
+        echo("Loading sentence transformer model in the background...")
+        model.start()
+
+    # Profiles rarely change between requests, so embeddings are cached on disk across requests and restarts
+    embedding_cache = EmbeddingCache(os.environ.get('EMBEDDING_CACHE_DIR', DEFAULT_EMBEDDING_CACHE_DIR), MODEL_NAME)
+
+    # Dashboards re-post identical snapshots, so finished responses are cached by input hash
+    result_cache = ResultCache(
+        max_entries=int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)),
+        max_bytes=int(os.environ.get('RESULT_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)),
+        spill_dir=os.environ.get('RESULT_CACHE_DIR') or None,
+    )
+
+    # Precomputed embeddings, graph and candidate features (scripts/build_artifacts.py) are
+    # memory-mapped once; requests whose inputs match skip those stages. Every server
+    # process mapping the same bundle shares its pages.
+    artifacts = ArtifactBundle(os.environ['ARTIFACTS_DIR']) if os.environ.get('ARTIFACTS_DIR') else None
+
+# Predictions are admitted by estimated cost: per-request row limits, then a fast
+# lane for small orgs and a bulk lane for the rest, each with bounded concurrency
+# and a bounded wait list (see serving/admission.py)
+admission = AdmissionController(
+    fast_slots=int(os.environ.get('FAST_LANE_SLOTS', DEFAULT_FAST_SLOTS)),
+    bulk_slots=int(os.environ.get('BULK_LANE_SLOTS', DEFAULT_BULK_SLOTS)),
+    max_waiting=int(os.environ.get('LANE_MAX_WAITING', DEFAULT_MAX_WAITING)),
+    max_wait_seconds=float(os.environ.get('LANE_MAX_WAIT_SECONDS', DEFAULT_MAX_WAIT_SECONDS)),
+    fast_lane_max_cost=int(os.environ.get('FAST_LANE_MAX_ROWS', DEFAULT_FAST_LANE_MAX_COST)),
+    max_employees=int(os.environ.get('MAX_EMPLOYEES', DEFAULT_MAX_EMPLOYEES)),
+    max_connections=int(os.environ.get('MAX_CONNECTIONS', DEFAULT_MAX_CONNECTIONS)),
+)
+
+# --- Sunburst level of detail ---
+# Responses carry a bounded view of the predicted hierarchy: SUNBURST_MAX_DEPTH
+# levels below the CEO in at most SUNBURST_MAX_NODES wedges, the rest merged
+# into per-manager "+N more" wedges. Clicking a collapsed wedge fetches that
+# subtree from /hierarchy/<node_id>, answered from the compiled hierarchy kept
+# per prediction key, so page size and render time do not grow with the org.
+# plotly.js is served once from PLOTLY_JS_PATH with a year-long cache lifetime
+# instead of being inlined in every page. Pages link it and /hierarchy by
+# absolute URL, so a saved page still renders when opened from disk; cached
+# pages hold BASE_URL_PLACEHOLDER, replaced with the requested host when sent.
+sunburst_max_depth = int(os.environ.get('SUNBURST_MAX_DEPTH', DEFAULT_MAX_DEPTH))
+sunburst_max_nodes = int(os.environ.get('SUNBURST_MAX_NODES', DEFAULT_MAX_NODES))
+hierarchies = ObjectCache(int(os.environ.get('HIERARCHY_CACHE_ENTRIES', 16)))
+PLOTLY_JS_VERSION = plotly.offline.get_plotlyjs_version()
+PLOTLY_JS_PATH = f'/assets/plotly-{PLOTLY_JS_VERSION}.min.js'
+FIGURE_FORMATS = ['html', 'json']
+BASE_URL_PLACEHOLDER = b'__BASE_URL__'
+
+@functools.lru_cache(maxsize=2)
+def plotly_js_body(compressed):
+    body = plotly.offline.get_plotlyjs().encode('utf-8')
+    return gzip.compress(body, compresslevel=9, mtime=0) if compressed else body
+
+def render_sunburst(tree, key, output_format='html', employee_id=None, max_depth=None, max_nodes=None):
+    """A view of `tree` as an HTML page with drill-down links for prediction `key`, or as JSON figure bytes."""
+    fig = tree.figure(employee_id,
+                      max_depth=sunburst_max_depth if max_depth is None else max_depth,
+                      max_nodes=sunburst_max_nodes if max_nodes is None else max_nodes)
+    if output_format == 'json':
+        return fig.to_json().encode('utf-8')
+    base = BASE_URL_PLACEHOLDER.decode()
+    return sunburst_page(fig, base + PLOTLY_JS_PATH, f'{base}/hierarchy/__NODE__?key={key}').encode('utf-8')
+
+def page_body(body):
+    """A rendered page with its links made absolute for the current request's host."""
+    return body.replace(BASE_URL_PLACEHOLDER, request.host_url.rstrip('/').encode('utf-8'))
+
+# --- Org queries ---
+# Every prediction, and every /predict/delta baseline or update, is compiled
+# into a HierarchyIndex (scripts/hierarchy_index.py) in linear time. The /org
+# endpoints answer chain-of-command, subtree, span-of-control, "is A above B"
+# and lowest-common-manager queries from it without walking the tree. ?key=
+# picks a prediction (its /predict ETag, or 'delta'); the default is the latest.
+org_indexes = ObjectCache(int(os.environ.get('HIERARCHY_CACHE_ENTRIES', 16)))
+latest_org_key = None
+# Upper bound on the pairs / ids in one POST /org/query
+ORG_QUERY_MAX_ITEMS = int(os.environ.get('ORG_QUERY_MAX_ITEMS', 100_000))
+
+# --- Candidate review ---
+# While scoring, the CANDIDATES_TOPK best candidate managers of every employee
+# are kept with each signal's contribution to their score (CandidateIndex,
+# scripts/candidate_index.py), under the prediction key. /candidates answers
+# from it without re-scoring; the default is the latest full prediction, as
+# deltas do not keep candidates.
+candidate_topk = int(os.environ.get('CANDIDATES_TOPK', DEFAULT_TOPK))
+candidate_indexes = ObjectCache(int(os.environ.get('HIERARCHY_CACHE_ENTRIES', 16)))
+latest_candidates_key = None
+
+def publish_candidates(key, candidates):
+    global latest_candidates_key
+    candidate_indexes.put(key, candidates)
+    latest_candidates_key = key
+
+def publish_org_index(key, index):
+    global latest_org_key
+    org_indexes.put(key, index)
+    latest_org_key = key
+
+# A prediction's submission and candidates are kept in the result cache next to
+# its pages (under <key>.csv and <key>.candidates), so they spill and expire
+# with them. A page hit whose hierarchy left the per-worker caches recompiles
+# it from these in linear time instead of predicting again.
+def cache_prediction(key, submission_df):
+    result_cache.put(f'{key}.csv', submission_df.to_csv(index=False).encode('utf-8'))
+    candidates = candidate_indexes.get(key)
+    if candidates is not None:
+        result_cache.put(f'{key}.candidates', candidates.to_bytes())
+
+def restore_prediction(key, employees_df):
+    """
+    Recompiles the hierarchy, org index and candidates of a cached prediction
+    and returns its SunburstTree, or None when the prediction is not cached.
+    """
+    if f'{key}.csv' not in result_cache or f'{key}.candidates' not in result_cache:
+        return None
+    submission_csv, candidates = result_cache.get(f'{key}.csv'), result_cache.get(f'{key}.candidates')
+    if submission_csv is None or candidates is None:
+        return None
+    submission_df = pd.read_csv(io.BytesIO(submission_csv))
+    publish_candidates(key, CandidateIndex.from_bytes(candidates))
+    with stage('index', items=len(submission_df)):
+        publish_org_index(key, HierarchyIndex.from_submission(submission_df))
+    with stage('render', items=len(submission_df)):
+        tree = SunburstTree(employees_df, submission_df)
+    hierarchies.put(key, tree)
+    return tree
+
+def run_prediction(employees_df, connections_df, key, on_stage=None):
+    """
+    Runs the full pipeline, keeps the compiled hierarchy, org index and top-k
+    candidates under `key` for /hierarchy, /org and /candidates and returns
+    (submission_df, SunburstTree).
+    """
+    if on_stage:
+        on_stage('embed')
+    # Build graph using preloaded model and predict managers
+    company_graph = build_graph_with_features(employees_df, connections_df, model=model,
+                                              embedding_cache=embedding_cache, artifacts=artifacts)
+    manager_predictions = predict_managers_globally(company_graph, on_stage=on_stage, workers=scoring_workers,
+                                                    artifacts=artifacts, similar_candidates=similar_candidates,
+                                                    on_candidates=functools.partial(publish_candidates, key),
+                                                    topk=candidate_topk)
+    submission_df = build_submission(employees_df, manager_predictions)
+    # Never serve a hierarchy with circular reporting lines
+    with stage('validate', items=len(submission_df)):
+        cycles = analyze_submission(submission_df)['cycles']
+    if cycles:
+        raise RuntimeError(f"Prediction contains {len(cycles)} reporting cycle(s), e.g. {cycles[0]}")
+    with stage('index', items=len(submission_df)):
+        publish_org_index(key, HierarchyIndex.from_submission(submission_df))
+
+    if on_stage:
+        on_stage('render')
+    # Compile the hierarchy once; pages, JSON figures and drill-downs are views of it
+    with stage('render', items=len(submission_df)):
+        tree = SunburstTree(employees_df, submission_df)
+    hierarchies.put(key, tree)
+    cache_prediction(key, submission_df)
+    return submission_df, tree
+
+def run_job(job, employees_df, connections_df, key):
+    # Accepted jobs wait for a slot in their lane instead of being refused
+    with tracing(Tracer([observe_stage], job_id=job.id)), \
+            admission.admit(len(employees_df), len(connections_df), reject=False):
+        submission_df, tree = run_prediction(employees_df, connections_df, key, on_stage=job.start_stage)
+        html = render_sunburst(tree, key)
+    result_cache.put(key, html)
+    return {'html': html, 'csv': submission_df.to_csv(index=False).encode('utf-8'), 'key': key}
+
+# Long-running predictions go through a bounded queue served by worker threads sharing the model
+job_manager = JobManager(
+    run_job,
+    workers=int(os.environ.get('JOB_WORKERS', DEFAULT_WORKERS)),
+    max_queued=int(os.environ.get('JOB_MAX_QUEUED', DEFAULT_MAX_QUEUED)),
+)
+
+# --- Metrics and tracing ---
+# Every request runs under its own Tracer: pipeline stages feed the Prometheus
+# histograms and counters below and the response's Server-Timing header.
+# PIPELINE_TRACING=0 turns stage tracing off; request metrics are always kept.
+metrics = MetricsRegistry()
+http_requests = metrics.counter('http_requests_total', 'HTTP requests by endpoint, method and status.')
+http_latency = metrics.histogram('http_request_duration_seconds', 'HTTP request latency by endpoint and method.')
+stage_latency = metrics.histogram('pipeline_stage_duration_seconds', 'Wall time of pipeline stages.')
+stage_cpu = metrics.counter('pipeline_stage_cpu_seconds_total', 'CPU time of the thread running each pipeline stage.')
+stage_items = metrics.counter('pipeline_stage_items_total', 'Items (employees, candidate pairs, ...) processed per stage.')
+stage_memory = metrics.histogram('pipeline_stage_peak_memory_bytes', 'Traced allocation peak per stage (TRACE_MEMORY=1).',
+                                 MEMORY_BUCKETS)
+metrics.callback('result_cache_hits_total', 'Response cache hits.', lambda: result_cache.stats()['hits'], 'counter')
+metrics.callback('result_cache_misses_total', 'Response cache misses.', lambda: result_cache.stats()['misses'], 'counter')
+metrics.callback('result_cache_bytes', 'Bytes held by the in-memory response cache.', lambda: result_cache.stats()['bytes'])
+metrics.callback('embedding_cache_hits_total', 'Embedding cache hits.', lambda: embedding_cache.stats()['hits'], 'counter')
+metrics.callback('embedding_cache_misses_total', 'Embedding cache misses.', lambda: embedding_cache.stats()['misses'], 'counter')
+metrics.callback('job_queue_depth', 'Jobs waiting for a worker.', lambda: job_manager.queue_depth())
+metrics.callback('model_ready', 'Whether the embedding model is loaded (1) or not (0).', lambda: int(model.ready()))
+metrics.callback('admission_queue_depth', 'Predictions waiting for a slot, by lane.',
+                 lambda: {lane: s['waiting'] for lane, s in admission.stats().items()}, label='lane')
+metrics.callback('admission_in_flight', 'Predictions running, by lane.',
+                 lambda: {lane: s['running'] for lane, s in admission.stats().items()}, label='lane')
+metrics.callback('admission_rejected_total', 'Predictions refused with 429, by lane.',
+                 lambda: {lane: s['rejected'] for lane, s in admission.stats().items()}, 'counter', label='lane')
+
+def observe_stage(span):
+    stage_latency.observe(span.wall_seconds, stage=span.name)
+    stage_cpu.inc(span.cpu_seconds, stage=span.name)
+    if span.items is not None:
+        stage_items.inc(span.items, stage=span.name)
+    if span.peak_bytes is not None:
+        stage_memory.observe(span.peak_bytes, stage=span.name)
+
+@app.before_request
+def start_request_trace():
+    g.request_started = time.perf_counter()
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+    g.tracer = Tracer([observe_stage], request_id=g.request_id)
+    g.trace_token = activate(g.tracer)
+
+@app.after_request
+def record_request_metrics(response):
+    elapsed = time.perf_counter() - g.request_started
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    http_requests.inc(endpoint=endpoint, method=request.method, status=str(response.status_code))
+    http_latency.observe(elapsed, endpoint=endpoint, method=request.method)
+
+    timings = g.tracer.server_timing() if TRACING_ENABLED else ''
+    response.headers['Server-Timing'] = (timings + ', ' if timings else '') + f'total;dur={elapsed * 1000:.1f}'
+    response.headers['X-Request-ID'] = g.request_id
+    if structured_logging_enabled():
+        log_event('request', request_id=g.request_id, method=request.method, path=request.path,
+                  status=response.status_code, duration_ms=round(elapsed * 1000, 3))
+    return response
+
+@app.teardown_request
+def end_request_trace(exc):
+    if 'trace_token' in g:
+        deactivate(g.trace_token)
+
+def prediction_key(employees_df, connections_df):
+    return request_key(employees_df, connections_df, MODEL_NAME, tuple(get_scoring_weights()), 'greedy',
+                       similar_candidates)
+
+def figure_key(key, output_format):
+    """Cache key and ETag of one rendering of a prediction."""
+    return key if output_format == 'html' else f'{key}.{output_format}'
+
+def figure_response(body, etag, cache_status, output_format='html'):
+    """HTML page or JSON figure with the cache key as ETag."""
+    if output_format == 'json':
+        response = Response(body, mimetype='application/json')
+    else:
+        response = Response(page_body(body), mimetype='text/html')
+    response.set_etag(etag)
+    response.headers['X-Cache'] = cache_status
+    return response
 
 @app.route('/predict', methods=['POST'])
 def predict():
     """
-    Accepts employee and connection data as base64 encoded CSVs,
-    runs the hierarchy prediction, and returns the sunburst visualization.
+    Accepts employee and connection data either as base64 encoded CSVs in JSON or
+    as multipart `employees` / `connections` file parts (CSV, Parquet or Arrow IPC),
+    optionally gzip/zstd compressed, runs the hierarchy prediction, and returns the
+    sunburst visualization (?format=json: the Plotly figure as JSON for clients
+    that render it themselves). Everything stays in memory: no temporary files are
+    written or read back. Repeated inputs are served from the result cache and
+    carry an ETag, so clients can revalidate with If-None-Match. Oversized inputs
+    get 413; when the request's lane is saturated the answer is 429 with Retry-After.
     """
-    data = request.get_json()
+    output_format = request.args.get('format', 'html')
+    if output_format not in FIGURE_FORMATS:
+        return jsonify({"error": f"Unknown format '{output_format}'; expected one of {FIGURE_FORMATS}"}), 400
+    try:
+        with stage('parse') as span:
+            employees_df, connections_df = read_predict_inputs(request)
+            span.items = len(employees_df)
+        admission.check_size(len(employees_df), len(connections_df))
+    except UploadError as e:
+        return jsonify({"error": str(e)}), e.status
 
-    if not data or 'employees_csv_base64' not in data or 'connections_csv_base64' not in data:
-        return jsonify({"error": "Missing required fields: employees_csv_base64, connections_csv_base64"}), 400
+    with stage('hash', items=len(employees_df)):
+        key = prediction_key(employees_df, connections_df)
+    etag = figure_key(key, output_format)
+    if etag in request.if_none_match:
+        # The client already holds the response for exactly these inputs
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
 
-    # Create a temporary directory
-    temp_dir = tempfile.mkdtemp()
-    
-    # Schedule the cleanup of the temporary directory
-    atexit.register(os.rmdir, temp_dir)
+    # Drill-downs, /org and /candidates need the hierarchy of every page served
+    tree, index, candidates = hierarchies.get(key), org_indexes.get(key), candidate_indexes.get(key)
+    if tree is None or index is None or candidates is None:
+        tree = restore_prediction(key, employees_df)
+    else:
+        publish_org_index(key, index)
+        publish_candidates(key, candidates)
+    cached = result_cache.get(etag) if tree is not None else None
+    if cached is None and tree is not None:
+        # Predicted already, just not in this format
+        with stage('render'):
+            cached = render_sunburst(tree, key, output_format)
+        result_cache.put(etag, cached)
+    if cached is not None:
+        return figure_response(cached, etag, 'HIT', output_format)
 
     try:
-        # Decode the base64 strings
-        employees_csv_bytes = base64.b64decode(data['employees_csv_base64'])
-        connections_csv_bytes = base64.b64decode(data['connections_csv_base64'])
-
-        # Write the decoded bytes to temporary files
-        employees_csv_path = os.path.join(temp_dir, 'employees.csv')
-        connections_csv_path = os.path.join(temp_dir, 'connections.csv')
-        submission_csv_path = os.path.join(temp_dir, 'submission.csv')
-        sunburst_html_path = os.path.join(temp_dir, 'employee_sunburst.html')
-
-        with open(employees_csv_path, 'wb') as f:
-            f.write(employees_csv_bytes)
-        with open(connections_csv_path, 'wb') as f:
-            f.write(connections_csv_bytes)
-
-        # Load CSV data
-        employees_df = pd.read_csv(employees_csv_path, engine='python')
-        connections_df = pd.read_csv(connections_csv_path)
-        
-        # Build graph using preloaded model and predict managers
-        company_graph = build_graph_with_features(employees_df, connections_df, model=model)
-        manager_predictions = predict_managers_globally(company_graph)
-        
-        # Create submission dataframe
-        submission_df = pd.DataFrame({'employee_id': employees_df['employee_id']})
-        submission_df['manager_id'] = submission_df['employee_id'].map(manager_predictions).fillna(0).astype(int)
-        submission_df.loc[submission_df['employee_id'] == 358, 'manager_id'] = -1
-        submission_df.to_csv(submission_csv_path, index=False)
-        
-        # Generate sunburst visualization - direct function call instead of subprocess
-        from dependencies.visualize_sunburst import visualize_sunburst_hierarchy
-        visualize_sunburst_hierarchy(employees_csv_path, submission_csv_path, sunburst_html_path)
-
-        # Return the generated HTML file
-        return send_file(sunburst_html_path)
+        with admission.admit(len(employees_df), len(connections_df)):
+            _, tree = run_prediction(employees_df, connections_df, key)
+            body = render_sunburst(tree, key, output_format)
+        result_cache.put(etag, body)
+        return figure_response(body, etag, 'MISS', output_format)
 
+    except Overloaded as e:
+        return jsonify({"error": str(e)}), 429, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queues a prediction for the same inputs /predict accepts and returns 202 with
+    the job id. Answers 413 for oversized inputs and 429 with Retry-After when the
+    job queue is full.
+    """
+    try:
+        employees_df, connections_df = read_predict_inputs(request)
+        admission.check_size(len(employees_df), len(connections_df))
+    except UploadError as e:
+        return jsonify({"error": str(e)}), e.status
+
+    try:
+        job = job_manager.submit(employees_df, connections_df, prediction_key(employees_df, connections_df))
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 429, {'Retry-After': '30'}
+
+    status_url = url_for('job_status', job_id=job.id)
+    return jsonify({"id": job.id, "status": job.status, "status_url": status_url,
+                    "result_url": url_for('job_result', job_id=job.id)}), 202, {'Location': status_url}
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Status, overall progress and per-stage (embed, score, assign, render) timings of a job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job '{job_id}'"}), 404
+    return jsonify(dict(job.to_dict(), queue_depth=job_manager.queue_depth()))
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """The sunburst HTML (default) or, with ?format=json / csv, the figure JSON or submission CSV of a finished job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job '{job_id}'"}), 404
+    if job.status == 'failed':
+        return jsonify({"error": job.error}), 500
+    if job.status != 'done':
+        return jsonify(job.to_dict()), 202
+
+    if request.args.get('format', 'html') == 'csv':
+        return Response(job.result['csv'], mimetype='text/csv',
+                        headers={'Content-Disposition': f'attachment; filename=submission_{job_id}.csv'})
+    if request.args.get('format') == 'json':
+        tree = hierarchies.get(job.result['key'])
+        if tree is None:
+            return jsonify({"error": "The job's hierarchy has expired; fetch the HTML or CSV result instead"}), 410
+        return Response(render_sunburst(tree, job.result['key'], 'json'), mimetype='application/json')
+    return Response(page_body(job.result['html']), mimetype='text/html')
+
+@app.route('/hierarchy', defaults={'node_id': None}, methods=['GET'])
+@app.route('/hierarchy/<int:node_id>', methods=['GET'])
+def hierarchy(node_id):
+    """
+    Drill-down into a predicted hierarchy: the view rooted at `node_id` (default:
+    the CEO) as a JSON figure, or with ?format=html as a page. ?key= is the
+    prediction's ETag (from /predict); ?depth= and ?max_nodes= narrow the view,
+    and max_nodes never exceeds SUNBURST_MAX_NODES.
+    """
+    tree = hierarchies.get(request.args.get('key', ''))
+    if tree is None:
+        return jsonify({"error": "Unknown or expired prediction key; post the inputs to /predict again"}), 404
+    output_format = request.args.get('format', 'json')
+    try:
+        if output_format not in FIGURE_FORMATS:
+            raise ValueError(f"unknown format '{output_format}'")
+        max_depth = int(request.args.get('depth', sunburst_max_depth))
+        max_nodes = min(int(request.args.get('max_nodes', sunburst_max_nodes)), sunburst_max_nodes)
+        if max_depth < 1 or max_nodes < 1:
+            raise ValueError("depth and max_nodes must be positive")
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query: {e}"}), 400
+    try:
+        with stage('render'):
+            body = render_sunburst(tree, request.args['key'], output_format, node_id, max_depth, max_nodes)
+    except KeyError:
+        return jsonify({"error": f"Employee {node_id} is not in the predicted hierarchy"}), 404
+
+    if output_format == 'json':
+        response = Response(body, mimetype='application/json')
+    else:
+        response = Response(page_body(body), mimetype='text/html')
+    # A prediction key always names the same hierarchy
+    response.set_etag(f"{request.args['key']}.{node_id}.{max_depth}.{max_nodes}.{output_format}")
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    return response.make_conditional(request)
+
+@app.route(PLOTLY_JS_PATH, methods=['GET'])
+def plotly_js():
+    """plotly.js for the sunburst pages, gzip-compressed when accepted; versioned, so cached for a year."""
+    compressed = 'gzip' in request.accept_encodings
+    response = Response(plotly_js_body(compressed), mimetype='application/javascript')
+    if compressed:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    response.set_etag(PLOTLY_JS_VERSION + ('-gzip' if compressed else ''))
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response.make_conditional(request)
+
+# Baseline for /predict/delta: the last full prediction, updated in place by each delta.
+# A delta costs about as much as the rows it touches: its answer is built from the
+# employees apply_delta reports as reassigned, and the org index under key 'delta'
+# is only recompiled when /org next asks for it.
+delta_lock = threading.Lock()
+delta_predictor = None
+delta_index_stale = False
+
+def mark_delta_index_stale():
+    """Makes 'delta' the latest org key; its index is recompiled on the next /org query."""
+    global delta_index_stale, latest_org_key
+    delta_index_stale = True
+    latest_org_key = 'delta'
+
+def delta_org_index():
+    """The org index of the current /predict/delta hierarchy, recompiled if a delta made it stale."""
+    global delta_index_stale
+    with delta_lock:
+        if delta_predictor is not None and (delta_index_stale or 'delta' not in org_indexes):
+            submission_df = delta_predictor.submission()
+            with stage('index', items=len(submission_df)):
+                org_indexes.put('delta', HierarchyIndex.from_submission(submission_df))
+            delta_index_stale = False
+        return org_indexes.get('delta')
+
+def delta_changes(reassigned, added, removed):
+    """
+    {employee_id: submission manager_id, or None for removed employees} of the rows
+    a delta changed, from apply_delta's reassignments and the added / removed ids.
+    """
+    added, removed = set(added), set(removed)
+    ids = sorted(reassigned.keys() | added | removed)
+    employees_df = pd.DataFrame({'employee_id': np.asarray(ids, dtype=np.int64)})
+    # Through build_submission, so unassigned (0) and the CEO (-1) read as in full predictions
+    before = build_submission(employees_df, {e: old for e, (old, _) in reassigned.items() if old is not None})
+    after = build_submission(employees_df, {e: new for e, (_, new) in reassigned.items() if new is not None})
+    changes = {}
+    for e, old, new in zip(ids, before['manager_id'].tolist(), after['manager_id'].tolist()):
+        if e in removed:
+            changes[str(e)] = None
+        elif e in added or old != new:
+            changes[str(e)] = new
+    return changes
+
+@app.route('/predict/delta', methods=['POST'])
+def predict_delta():
+    """
+    Stateful, incremental prediction. Posting full inputs (as for /predict) sets a
+    new baseline. A JSON delta then updates it:
+        {"upsert_employees": [{employee row}, ...], "remove_employees": [ids],
+         "add_connections": [[a, b], ...], "remove_connections": [[a, b], ...]}
+    Returns the employees whose manager changed (null for removed employees) and
+    what was recomputed; the result equals a full re-run on the updated tables.
+    Baselines go through admission control like /predict (429 with Retry-After).
+    """
+    global delta_predictor
+    data = request.get_json(silent=True) if request.mimetype != 'multipart/form-data' else None
+    is_delta = data is not None and 'employees_csv_base64' not in data
+
+    try:
+        if not is_delta:
+            employees_df, connections_df = read_predict_inputs(request)
+            admission.check_size(len(employees_df), len(connections_df))
+        elif not isinstance(data, dict) or not set(data) <= {'upsert_employees', 'remove_employees',
+                                                             'add_connections', 'remove_connections'}:
+            raise UploadError("Expected upsert_employees, remove_employees, add_connections and/or remove_connections")
+    except UploadError as e:
+        return jsonify({"error": str(e)}), e.status
+
+    if not is_delta:
+        # A baseline is a full prediction: it waits for a slot in the same lane as /predict,
+        # and is built outside delta_lock so queued deltas on the current baseline keep flowing
+        try:
+            with admission.admit(len(employees_df), len(connections_df)):
+                baseline = IncrementalPredictor(employees_df, connections_df, model=model,
+                                                embedding_cache=embedding_cache, weights=get_scoring_weights())
+        except Overloaded as e:
+            return jsonify({"error": str(e)}), 429, {'Retry-After': str(e.retry_after)}
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+        with delta_lock:
+            delta_predictor = baseline
+            mark_delta_index_stale()
+        return jsonify({"baseline": True, "employees": len(baseline.employees_df),
+                        "assigned": len(baseline.predictions)})
+
+    with delta_lock:
+        try:
+            if delta_predictor is None:
+                return jsonify({"error": "No baseline: post the full inputs to /predict/delta first"}), 409
+
+            upsert = pd.DataFrame(data['upsert_employees']) if data.get('upsert_employees') else None
+            remove_employees = data.get('remove_employees', [])
+            # Employees the delta may add or remove, checked against the roster before and after it
+            named = np.unique(np.concatenate([
+                np.asarray(remove_employees, dtype=np.int64).ravel(),
+                upsert['employee_id'].to_numpy(dtype=np.int64) if upsert is not None else np.empty(0, dtype=np.int64),
+            ]))
+            existed = np.isin(named, delta_predictor.employees_df['employee_id'].to_numpy())
+            with stage('delta') as span:
+                reassigned = delta_predictor.apply_delta(upsert_employees=upsert,
+                                                         remove_employees=remove_employees,
+                                                         add_connections=data.get('add_connections'),
+                                                         remove_connections=data.get('remove_connections'))
+                span.items = delta_predictor.last_delta_stats['rescored_pairs']
+            exists = np.isin(named, delta_predictor.employees_df['employee_id'].to_numpy())
+            stats = dict(delta_predictor.last_delta_stats)
+            mark_delta_index_stale()
+        except (KeyError, ValueError, TypeError) as e:
+            return jsonify({"error": f"Invalid delta: {e}"}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    changes = delta_changes(reassigned, named[~existed & exists].tolist(), named[existed & ~exists].tolist())
+    return jsonify({"changes": changes, "stats": stats})
+
+def org_answer(query):
+    """JSON answer of query(index) for the requested org index; 404 for unknown keys or employees."""
+    key = request.args.get('key') or latest_org_key
+    index = delta_org_index() if key == 'delta' else org_indexes.get(key) if key else None
+    if index is None:
+        return jsonify({"error": "No predicted hierarchy for this key; post the inputs to /predict first"}), 404
+    try:
+        return jsonify(query(index))
+    except KeyError as e:
+        return jsonify({"error": f"Employee {e.args[0]} is not in the predicted hierarchy"}), 404
+
+@app.route('/org/<int:employee_id>', methods=['GET'])
+def org_employee(employee_id):
+    """Manager, direct reports, span of control and depth of one employee."""
+    return org_answer(lambda index: dict(employee_id=employee_id, manager=index.manager(employee_id),
+                                         direct_report_ids=index.direct_reports(employee_id),
+                                         **index.span_of_control(employee_id)))
+
+@app.route('/org/<int:employee_id>/chain', methods=['GET'])
+def org_chain(employee_id):
+    """Chain of command from the employee up to the top of its tree."""
+    return org_answer(lambda index: {"chain": index.chain_of_command(employee_id)})
+
+@app.route('/org/<int:employee_id>/subtree', methods=['GET'])
+def org_subtree(employee_id):
+    """The employee and everyone below, in preorder; at most ?limit= ids (default 10,000)."""
+    limit = request.args.get('limit', 10_000, type=int)
+
+    def query(index):
+        employees = index.subtree(employee_id, limit=limit)
+        size = index.span_of_control(employee_id)['total_reports'] + 1
+        return {"employee_id": employee_id, "size": size, "employees": employees, "truncated": len(employees) < size}
+    return org_answer(query)
+
+@app.route('/org/<int:a>/above/<int:b>', methods=['GET'])
+def org_is_above(a, b):
+    """Whether employee a is in b's chain of command."""
+    return org_answer(lambda index: {"above": index.is_above(a, b)})
+
+@app.route('/org/<int:a>/common/<int:b>', methods=['GET'])
+def org_common_manager(a, b):
+    """Lowest common manager of a and b (a or b themselves when one is above the other; null across trees)."""
+    return org_answer(lambda index: {"manager": index.lowest_common_manager(a, b)})
+
+@app.route('/org/query', methods=['POST'])
+def org_query():
+    """
+    Batched org queries, each answered with one array operation:
+        {"is_above": [[a, b], ...], "lowest_common_manager": [[a, b], ...], "span": [ids]}
+    Answers come back under the same names, in request order (null: no common manager).
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data or not set(data) <= {'is_above', 'lowest_common_manager', 'span'}:
+        return jsonify({"error": "Expected is_above, lowest_common_manager and/or span"}), 400
+    try:
+        pairs = {name: np.asarray(data[name], dtype=np.int64).reshape(-1, 2)
+                 for name in ('is_above', 'lowest_common_manager') if name in data}
+        span_ids = np.asarray(data.get('span', []), dtype=np.int64).reshape(-1)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Invalid query: {e}"}), 400
+    if sum(map(len, pairs.values())) + len(span_ids) > ORG_QUERY_MAX_ITEMS:
+        return jsonify({"error": f"At most {ORG_QUERY_MAX_ITEMS} pairs and ids per query"}), 413
+
+    def query(index):
+        answer = {}
+        if 'is_above' in pairs:
+            answer['is_above'] = index.is_above_many(pairs['is_above'][:, 0], pairs['is_above'][:, 1]).tolist()
+        if 'lowest_common_manager' in pairs:
+            found = index.lowest_common_managers(pairs['lowest_common_manager'][:, 0],
+                                                 pairs['lowest_common_manager'][:, 1])
+            answer['lowest_common_manager'] = [m if m >= 0 else None for m in found.tolist()]
+        if 'span' in data:
+            direct, total, depth = index.spans(span_ids)
+            answer['span'] = [{"employee_id": e, "direct_reports": d, "total_reports": t, "depth": h}
+                              for e, d, t, h in zip(span_ids.tolist(), direct.tolist(), total.tolist(), depth.tolist())]
+        return answer
+    return org_answer(query)
+
+def candidate_index_for(key):
+    """The CandidateIndex of ?key= (default: the latest full prediction), or None."""
+    key = key or latest_candidates_key
+    return candidate_indexes.get(key) if key else None
+
+NO_CANDIDATES = "No scored candidates for this key; post the inputs to /predict first"
+
+@app.route('/candidates/<int:employee_id>', methods=['GET'])
+def employee_candidates(employee_id):
+    """The ?k= best candidate managers of one employee, best first, with each signal's contribution."""
+    candidates = candidate_index_for(request.args.get('key'))
+    if candidates is None:
+        return jsonify({"error": NO_CANDIDATES}), 404
+    try:
+        return jsonify({"employee_id": employee_id,
+                        "candidates": candidates.candidates(employee_id, request.args.get('k', type=int))})
+    except KeyError as e:
+        return jsonify({"error": f"Employee {e.args[0]} was not scored"}), 404
+
+@app.route('/candidates', methods=['POST'])
+def batch_candidates():
+    """
+    Batched candidate lookups: {"employee_ids": [...], "k": optional, at most CANDIDATES_TOPK}.
+    Answers {"signals": [...], "results": [{"employee_id", "candidates"}, ...]} in
+    request order; a candidate's signal contributions sum to its score.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or 'employee_ids' not in data or not set(data) <= {'employee_ids', 'k'}:
+        return jsonify({"error": "Expected employee_ids and optionally k"}), 400
+    try:
+        employee_ids = np.asarray(data['employee_ids'], dtype=np.int64).reshape(-1)
+        k = None if data.get('k') is None else int(data['k'])
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Invalid query: {e}"}), 400
+    if len(employee_ids) > ORG_QUERY_MAX_ITEMS:
+        return jsonify({"error": f"At most {ORG_QUERY_MAX_ITEMS} ids per query"}), 413
+
+    candidates = candidate_index_for(request.args.get('key'))
+    if candidates is None:
+        return jsonify({"error": NO_CANDIDATES}), 404
+    try:
+        results = candidates.records_json(employee_ids, k)
+    except KeyError as e:
+        return jsonify({"error": f"Employee {e.args[0]} was not scored"}), 404
+    # Employees' candidate lists are serialised once and cached by the index; only the envelope is built here
+    return Response(f'{{"signals":{json.dumps(candidates.signals)},"results":{results}}}', mimetype='application/json')
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss counters and sizes of the response and embedding caches."""
+    return jsonify({"results": result_cache.stats(), "embeddings": embedding_cache.stats()})
+
+@app.route('/admission/stats', methods=['GET'])
+def admission_stats():
+    """Running and waiting predictions, slots, refusals and recent service time per lane."""
+    return jsonify(admission.stats())
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return jsonify({"status": "ok"})
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """
+    Readiness: 200 once the model is loaded and warmed up (or, with PRELOAD_MODEL=0,
+    immediately, since it loads on demand), 503 while it is loading or if it failed.
+    """
+    status = model.status()
+    body = {"ready": status in ('ready', 'not_started'), "model": status,
+            "model_seconds": round(model.load_seconds, 3) if model.load_seconds is not None else None}
+    if model.error is not None:
+        body["error"] = str(model.error)
+    return jsonify(body), 200 if body["ready"] else 503
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request and pipeline-stage metrics in the Prometheus text format."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0',debug=True, port=5001)
\ No newline at end of file
+    init_server()
+    # The debug reloader imports the app twice (and loads the model twice); opt in with FLASK_DEBUG=1
+    app.run(host='0.0.0.0', debug=os.environ.get('FLASK_DEBUG') == '1', port=int(os.environ.get('PORT', 5001)))
\ No newline at end of file
@@ -0,0 +1,31 @@
+import gc
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# --- Production WSGI entry point ---
+# Imported once by the preforking server's master (see serving/gunicorn.conf.py,
+# preload_app). init_server() loads the model synchronously here, before any
+# worker is forked, and the artifact bundle is memory-mapped, so every worker
+# shares the model weights and mapped arrays copy-on-write instead of loading
+# its own.
+os.environ.setdefault('PRELOAD_MODEL', 'sync')
+# Tokenizer thread pools do not survive fork; workers tokenize serially
+os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+# job_manager is drained by gunicorn.conf.py's worker_exit hook
+from serving import serve
+from serving.serve import app, job_manager, plotly_js_body
+
+serve.init_server()
+if serve.artifacts is not None:
+    for name in serve.artifacts.manifest['arrays']:
+        serve.artifacts.array(name)
+# The plotly.js asset is compressed once here and shared by every worker
+plotly_js_body(True)
+plotly_js_body(False)
+
+# Move everything allocated so far out of the collector's reach: collections in the
+# workers would otherwise write to (and so copy) every page holding these objects
+gc.freeze()
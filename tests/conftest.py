@@ -0,0 +1,39 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.run_stages import HashEmbedder
+from scripts.graph_arrays import CompactGraph
+
+# --- Shared test helpers ---
+# Test modules import these with `from conftest import ...`; pytest puts tests/
+# on sys.path when it loads this file.
+
+def make_graph(n, seed=0, id_step=1, edges_per_employee=8):
+    """
+    A random CompactGraph of n employees (ids id_step, 2 * id_step, ...) with
+    edges_per_employee random connections each and 16-d random embeddings.
+    """
+    rng = np.random.default_rng(seed)
+    employees = pd.DataFrame({
+        'employee_id': np.arange(1, n + 1) * id_step,
+        'seniority_score': rng.integers(1, 8, n),
+        'location': rng.choice(['NY', 'SF', None], n),
+    })
+    connections = pd.DataFrame(rng.integers(1, n + 1, (edges_per_employee * n, 2)) * id_step,
+                               columns=['employee1_id', 'employee2_id'])
+    return CompactGraph.from_frames(employees, connections, rng.standard_normal((n, 16)))
+
+
+class RecordingEmbedder(HashEmbedder):
+    """HashEmbedder that keeps every text it is asked to encode."""
+
+    def __init__(self, dim=384):
+        super().__init__(dim)
+        self.encoded = []
+
+    def encode(self, texts, show_progress_bar=False):
+        self.encoded.extend(texts)
+        return super().encode(texts, show_progress_bar)
@@ -0,0 +1,61 @@
+import os
+import sys
+import threading
+import time
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from serving.admission import AdmissionController, Overloaded
+from serving.request_io import UploadError
+
+def hold(controller, employees, connections, started, release, reject=True):
+    with controller.admit(employees, connections, reject=reject):
+        started.set()
+        release.wait(5)
+
+def test_size_limits_and_lanes():
+    controller = AdmissionController(fast_lane_max_cost=1000, max_employees=500, max_connections=5000)
+    assert controller.lane_for(100, 900) == 'fast' and controller.lane_for(400, 4000) == 'bulk'
+    with pytest.raises(UploadError) as error:
+        with controller.admit(501, 0):
+            pass
+    assert error.value.status == 413
+    with controller.admit(10, 10) as lane:
+        assert lane == 'fast' and controller.stats()['fast']['running'] == 1
+    assert controller.stats()['fast']['running'] == 0
+
+def test_full_lane_rejects_without_blocking_the_other_lane():
+    controller = AdmissionController(bulk_slots=1, max_waiting=0, fast_lane_max_cost=1000)
+    started, release = threading.Event(), threading.Event()
+    worker = threading.Thread(target=hold, args=(controller, 5000, 0, started, release))
+    worker.start()
+    started.wait(5)
+    try:
+        with pytest.raises(Overloaded) as error:
+            with controller.admit(5000, 0):
+                pass
+        assert error.value.retry_after >= 1 and controller.stats()['bulk']['rejected'] == 1
+        with controller.admit(10, 10) as lane:  # small orgs are not stuck behind the big one
+            assert lane == 'fast'
+    finally:
+        release.set()
+        worker.join()
+
+def test_waiting_times_out_but_queued_jobs_wait():
+    controller = AdmissionController(fast_slots=1, max_wait_seconds=0.05)
+    started, release = threading.Event(), threading.Event()
+    worker = threading.Thread(target=hold, args=(controller, 1, 1, started, release))
+    worker.start()
+    started.wait(5)
+    with pytest.raises(Overloaded, match='Timed out'):
+        with controller.admit(1, 1):
+            pass
+
+    job_started = threading.Event()
+    job = threading.Thread(target=hold, args=(controller, 1, 1, job_started, threading.Event(), False))
+    job.start()
+    time.sleep(0.1)
+    assert not job_started.is_set() and controller.stats()['fast']['waiting'] == 1
+    release.set()
+    assert job_started.wait(5)
+    worker.join(), job.join()
@@ -0,0 +1,57 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.ann_index import IVFIndex, exact_search, similar_candidate_edges
+from scripts.graph_arrays import CompactGraph, normalize_embeddings
+from scripts.scoring import candidate_edges
+
+def clustered(rng, n, dim=32, clusters=20):
+    centres = rng.normal(size=(clusters, dim))
+    return normalize_embeddings(centres[rng.integers(0, clusters, n)] + rng.normal(scale=0.3, size=(n, dim)))
+
+def test_probing_every_list_is_exact_search():
+    rng = np.random.default_rng(0)
+    vectors = clustered(rng, 2000)
+    ranks = rng.integers(1, 8, len(vectors))
+    queries = rng.choice(len(vectors), 300, replace=False)
+    for query_ranks in (None, ranks):
+        index = IVFIndex(vectors, ranks=query_ranks)
+        rank_above = None if query_ranks is None else ranks[queries]
+        rows, scores = index.search(vectors[queries], 5, nprobe=index.nlist, rank_above=rank_above)
+        exact_rows, exact_scores = exact_search(vectors, vectors[queries], 5, query_ranks, rank_above)
+        assert np.array_equal(rows, exact_rows)
+        assert np.allclose(scores, exact_scores)
+    # The most senior rows have nothing above them
+    assert (rows[ranks[queries] == 7] == -1).all()
+
+def test_default_probes_find_most_neighbours():
+    rng = np.random.default_rng(1)
+    vectors = clustered(rng, 5000)
+    ranks = rng.integers(1, 8, len(vectors))
+    queries = rng.choice(len(vectors), 500, replace=False)
+    rows, _ = IVFIndex(vectors, ranks=ranks).search(vectors[queries], 5, rank_above=ranks[queries])
+    exact_rows, _ = exact_search(vectors, vectors[queries], 5, ranks, ranks[queries])
+    hits = [np.isin(e[e >= 0], f).mean() for f, e in zip(rows, exact_rows) if (e >= 0).any()]
+    assert np.mean(hits) > 0.9
+
+def test_isolated_employees_get_similar_senior_candidates():
+    rng = np.random.default_rng(2)
+    n = 500
+    employees = pd.DataFrame({'employee_id': np.arange(1, n + 1), 'seniority_score': rng.integers(1, 7, n),
+                              'location': 'NY'})
+    employees.loc[0, 'seniority_score'] = 2
+    # Employee 1 has no connections at all
+    connections = pd.DataFrame(rng.integers(2, n + 1, (4 * n, 2)), columns=['employee1_id', 'employee2_id'])
+    graph = CompactGraph.from_frames(employees, connections, clustered(rng, n))
+    src, dst = candidate_edges(graph)
+    assert 0 not in src
+
+    new_src, new_dst = similar_candidate_edges(graph, src, dst, k=5)
+    assert len(new_dst[new_src == 0]) == 5
+    assert (graph.seniority[new_dst] > graph.seniority[new_src]).all()
+    # Nothing already proposed by the graph is proposed again
+    assert not np.isin(new_src * n + new_dst, src * n + dst).any()
+    assert len(np.unique(new_src * n + new_dst)) == len(new_src)
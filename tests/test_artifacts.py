@@ -0,0 +1,55 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.run_stages import HashEmbedder
+from benchmarks.synthetic_org import generate_org
+from scripts.artifacts import ArtifactBundle
+from scripts.build_artifacts import build_artifacts
+from scripts.solution import build_graph_with_features, predict_managers_globally
+
+class CountingEmbedder(HashEmbedder):
+    calls = 0
+
+    def encode(self, texts, show_progress_bar=False):
+        CountingEmbedder.calls += 1
+        return super().encode(texts, show_progress_bar)
+
+def predict(employees_df, connections_df, **kwargs):
+    graph = build_graph_with_features(employees_df.copy(), connections_df, **kwargs)
+    return predict_managers_globally(graph, artifacts=kwargs.get('artifacts'))
+
+def test_bundle_reproduces_a_full_run(tmp_path):
+    employees_df, connections_df, _ = generate_org(400, seed=2)
+    expected = predict(employees_df, connections_df, model=HashEmbedder())
+    build_artifacts(employees_df.copy(), connections_df, str(tmp_path / 'bundle'), model=HashEmbedder())
+
+    bundle = ArtifactBundle(str(tmp_path / 'bundle'))
+    CountingEmbedder.calls = 0
+    graph = build_graph_with_features(employees_df.copy(), connections_df, model=CountingEmbedder(), artifacts=bundle)
+    assert CountingEmbedder.calls == 0 and isinstance(graph.indices, np.memmap)
+    assert bundle.candidates(graph) is not None
+    assert predict_managers_globally(graph, artifacts=bundle) == expected
+
+def test_changed_connections_reuse_stored_embeddings(tmp_path):
+    employees_df, connections_df, _ = generate_org(400, seed=2)
+    build_artifacts(employees_df.copy(), connections_df, str(tmp_path / 'bundle'), model=HashEmbedder())
+    bundle = ArtifactBundle(str(tmp_path / 'bundle'))
+
+    fewer = connections_df.iloc[:-50]
+    CountingEmbedder.calls = 0
+    graph = build_graph_with_features(employees_df.copy(), fewer, model=CountingEmbedder(), artifacts=bundle)
+    assert CountingEmbedder.calls == 0 and bundle.candidates(graph) is None
+    assert predict_managers_globally(graph, artifacts=bundle) == predict(employees_df, fewer, model=HashEmbedder())
+
+    # Changed profiles invalidate the embeddings too
+    edited = employees_df.copy()
+    edited.loc[0, 'profile_summary'] = 'Rewritten summary'
+    predict(edited, connections_df, model=CountingEmbedder(), artifacts=bundle)
+    assert CountingEmbedder.calls == 1
+
+def test_missing_bundle_is_reported(tmp_path):
+    with pytest.raises(FileNotFoundError, match='build_artifacts.py'):
+        ArtifactBundle(str(tmp_path))
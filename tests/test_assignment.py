@@ -0,0 +1,81 @@
+import os
+import sys
+import random
+import networkx as nx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.assignment import assign_greedy, assign_arborescence
+
+def reference_greedy(sorted_pairs):
+    """The original DAG-check greedy, kept here as the oracle."""
+    final_predictions = {}
+    hierarchy_graph = nx.DiGraph()
+    for score, emp_id, mgr_id in sorted_pairs:
+        if emp_id in final_predictions:
+            continue
+        hierarchy_graph.add_edge(emp_id, mgr_id)
+        if nx.is_directed_acyclic_graph(hierarchy_graph):
+            final_predictions[emp_id] = mgr_id
+        else:
+            hierarchy_graph.remove_edge(emp_id, mgr_id)
+    return final_predictions
+
+def test_greedy_matches_dag_check_reference():
+    """
+    Tests that the union-find greedy makes exactly the same choices as the full DAG check.
+    """
+    rng = random.Random(7)
+    for _ in range(20):
+        n = rng.randint(2, 60)
+        pairs = [(rng.random(), rng.randrange(n), rng.randrange(n)) for _ in range(rng.randint(1, 400))]
+        pairs.sort(key=lambda x: x[0], reverse=True)
+        assert assign_greedy(pairs, show_progress=False) == reference_greedy(pairs)
+
+def test_greedy_rejects_cycles_and_self_loops():
+    pairs = [(3.0, 1, 2), (2.0, 2, 1), (1.5, 3, 3), (1.0, 2, 3), (0.5, 3, 1)]
+    assert assign_greedy(pairs, show_progress=False) == {1: 2, 2: 3}
+
+def arborescence_weight(managers, pairs):
+    best = {(emp, mgr): score for score, emp, mgr in pairs}
+    assigned = [(emp, mgr) for emp, mgr in enumerate(managers) if mgr >= 0]
+    return len(assigned), sum(best[pair] for pair in assigned)
+
+def test_arborescence_is_optimal_forest():
+    """
+    Tests the Tarjan arborescence against networkx's Edmonds implementation on a
+    graph with an explicit virtual root.
+    """
+    rng = random.Random(11)
+    for _ in range(30):
+        n = rng.randint(2, 25)
+        pairs = {}
+        for _ in range(rng.randint(1, 80)):
+            emp, mgr = rng.randrange(n), rng.randrange(n)
+            if emp != mgr:
+                pairs[(emp, mgr)] = round(rng.uniform(-1, 3), 3)
+        pairs = [(score, emp, mgr) for (emp, mgr), score in pairs.items()]
+        managers = assign_arborescence(n, [p[1] for p in pairs], [p[2] for p in pairs], [p[0] for p in pairs])
+
+        # Every real edge must be preferred over the root; -1000 per root edge enforces that
+        D = nx.DiGraph()
+        D.add_weighted_edges_from((mgr, emp, score) for score, emp, mgr in pairs)
+        D.add_weighted_edges_from(('root', v, -1000.0) for v in range(n))
+        tree = nx.maximum_spanning_arborescence(D, preserve_attrs=True)
+        expected = [-1] * n
+        for mgr, emp in tree.edges():
+            expected[emp] = -1 if mgr == 'root' else mgr
+
+        got_count, got_weight = arborescence_weight(managers, pairs)
+        exp_count, exp_weight = arborescence_weight(expected, pairs)
+        assert got_count == exp_count
+        assert abs(got_weight - exp_weight) < 1e-9
+        # The result must be a forest
+        assert assign_greedy([(1.0, e, m) for e, m in enumerate(managers) if m >= 0], show_progress=False) == \
+            {e: m for e, m in enumerate(managers) if m >= 0}
+
+def test_arborescence_assigns_everyone_with_negative_scores():
+    # A chain 2 -> 1 -> 0 is assigned whatever the sign of its scores
+    assert assign_arborescence(3, [1, 2], [0, 1], [100.0, 100.5]).tolist() == [-1, 0, 1]
+    assert assign_arborescence(3, [1, 2], [0, 1], [-100.0, -100.5]).tolist() == [-1, 0, 1]
+    # With a choice, the best negative edge still wins
+    assert assign_arborescence(3, [1, 1, 2], [0, 2, 0], [-100.0, -5.0, -300.0]).tolist() == [-1, 2, 0]
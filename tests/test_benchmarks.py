@@ -0,0 +1,47 @@
+import json
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.compare import compare_reports
+from benchmarks.run_stages import run_pipeline
+from benchmarks.synthetic_org import generate_org, write_org
+
+def test_synthetic_org_is_a_deterministic_tree():
+    employees_df, connections_df, gt_df = generate_org(500, seed=3)
+    again = generate_org(500, seed=3)
+    assert employees_df.equals(again[0]) and connections_df.equals(again[1]) and gt_df.equals(again[2])
+
+    ids = set(employees_df['employee_id'])
+    assert len(ids) == 500 and len(gt_df) == 499
+    managers = dict(zip(gt_df['employee_id'], gt_df['manager_id']))
+    ceo = (ids - set(managers)).pop()
+    assert employees_df.loc[employees_df['employee_id'] == ceo, 'job_title_current'].item() == 'Chief Executive Officer'
+    for employee in managers:
+        seen = set()
+        while employee != ceo:
+            assert employee not in seen
+            seen.add(employee)
+            employee = managers[employee]
+    assert set(np.unique(connections_df.values)) <= ids
+
+def test_run_pipeline_times_every_stage(tmp_path):
+    paths = write_org(str(tmp_path), *generate_org(300, seed=1))
+    result = run_pipeline(paths['employees'], paths['connections'], paths['ground_truth_managers'],
+                          embedder='hash', trace_memory=True, skip=['sunburst_render'], output_dir=str(tmp_path))
+    assert list(result['stages']) == ['load', 'embed', 'seniority', 'graph_build', 'score', 'assign', 'csv_write']
+    assert all(stage['seconds'] >= 0 and 'peak_mb' in stage for stage in result['stages'].values())
+    assert result['employees'] == 300 and 0 < result['accuracy'] <= 1
+    json.dumps(result)
+
+def test_compare_flags_only_real_regressions():
+    def report(score_seconds, load_seconds, accuracy):
+        return {'runs': [{'dataset': 'synthetic-1000', 'accuracy': accuracy,
+                          'stages': {'score': {'seconds': score_seconds}, 'load': {'seconds': load_seconds}}}]}
+
+    # load is 3x slower but only by 2ms, under the absolute floor
+    _, regressions = compare_reports(report(1.0, 0.001, 0.8), report(1.1, 0.003, 0.8))
+    assert regressions == []
+    _, regressions = compare_reports(report(1.0, 0.001, 0.8), report(1.5, 0.001, 0.7))
+    assert [(row[1], row[2]) for row in regressions] == [('score', 'seconds'), ('total', 'accuracy')]
@@ -0,0 +1,63 @@
+import json
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from conftest import make_graph
+from scripts.candidate_index import CandidateIndex
+from scripts.scoring import ScoringWeights, candidate_edges, compute_edge_features
+
+WEIGHTS = ScoringWeights(1.0, 0.5, 1.0, 0.25)
+
+def scored(graph):
+    src, dst = candidate_edges(graph)
+    features = compute_edge_features(graph, src, dst)
+    return src, dst, features, features @ np.asarray(WEIGHTS)
+
+def test_top_k_matches_sorting_each_employee():
+    graph = make_graph(400, id_step=3, edges_per_employee=6)
+    src, dst, features, scores = scored(graph)
+    candidates = CandidateIndex.from_scored_edges(graph, src, dst, scores, WEIGHTS, k=3)
+
+    for row in range(graph.number_of_nodes()):
+        edges = np.flatnonzero(src == row)
+        best = edges[np.argsort(-scores[edges], kind='stable')[:3]]
+        found = candidates.candidates(graph.node_ids[row])
+        assert [c['manager_id'] for c in found] == graph.node_ids[dst[best]].tolist()
+        for c, edge in zip(found, best):
+            assert np.isclose(c['score'], scores[edge], atol=1e-5)
+            assert np.isclose(sum(c[name] for name in candidates.signals), c['score'], atol=1e-5)
+
+    # Features at hand (an artifact bundle) give the same index
+    stored = CandidateIndex.from_scored_edges(graph, src, dst, scores, WEIGHTS, k=3, features=features)
+    assert np.array_equal(stored.manager_ids, candidates.manager_ids)
+    assert np.allclose(stored.contributions, candidates.contributions, equal_nan=True)
+
+def test_batch_json_and_table_agree_with_single_lookups():
+    graph = make_graph(400, seed=1, id_step=3, edges_per_employee=6)
+    src, dst, _, scores = scored(graph)
+    candidates = CandidateIndex.from_scored_edges(graph, src, dst, scores, WEIGHTS, k=4)
+    ids = np.random.default_rng(2).choice(graph.node_ids, 200)
+
+    for k in (None, 2, 2, 0):
+        # The second k=2 pass is served from cached fragments
+        answer = json.loads(candidates.records_json(ids, k))
+        assert [a['employee_id'] for a in answer] == ids.tolist()
+        assert [a['candidates'] for a in answer] == candidates.records(ids, k)
+
+    table = candidates.to_frame()
+    assert len(table) == (candidates.manager_ids >= 0).sum()
+    first = table[table['employee_id'] == ids[0]]
+    assert first['manager_id'].tolist() == [c['manager_id'] for c in candidates.candidates(ids[0])]
+    with pytest.raises(KeyError, match='-5'):
+        candidates.records_json([ids[0], -5])
+
+def test_bytes_round_trip():
+    graph = make_graph(50, seed=3, id_step=3, edges_per_employee=6)
+    src, dst, _, scores = scored(graph)
+    candidates = CandidateIndex.from_scored_edges(graph, src, dst, scores, WEIGHTS, k=3)
+    restored = CandidateIndex.from_bytes(candidates.to_bytes())
+    assert restored.k == 3
+    assert restored.records_json(graph.node_ids) == candidates.records_json(graph.node_ids)
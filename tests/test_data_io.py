@@ -0,0 +1,34 @@
+import io
+import os
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.data_io import read_employees, read_connections, infer_format
+
+def test_formats_load_identically(tmp_path):
+    """
+    Tests that CSV, Parquet and Arrow IPC inputs produce the same frames and that
+    connections always come back as int64 columns.
+    """
+    employees = read_employees('data/employees.csv')
+    connections = read_connections('data/connections.csv')
+    assert employees.equals(pd.read_csv('data/employees.csv', engine='python'))
+    assert connections.dtypes.tolist() == ['int64', 'int64']
+
+    employees.to_parquet(tmp_path / 'employees.parquet')
+    connections.to_feather(tmp_path / 'connections.arrow')
+    assert read_employees(str(tmp_path / 'employees.parquet')).equals(employees)
+    assert read_connections(str(tmp_path / 'connections.arrow')).equals(connections)
+
+    with open('data/connections.csv', 'rb') as f:
+        assert read_connections(io.BytesIO(f.read())).equals(connections)
+
+def test_large_connection_ids_keep_their_value():
+    connections = read_connections(io.BytesIO(b'employee1_id,employee2_id\n3000000000,1\n'))
+    assert connections.iloc[0].tolist() == [3_000_000_000, 1]
+
+def test_infer_format():
+    assert infer_format('org/employees.csv.gz') == 'csv'
+    assert infer_format('employees.PARQUET') == 'parquet'
+    assert infer_format('connections.feather') == 'arrow'
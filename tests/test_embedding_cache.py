@@ -0,0 +1,112 @@
+import multiprocessing
+import os
+import sys
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.embedding_cache import EmbeddingCache
+
+class CountingEncoder:
+    def __init__(self):
+        self.encoded = []
+
+    def __call__(self, texts):
+        self.encoded.extend(texts)
+        return np.array([[len(t), t.count('a'), 1.0] for t in texts], dtype=np.float32)
+
+def test_cache_encodes_only_unique_misses_and_persists(tmp_path):
+    encoder = CountingEncoder()
+    cache = EmbeddingCache(str(tmp_path), 'test-model')
+    first = cache.get_embeddings(['alpha', 'beta', 'alpha'], encoder)
+    assert encoder.encoded == ['alpha', 'beta']
+    assert np.array_equal(first[0], first[2])
+
+    # A fresh instance reads the memory-mapped store back from disk
+    reopened = EmbeddingCache(str(tmp_path), 'test-model')
+    second = reopened.get_embeddings(['beta', 'alpha', 'gamma'], encoder)
+    assert encoder.encoded == ['alpha', 'beta', 'gamma']
+    assert np.array_equal(second[:2], first[[1, 0]])
+
+    # Different model names never share entries
+    EmbeddingCache(str(tmp_path), 'other-model').get_embeddings(['alpha'], encoder)
+    assert encoder.encoded[-1] == 'alpha'
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    encoder = CountingEncoder()
+    cache = EmbeddingCache(str(tmp_path), 'test-model', max_entries=2)
+    cache.get_embeddings(['a'], encoder)
+    cache.get_embeddings(['bb'], encoder)
+    cache.get_embeddings(['a'], encoder)      # 'a' is now more recent than 'bb'
+    cache.get_embeddings(['ccc'], encoder)    # evicts 'bb'
+    encoder.encoded.clear()
+    result = cache.get_embeddings(['a', 'ccc', 'bb'], encoder)
+    assert encoder.encoded == ['bb']
+    assert result[:, 0].tolist() == [1, 3, 2]
+    assert cache.stats()['entries'] == 2
+
+def encode_by_text(texts):
+    """The same vector for the same text in every process."""
+    return np.array([[sum(map(ord, t)) % 997, len(t), 1.0] for t in texts], dtype=np.float32)
+
+def hammer_cache(directory, seed, queue):
+    rng = np.random.default_rng(seed)
+    cache = EmbeddingCache(directory, 'test-model', max_entries=20)
+    pool = [f'profile {i}' for i in range(40)]
+    wrong = 0
+    for _ in range(40):
+        texts = list(rng.choice(pool, size=5))
+        wrong += int(not np.array_equal(cache.get_embeddings(texts, encode_by_text), encode_by_text(texts)))
+    queue.put(wrong)
+
+def test_processes_sharing_a_directory_never_mix_up_vectors(tmp_path):
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    workers = [context.Process(target=hammer_cache, args=(str(tmp_path), seed, queue)) for seed in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert [queue.get() for _ in workers] == [0] * len(workers)
+
+    # What was persisted maps every text to its own vector
+    encoded = []
+    def encode(texts):
+        encoded.extend(texts)
+        return encode_by_text(texts)
+    texts = [f'profile {i}' for i in range(40)]
+    result = EmbeddingCache(str(tmp_path), 'test-model', max_entries=20).get_embeddings(texts, encode)
+    assert np.array_equal(result, encode_by_text(texts))
+    assert len(texts) - 20 <= len(encoded) < len(texts)
+
+def test_hits_do_not_rewrite_the_index(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'test-model')
+    cache.get_embeddings(['alpha', 'beta'], CountingEncoder())
+    index_path = os.path.join(cache.directory, 'index.json')
+    before = os.stat(index_path)
+    cache.get_embeddings(['beta', 'alpha'], CountingEncoder())
+    after = os.stat(index_path)
+    assert (before.st_ino, before.st_mtime_ns) == (after.st_ino, after.st_mtime_ns)
+
+def test_cached_lookups_do_not_wait_for_another_callers_encode(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'test-model')
+    cache.get_embeddings(['alpha'], encode_by_text)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_encode(texts):
+        started.set()
+        assert release.wait(10)
+        return encode_by_text(texts)
+
+    slow = threading.Thread(target=cache.get_embeddings, args=(['beta'], slow_encode))
+    slow.start()
+    try:
+        assert started.wait(10)
+        cached = threading.Thread(target=cache.get_embeddings, args=(['alpha'], encode_by_text))
+        cached.start()
+        cached.join(5)
+        assert not cached.is_alive()
+    finally:
+        release.set()
+        slow.join()
+    assert np.array_equal(cache.get_embeddings(['beta'], CountingEncoder()), encode_by_text(['beta']))
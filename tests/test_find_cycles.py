@@ -0,0 +1,49 @@
+import os
+import sys
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dependencies.find_cycles import analyze_hierarchy, analyze_submission, find_hierarchy_cycles
+
+def reference_cycles(employee_ids, manager_ids):
+    G = nx.DiGraph()
+    for e, m in zip(employee_ids, manager_ids):
+        if m not in (-1, 0):
+            G.add_edge(e, m)
+    return sorted(sorted(c) for c in nx.simple_cycles(G))
+
+def test_cycles_match_networkx_on_random_functional_graphs():
+    rng = np.random.default_rng(3)
+    for _ in range(200):
+        ids = rng.permutation(np.arange(1, 100))[:rng.integers(1, 30)]
+        managers = np.where(rng.random(len(ids)) < 0.2, rng.choice([-1, 0, 500], len(ids)), rng.choice(ids, len(ids)))
+        report = analyze_hierarchy(ids, managers)
+        assert sorted(sorted(c) for c in report['cycles']) == reference_cycles(ids.tolist(), managers.tolist())
+        manager_of = dict(zip(ids.tolist(), managers.tolist()))
+        for cycle in report['cycles']:
+            assert all(manager_of[a] == b for a, b in zip(cycle, cycle[1:] + cycle[:1]))
+
+def test_feeding_chains_depth_and_duplicates():
+    # 1 <- 2 <- 3 is a valid chain; 10 -> 11 -> 12 -> 10 is a cycle fed by 13 <- 14
+    submission = pd.DataFrame({
+        'employee_id': [1, 2, 3, 10, 11, 12, 13, 14, 3],
+        'manager_id':  [-1, 1, 2, 11, 12, 10, 10, 13, 1],
+    })
+    report = analyze_submission(submission)
+    assert report['cycles'] == [[10, 11, 12]]
+    assert sorted(report['feeding'][0].tolist()) == [13, 14]
+    assert report['depth'].tolist() == [0, 1, 2, 0, 0, 0, 1, 2]
+    assert report['max_depth'] == 2 and report['duplicates'].tolist() == [3]
+
+def test_cli_report(tmp_path, capsys):
+    path = tmp_path / 'submission.csv'
+    pd.DataFrame({'employee_id': [1, 2, 3], 'manager_id': [2, 1, 0]}).to_csv(path, index=False)
+    report = find_hierarchy_cycles(str(path))
+    out = capsys.readouterr().out
+    assert 'Cycle 1: 1 -> 2 -> 1' in out and len(report['cycles']) == 1
+
+    pd.DataFrame({'employee_id': [1, 2], 'manager_id': [-1, 1]}).to_csv(path, index=False)
+    find_hierarchy_cycles(str(path))
+    assert '[SUCCESS]' in capsys.readouterr().out
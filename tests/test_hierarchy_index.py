@@ -0,0 +1,76 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.hierarchy_index import HierarchyIndex
+
+def random_forest(rng, n):
+    """{employee: manager} for a random forest: -1 for the CEO, 0 for a few unassigned employees."""
+    ids = rng.permutation(np.arange(1, n + 1)) * 7
+    managers = {int(ids[0]): -1}
+    for i in range(1, n):
+        managers[int(ids[i])] = 0 if rng.random() < 0.05 else int(ids[rng.integers(0, i)])
+    return managers
+
+def reference_chain(managers, e):
+    chain = [e]
+    while managers[chain[-1]] not in (0, -1):
+        chain.append(managers[chain[-1]])
+    return chain
+
+def test_queries_match_walking_the_tree():
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        managers = random_forest(rng, int(rng.integers(1, 200)))
+        # Input order does not matter
+        ids = list(managers)
+        rng.shuffle(ids)
+        index = HierarchyIndex(ids, [managers[e] for e in ids])
+        chains = {e: reference_chain(managers, e) for e in ids}
+
+        for e in ids[:20]:
+            below = [x for x in ids if e in chains[x]]
+            assert index.chain_of_command(e) == chains[e]
+            assert index.subtree(e)[0] == e and sorted(index.subtree(e)) == sorted(below)
+            assert index.span_of_control(e) == {'direct_reports': sum(managers[x] == e for x in ids),
+                                                'total_reports': len(below) - 1, 'depth': len(chains[e]) - 1}
+
+        a, b = rng.choice(ids, 300), rng.choice(ids, 300)
+        above = index.is_above_many(a, b)
+        common = index.lowest_common_managers(a, b)
+        for x, y, is_above, lcm in zip(a.tolist(), b.tolist(), above, common):
+            assert is_above == (x != y and x in chains[y]) == index.is_above(x, y)
+            shared = [m for m in chains[x] if m in chains[y]]
+            assert lcm == (shared[0] if shared else -1)
+            assert index.lowest_common_manager(x, y) == (shared[0] if shared else None)
+
+def test_deep_chains_and_unassigned_marker():
+    # A 5,000-deep chain under employee 0; manager 0 still means unassigned, so 1 and 3 start new trees
+    depth = 5000
+    ids = np.arange(0, depth + 1)
+    managers = np.concatenate([[-1], ids[:-1]])
+    managers[3] = 0
+    index = HierarchyIndex(ids, managers)
+    assert index.chain_of_command(2) == [2, 1] and index.manager(1) is None
+    assert index.span_of_control(0)['total_reports'] == 0
+    assert index.span_of_control(depth)['depth'] == depth - 3
+    assert index.lowest_common_manager(depth, 10) == 10 and index.lowest_common_manager(depth, 2) is None
+    assert index.subtree(4, limit=3) == [4, 5, 6]
+
+def test_from_submission_and_cycles():
+    submission = pd.DataFrame({'employee_id': [1, 2, 3, 4], 'manager_id': [-1, 1, 1, 2]})
+    index = HierarchyIndex.from_submission(submission)
+    assert index.direct_reports(1) == [2, 3] and index.is_above(1, 4) and not index.is_above(3, 4)
+    assert HierarchyIndex.from_predictions({2: 1, 3: 1, 4: 2}, employee_ids=[1, 2, 3, 4]).subtree(1) == [1, 2, 4, 3]
+    try:
+        HierarchyIndex([1, 2, 3], [-1, 3, 2])
+        assert False, 'expected ValueError'
+    except ValueError:
+        pass
+    try:
+        index.chain_of_command(99)
+        assert False, 'expected KeyError'
+    except KeyError:
+        pass
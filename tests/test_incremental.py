@@ -0,0 +1,100 @@
+import contextlib
+import io
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from conftest import RecordingEmbedder
+from scripts.incremental import IncrementalPredictor
+from scripts.solution import build_graph_with_features, predict_managers_globally
+
+def full_recompute(predictor):
+    employees_df = predictor.employees_df.drop(columns=['combined_text', 'seniority_score'])
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph = build_graph_with_features(employees_df, predictor.connections_df.copy(), model=RecordingEmbedder())
+        return predict_managers_globally(graph)
+
+def test_deltas_match_a_full_recompute():
+    employees = pd.read_csv('data/employees.csv')
+    connections = pd.read_csv('data/connections.csv')
+    encoder = RecordingEmbedder()
+    rng = np.random.default_rng(0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor = IncrementalPredictor(employees, connections, model=encoder)
+    assert predictor.predictions == full_recompute(predictor)
+
+    def some_employee():
+        return predictor.employees_df.sample(1, random_state=int(rng.integers(1 << 30))).drop(
+            columns=['combined_text', 'seniority_score'])
+
+    promoted = some_employee().assign(job_title_current='Director of Engineering')
+    new_hire = some_employee().assign(employee_id=10_000, profile_summary='Recently joined')
+    deltas = [
+        dict(add_connections=rng.choice(employees['employee_id'], size=(3, 2))),
+        dict(remove_connections=connections.to_numpy()[rng.choice(len(connections), size=3)]),
+        dict(remove_employees=[int(rng.choice(employees['employee_id']))]),
+        dict(upsert_employees=promoted),
+        dict(upsert_employees=new_hire, add_connections=[[10_000, e] for e in rng.choice(employees['employee_id'], 4)]),
+    ]
+    for delta in deltas:
+        encoder.encoded.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            predictor.apply_delta(**delta)
+        assert predictor.predictions == full_recompute(predictor)
+        # Only new or edited profiles are embedded again
+        assert len(encoder.encoded) == (1 if 'upsert_employees' in delta else 0)
+        assert predictor.last_delta_stats['rescored_pairs'] < len(predictor._scores)
+
+TITLES = ['Analyst', 'Senior Analyst', 'Engineering Manager', 'Director of Sales', 'VP Operations', 'Associate']
+
+def random_org(rng, n):
+    """Small org with repeated titles (tied scores) and a few connection-only ids."""
+    employees = pd.DataFrame({
+        'employee_id': np.arange(1, n + 1),
+        'name': [f'E{i}' for i in range(1, n + 1)],
+        'location': rng.choice(['NY', 'SF'], n),
+        'job_title_current': rng.choice(TITLES, n),
+        'profile_summary': rng.choice(['', 'Builds things'], n),
+    })
+    ids = np.arange(1, n + 4)
+    connections = pd.DataFrame(rng.choice(ids, size=(3 * n, 2)), columns=['employee1_id', 'employee2_id'])
+    return employees, connections
+
+def random_delta(rng, predictor, next_id):
+    employee_ids = predictor.employees_df['employee_id'].to_numpy()
+    pool = np.concatenate([employee_ids, [next_id - 1, next_id - 2]])
+    kind = rng.integers(5)
+    if kind == 0:
+        return dict(add_connections=rng.choice(pool, size=(int(rng.integers(1, 4)), 2)))
+    if kind == 1 and len(predictor.connections_df):
+        rows = rng.choice(len(predictor.connections_df), size=min(2, len(predictor.connections_df)), replace=False)
+        return dict(remove_connections=predictor.connections_df.to_numpy()[rows])
+    if kind == 2 and len(employee_ids) > 3:
+        return dict(remove_employees=[int(rng.choice(employee_ids))])
+    row = predictor.employees_df.sample(1, random_state=int(rng.integers(1 << 30))).drop(
+        columns=['combined_text', 'seniority_score'])
+    if kind == 3:
+        return dict(upsert_employees=row.assign(job_title_current=rng.choice(TITLES)))
+    return dict(upsert_employees=row.assign(employee_id=next_id),
+                add_connections=[[next_id, e] for e in rng.choice(pool, 2)])
+
+def test_random_deltas_match_a_full_recompute():
+    rng = np.random.default_rng(1)
+    for trial in range(40):
+        employees, connections = random_org(rng, int(rng.integers(6, 25)))
+        next_id = 1_000
+        with contextlib.redirect_stdout(io.StringIO()):
+            predictor = IncrementalPredictor(employees, connections, model=RecordingEmbedder())
+        for step in range(8):
+            delta = random_delta(rng, predictor, next_id)
+            next_id += 1
+            before = predictor.predictions
+            with contextlib.redirect_stdout(io.StringIO()):
+                reassigned = predictor.apply_delta(**delta)
+            after = predictor.predictions
+            assert after == full_recompute(predictor), (trial, step, delta)
+            # The reported reassignments are exactly the differences between the two mappings
+            assert reassigned == {e: (before.get(e), after.get(e)) for e in before.keys() | after.keys()
+                                  if before.get(e) != after.get(e)}, (trial, step, delta)
@@ -0,0 +1,73 @@
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from serving.jobs import JobManager, JobQueueFull, JOB_STAGES
+
+def wait_for(job, timeout=5.0):
+    deadline = time.time() + timeout
+    while job.status in ('queued', 'running') and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+def test_jobs_report_stages_and_results():
+    def run_job(job, value):
+        for stage in JOB_STAGES:
+            job.start_stage(stage)
+        return value * 2
+
+    manager = JobManager(run_job, workers=1)
+    job = wait_for(manager.submit(21))
+    assert job.status == 'done' and job.result == 42 and job.progress() == 1.0
+    assert all(stage['status'] == 'done' for stage in job.stages.values())
+    assert manager.get(job.id) is job
+
+def test_failed_job_marks_its_stage():
+    def run_job(job):
+        job.start_stage('embed')
+        job.start_stage('score')
+        raise ValueError("boom")
+
+    job = wait_for(JobManager(run_job, workers=1).submit())
+    assert job.status == 'failed' and job.error == 'boom'
+    assert job.stages['embed']['status'] == 'done' and job.stages['score']['status'] == 'failed'
+
+def test_full_queue_rejects_new_jobs_and_old_jobs_are_retired():
+    release = threading.Event()
+    manager = JobManager(lambda job: release.wait(), workers=1, max_queued=1, max_finished=1)
+    first = manager.submit()
+    while first.status == 'queued':
+        time.sleep(0.01)
+    second = manager.submit()  # waits in the queue while the worker is busy
+    with pytest.raises(JobQueueFull):
+        manager.submit()
+
+    release.set()
+    wait_for(first), wait_for(second)
+    time.sleep(0.05)
+    assert manager.get(first.id) is None and manager.get(second.id) is second
+
+def _submit_in_child(manager, results):
+    job = wait_for(manager.submit(1))
+    results.put(job.status)
+
+def test_forked_process_starts_its_own_workers():
+    # Created before a preforking server forks: no threads yet, each child starts its own
+    manager = JobManager(lambda job, value: value, workers=1)
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    child = context.Process(target=_submit_in_child, args=(manager, results))
+    child.start()
+    assert results.get(timeout=10) == 'done'
+    child.join()
+    assert manager._threads == []
+
+def test_drain_waits_for_queued_jobs():
+    manager = JobManager(lambda job: time.sleep(0.1), workers=1)
+    jobs = [manager.submit() for _ in range(3)]
+    assert not manager.drain(timeout=0.01)
+    assert manager.drain(timeout=5) and all(job.status == 'done' for job in jobs)
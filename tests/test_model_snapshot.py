@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import threading
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scripts.model_snapshot as model_snapshot
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class StubModel:
+    def encode(self, texts, show_progress_bar=False):
+        return np.ones((len(texts), 3), dtype=np.float32)
+
+def test_background_model_waits_for_load(monkeypatch):
+    release = threading.Event()
+    def slow_load(model_name, snapshot_dir=None):
+        release.wait(5)
+        return StubModel()
+    monkeypatch.setattr(model_snapshot, 'load_model', slow_load)
+
+    model = model_snapshot.BackgroundModel(warmup=False)
+    assert model.status() == 'not_started' and not model.ready()
+    model.start()
+    assert model.status() == 'loading'
+    release.set()
+    assert model.encode(['a', 'b']).shape == (2, 3)
+    assert model.ready() and model.status() == 'ready' and model.load_seconds is not None
+
+def test_background_model_reports_load_failure(monkeypatch):
+    def broken_load(model_name, snapshot_dir=None):
+        raise OSError('no network')
+    monkeypatch.setattr(model_snapshot, 'load_model', broken_load)
+
+    model = model_snapshot.BackgroundModel().start()
+    with pytest.raises(RuntimeError, match='no network'):
+        model.encode(['a'])
+    assert model.status() == 'failed' and not model.ready()
+
+def test_synchronous_load(monkeypatch):
+    monkeypatch.setattr(model_snapshot, 'load_model', lambda model_name, snapshot_dir=None: StubModel())
+    model = model_snapshot.BackgroundModel().load()
+    assert model.ready() and model.start()._thread is threading.current_thread()
+    assert model.encode(['a']).shape == (1, 3)
+
+def test_missing_snapshot_is_reported(tmp_path):
+    with pytest.raises(FileNotFoundError, match='model_snapshot.py'):
+        model_snapshot.load_model(snapshot_dir=str(tmp_path))
+
+def test_importing_the_pipeline_does_not_import_torch():
+    probe = "import sys, scripts.solution; print(sorted(m for m in ('torch', 'sentence_transformers', 'tqdm') if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', probe], cwd=REPO_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == '[]'
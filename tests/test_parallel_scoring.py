@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from conftest import make_graph
+import scripts.parallel_scoring as parallel_scoring
+from scripts.scoring import ScoringWeights, score_candidate_edges
+
+def test_shards_split_at_employee_boundaries():
+    src = np.repeat(np.arange(10), [5, 1, 1, 9, 2, 2, 0, 4, 3, 3])
+    bounds = parallel_scoring.shard_bounds(src, 4)
+    assert bounds[0] == 0 and bounds[-1] == len(src) and np.all(np.diff(bounds) > 0)
+    assert all(src[b] != src[b - 1] for b in bounds[1:-1])
+
+def test_parallel_scores_are_identical_to_serial(monkeypatch):
+    monkeypatch.setattr(parallel_scoring, 'PARALLEL_MIN_EDGES', 0)
+    graph = make_graph(3000)
+    weights = ScoringWeights(1.0, 0.5, 1.0, 0.25)
+    serial = score_candidate_edges(graph, weights)
+    parallel = parallel_scoring.score_candidate_edges_parallel(graph, weights, workers=3)
+    for expected, actual in zip(serial, parallel):
+        assert np.array_equal(expected, actual)
+
+def test_concurrent_callers_share_one_pool():
+    with ThreadPoolExecutor(8) as threads:
+        pools = list(threads.map(lambda _: parallel_scoring._get_pool(5), range(32)))
+    assert all(pool is pools[0] for pool in pools)
+    parallel_scoring._pools.pop(5).shutdown()
+
+# Run as a script: scoring workers re-import it as __mp_main__, and with it serving.serve
+LAUNCHER = """
+import os, sys, types
+sys.path[:0] = [{repo!r}, os.path.join({repo!r}, 'tests')]
+import numpy as np
+
+class SentenceTransformer:
+    def __init__(self, *args, **kwargs):
+        with open({log!r}, 'a') as f:
+            f.write(f'{{os.getpid()}}\\n')
+    def encode(self, texts, **kwargs):
+        return np.zeros((len(texts), 4), dtype=np.float32)
+
+sys.modules['sentence_transformers'] = types.SimpleNamespace(SentenceTransformer=SentenceTransformer)
+os.environ.update(PRELOAD_MODEL='sync', EMBEDDING_CACHE_DIR={cache!r})
+from serving import serve
+
+if __name__ == '__main__':
+    import scripts.parallel_scoring as parallel_scoring
+    from scripts.scoring import ScoringWeights
+    from conftest import make_graph
+    serve.init_server()
+    parallel_scoring.PARALLEL_MIN_EDGES = 0
+    parallel_scoring.score_candidate_edges_parallel(make_graph(500), ScoringWeights(1.0, 0.5, 1.0, 0.25), workers=2)
+    print(os.getpid())
+"""
+
+def test_scoring_workers_do_not_load_the_server_model(tmp_path):
+    log = str(tmp_path / 'loads.txt')
+    script = tmp_path / 'launch.py'
+    script.write_text(textwrap.dedent(LAUNCHER.format(repo=REPO_ROOT, log=log, cache=str(tmp_path / 'cache'))))
+    result = subprocess.run([sys.executable, str(script)], cwd=tmp_path, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    with open(log) as f:
+        assert f.read().split() == [result.stdout.split()[-1]]
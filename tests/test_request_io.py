@@ -0,0 +1,96 @@
+import base64
+import gzip
+import io
+import json
+import os
+import sys
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+import zstandard
+from flask import Flask, jsonify, request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from serving.request_io import InMemoryRequest, DecompressRequestMiddleware, UploadError, read_predict_inputs
+
+def make_client(max_content_length=None):
+    """A bare app wired like serve.py, echoing the parsed frame shapes."""
+    app = Flask(__name__)
+    app.config['MAX_CONTENT_LENGTH'] = max_content_length
+    app.request_class = InMemoryRequest
+    app.wsgi_app = DecompressRequestMiddleware(app.wsgi_app, max_decoded_bytes=max_content_length)
+
+    @app.route('/predict', methods=['POST'])
+    def predict():
+        try:
+            employees_df, connections_df = read_predict_inputs(request)
+        except UploadError as e:
+            return jsonify({"error": str(e)}), e.status
+        return jsonify({"employees": list(employees_df.shape), "connections": list(connections_df.shape),
+                        "connection_dtypes": [str(t) for t in connections_df.dtypes]})
+
+    return app.test_client()
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+EXPECTED = {"employees": [777, 6], "connections": [2026, 2], "connection_dtypes": ["int64", "int64"]}
+
+def test_json_body_plain_and_compressed():
+    client = make_client()
+    body = {'employees_csv_base64': base64.b64encode(read_bytes('data/employees.csv')).decode(),
+            'connections_csv_base64': base64.b64encode(read_bytes('data/connections.csv')).decode()}
+    assert client.post('/predict', json=body).get_json() == EXPECTED
+
+    raw = json.dumps(body).encode()
+    for encoding, data in [('gzip', gzip.compress(raw)), ('zstd', zstandard.ZstdCompressor().compress(raw))]:
+        response = client.post('/predict', data=data, content_type='application/json',
+                               headers={'Content-Encoding': encoding})
+        assert response.get_json() == EXPECTED
+
+def test_multipart_parts_in_columnar_and_compressed_formats():
+    client = make_client()
+    employees = pd.read_csv('data/employees.csv')
+    connections = pd.read_csv('data/connections.csv')
+
+    parquet = io.BytesIO()
+    employees.to_parquet(parquet)
+    table = pa.Table.from_pandas(connections)
+    arrow_stream = io.BytesIO()
+    with pa.ipc.new_stream(arrow_stream, table.schema) as writer:
+        writer.write_table(table)
+
+    uploads = [
+        ((io.BytesIO(parquet.getvalue()), 'employees.parquet'),
+         (io.BytesIO(gzip.compress(read_bytes('data/connections.csv'))), 'connections.csv.gz')),
+        ((io.BytesIO(zstandard.ZstdCompressor().compress(read_bytes('data/employees.csv'))), 'employees.csv.zst'),
+         (io.BytesIO(arrow_stream.getvalue()), 'connections.arrows')),
+    ]
+    for employees_part, connections_part in uploads:
+        response = client.post('/predict', data={'employees': employees_part, 'connections': connections_part},
+                               content_type='multipart/form-data')
+        assert response.get_json() == EXPECTED
+
+def test_bad_uploads_are_client_errors():
+    client = make_client()
+    assert client.post('/predict', json={}).status_code == 400
+    response = client.post('/predict', data={'employees': (io.BytesIO(b'x'), 'employees.parquet')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 400
+    response = client.post('/predict', json={'employees_csv_base64': '!!', 'connections_csv_base64': '!!'})
+    assert response.status_code == 400
+
+def test_decoded_body_size_is_limited():
+    body = json.dumps({'employees_csv_base64': base64.b64encode(b'x' * 100_000).decode(),
+                       'connections_csv_base64': ''}).encode()
+    response = make_client(max_content_length=50_000).post(
+        '/predict', data=gzip.compress(body), content_type='application/json', headers={'Content-Encoding': 'gzip'})
+    assert len(gzip.compress(body)) < 50_000 and response.status_code == 413
+
+    # A body of exactly the limit is accepted (and then rejected as a bad upload)
+    limit = len(body)
+    for size, status in [(limit, 400), (limit - 1, 413)]:
+        response = make_client(max_content_length=size).post(
+            '/predict', data=gzip.compress(body), content_type='application/json', headers={'Content-Encoding': 'gzip'})
+        assert response.status_code == status
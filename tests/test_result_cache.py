@@ -0,0 +1,48 @@
+import os
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from serving.result_cache import ResultCache, ObjectCache, request_key
+
+def test_request_key_depends_on_content_and_settings():
+    employees = pd.DataFrame({'employee_id': [1, 2], 'title': ['CEO', 'Engineer']})
+    connections = pd.DataFrame({'a': [1], 'b': [2]})
+    key = request_key(employees, connections, 'model', (1.0, 0.0))
+
+    # Same content with a different index still hashes the same
+    assert request_key(employees.set_index(pd.Index([5, 6])), connections, 'model', (1.0, 0.0)) == key
+    assert request_key(employees.assign(title=['CEO', 'Manager']), connections, 'model', (1.0, 0.0)) != key
+    assert request_key(employees, connections, 'model', (1.0, 0.5)) != key
+
+def test_lru_eviction_by_count_and_bytes():
+    cache = ResultCache(max_entries=2, max_bytes=10)
+    cache.put('a', b'1111')
+    cache.put('b', b'2222')
+    assert cache.get('a') == b'1111'
+    cache.put('c', b'3333')  # over the entry limit: 'b' is least recently used
+    assert cache.get('b') is None
+    cache.put('d', b'4444444')  # over the byte limit: evicts down to 10 bytes
+    assert cache.get('a') is None and cache.get('d') == b'4444444'
+    stats = cache.stats()
+    assert stats['hits'] == 2 and stats['misses'] == 2 and stats['bytes'] <= 10
+
+def test_evicted_entries_spill_to_disk_and_survive_restart(tmp_path):
+    cache = ResultCache(max_entries=1, spill_dir=str(tmp_path), max_disk_bytes=8)
+    cache.put('a', b'aaaa')
+    cache.put('b', b'bbbb')
+    assert cache.get('a') == b'aaaa' and cache.stats()['disk_hits'] == 1
+
+    reopened = ResultCache(max_entries=1, spill_dir=str(tmp_path), max_disk_bytes=8)
+    assert 'a' in reopened and reopened.get('a') == b'aaaa'
+    reopened.put('c', b'cccccccc')
+    reopened.put('d', b'dddd')  # spilling 'c' pushes the disk tier over its byte limit
+    assert reopened.stats()['disk_bytes'] <= 8
+
+def test_object_cache_keeps_the_most_recently_used_objects():
+    cache = ObjectCache(max_entries=2)
+    cache.put('a', [1])
+    cache.put('b', [2])
+    assert cache.get('a') == [1]
+    cache.put('c', [3])
+    assert 'b' not in cache and cache.get('a') == [1] and len(cache) == 2
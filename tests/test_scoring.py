@@ -0,0 +1,81 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.graph_arrays import CompactGraph
+from scripts.scoring import ScoringWeights, score_candidate_edges, ranked_candidate_pairs
+
+WEIGHTS = ScoringWeights(1.0, 1.0, 1.0, 0.5)
+
+def reference_scores(G, weights):
+    """Per-node scoring loop the batched scorer replaced."""
+    pairs = []
+    for emp in G.nodes():
+        attrs = G.nodes[emp]
+        seniority = attrs.get('seniority_score', 0)
+        if seniority >= 7:
+            continue
+        neighbors = list(G.neighbors(emp))
+        candidates = [n for n in neighbors if G.nodes[n].get('seniority_score', 0) > seniority] or neighbors
+        for cand in candidates:
+            cand_attrs = G.nodes[cand]
+            score = 0.0
+            if attrs.get('embedding') is not None and cand_attrs.get('embedding') is not None:
+                a, b = attrs['embedding'], cand_attrs['embedding']
+                score += float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b))) * weights.embedding_similarity
+            score += len(nx.common_neighbors(G, emp, cand)) * weights.common_neighbors
+            gap = cand_attrs.get('seniority_score', 0) - seniority
+            if gap > 0:
+                score += (1.0 / gap) * weights.seniority_gap
+            if cand_attrs.get('location') == attrs.get('location'):
+                score += weights.location_match
+            pairs.append((score, emp, cand))
+    pairs.sort(key=lambda x: x[0], reverse=True)
+    return pairs
+
+def make_frames(seed):
+    rng = np.random.default_rng(seed)
+    employees_df = pd.DataFrame({
+        'employee_id': np.arange(40) * 3,
+        'seniority_score': rng.integers(1, 8, size=40),
+        'location': rng.choice(['CA', 'TX', None], size=40),
+    })
+    # Ids above 117 only appear in connections and have no attributes at all
+    connections_df = pd.DataFrame(rng.integers(0, 45, size=(120, 2)) * 3,
+                                  columns=['employee_id_a', 'employee_id_b'])
+    embeddings = rng.standard_normal((40, 16)).astype(np.float32)
+    return employees_df, connections_df, embeddings
+
+def networkx_graph(employees_df, connections_df, embeddings):
+    """The dict-of-dicts graph build_graph_with_features used to build, with attributes attached."""
+    G = nx.Graph()
+    node_attributes = employees_df.set_index('employee_id').to_dict('index')
+    for (node_id, attrs), embedding in zip(node_attributes.items(), embeddings):
+        attrs['embedding'] = embedding
+    G.add_nodes_from(node_attributes.items())
+    G.add_edges_from(connections_df.values)
+    return G
+
+def test_compact_graph_matches_networkx_layout():
+    employees_df, connections_df, embeddings = make_frames(0)
+    G = networkx_graph(employees_df, connections_df, embeddings)
+    graph = CompactGraph.from_frames(employees_df, connections_df, embeddings)
+
+    assert graph.node_ids.tolist() == list(G.nodes())
+    assert graph.number_of_edges() == G.number_of_edges()
+    for node in G.nodes():
+        assert graph.neighbors(node).tolist() == list(G.neighbors(node))
+
+def test_batched_scores_match_per_node_reference():
+    for seed in range(5):
+        employees_df, connections_df, embeddings = make_frames(seed)
+        graph = CompactGraph.from_frames(employees_df, connections_df, embeddings)
+        src, dst, scores = score_candidate_edges(graph, WEIGHTS)
+        pairs = ranked_candidate_pairs(graph, src, dst, scores)
+        expected = reference_scores(networkx_graph(employees_df, connections_df, embeddings), WEIGHTS)
+
+        assert [(p[1], p[2]) for p in pairs] == [(p[1], p[2]) for p in expected]
+        assert np.allclose([p[0] for p in pairs], [p[0] for p in expected], atol=1e-5)
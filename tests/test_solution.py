@@ -65,6 +65,9 @@ def test_serving_script():
             assert 'text/html' in response.headers['Content-Type']
             html = response.read()
             assert b'<html>' in html.lower()
+            # Absolute links, so the page saved by curl still renders from disk
+            assert b'src="http://localhost:5001/assets/plotly-' in html
+            assert b'"http://localhost:5001/hierarchy/__NODE__?key=' in html
             
     except Exception as e:
         pytest.fail(f"An exception occurred during the test: {e}")
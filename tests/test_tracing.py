@@ -0,0 +1,62 @@
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.tracing import Tracer, stage, tracing
+from serving.metrics import MetricsRegistry
+
+def test_stages_are_recorded_only_under_a_tracer():
+    with stage('embed') as span:
+        pass
+    assert span.wall_seconds is None
+
+    seen = []
+    tracer = Tracer([seen.append], request_id='r1')
+    with tracing(tracer):
+        with stage('embed', items=10):
+            pass
+        with stage('score') as span:
+            span.items = 42
+    assert [s.name for s in tracer.spans] == ['embed', 'score'] and seen == tracer.spans
+    assert tracer.spans[1].items == 42 and tracer.spans[1].wall_seconds >= 0 and tracer.spans[1].cpu_seconds >= 0
+    assert tracer.server_timing().startswith('embed;dur=') and ', score;dur=' in tracer.server_timing()
+
+    with stage('render') as span:
+        pass
+    assert len(tracer.spans) == 2
+
+def test_outer_stage_peak_covers_nested_stages():
+    tracemalloc.start()
+    try:
+        with tracing(Tracer()) as tracer:
+            with stage('delta'):
+                with stage('embed'):
+                    block = bytearray(8 << 20)
+                    del block
+                with stage('index'):
+                    pass
+    finally:
+        tracemalloc.stop()
+    peaks = {span.name: span.peak_bytes for span in tracer.spans}
+    assert peaks['embed'] >= 8 << 20 and peaks['index'] < 1 << 20
+    assert peaks['delta'] >= peaks['embed']
+
+def test_metrics_render_in_prometheus_format():
+    registry = MetricsRegistry()
+    requests = registry.counter('http_requests_total', 'Requests.')
+    latency = registry.histogram('stage_seconds', 'Latency.', buckets=(0.1, 1.0))
+    registry.callback('queue_depth', 'Depth.', lambda: 3)
+    requests.inc(endpoint='/predict', status='200')
+    requests.inc(endpoint='/predict', status='200')
+    for value in (0.05, 0.1, 0.5, 5.0):
+        latency.observe(value, stage='score')
+
+    lines = registry.render().splitlines()
+    assert '# TYPE http_requests_total counter' in lines
+    assert 'http_requests_total{endpoint="/predict",status="200"} 2' in lines
+    assert 'stage_seconds_bucket{stage="score",le="0.1"} 2' in lines
+    assert 'stage_seconds_bucket{stage="score",le="1"} 3' in lines
+    assert 'stage_seconds_bucket{stage="score",le="+Inf"} 4' in lines
+    assert 'stage_seconds_count{stage="score"} 4' in lines and 'stage_seconds_sum{stage="score"} 5.65' in lines
+    assert 'queue_depth 3' in lines
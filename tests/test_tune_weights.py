@@ -0,0 +1,55 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.run_stages import HashEmbedder
+from benchmarks.synthetic_org import generate_org
+from dependencies.evaluate import manager_accuracy
+from scripts.scoring import candidate_edges, compute_edge_features
+from scripts.solution import build_graph_with_features, build_submission, predict_managers_globally
+import scripts.solution as solution
+from scripts.tune_weights import AccuracyEvaluator, tune, grid_weights, unique_up_to_scale
+
+def setup_org(n=300):
+    employees_df, connections_df, truth = generate_org(n, seed=4)
+    graph = build_graph_with_features(employees_df.copy(), connections_df, model=HashEmbedder())
+    src, dst = candidate_edges(graph)
+    return employees_df, truth, graph, src, dst, compute_edge_features(graph, src, dst)
+
+def test_tuning_matches_full_runs(monkeypatch):
+    employees_df, truth, graph, src, dst, features = setup_org()
+    evaluator = AccuracyEvaluator(employees_df, truth)
+    results = tune(grid_weights([[0, 1], [1, 2], [0.5], [0, 1]]), graph.node_ids, src, dst, features, evaluator)
+    assert len(results) == 8 and results['accuracy'].is_monotonic_decreasing
+
+    for _, row in results.iterrows():
+        for name, attr in [('embedding_similarity', 'WEIGHT_EMBEDDING_SIMILARITY'),
+                           ('common_neighbors', 'WEIGHT_COMMON_NEIGHBORS'),
+                           ('seniority_gap', 'WEIGHT_SENIORITY_GAP'),
+                           ('location_match', 'WEIGHT_LOCATION_MATCH')]:
+            monkeypatch.setattr(solution, attr, row[name])
+        submission = build_submission(employees_df, predict_managers_globally(graph))
+        assert manager_accuracy(submission, truth)[0] == row['accuracy']
+
+def test_workers_give_the_same_table(monkeypatch):
+    monkeypatch.setattr('scripts.tune_weights.PARALLEL_MIN_WORK', 0)
+    employees_df, truth, graph, src, dst, features = setup_org(200)
+    evaluator = AccuracyEvaluator(employees_df, truth)
+    weights = grid_weights([[0, 1, 2]] * 3 + [[0, 1]])
+    serial = tune(weights, graph.node_ids, src, dst, features, evaluator, batch_size=4)
+    parallel = tune(weights, graph.node_ids, src, dst, features, evaluator, workers=2, batch_size=4)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+def test_evaluator_matches_evaluate_script():
+    employees_df, truth, _, _, _, _ = setup_org(100)
+    rng = np.random.default_rng(0)
+    predictions = dict(zip(employees_df['employee_id'], rng.permutation(truth['manager_id'].to_numpy())))
+    predictions.update(zip(truth['employee_id'][:40], truth['manager_id'][:40]))
+    expected = manager_accuracy(build_submission(employees_df, predictions), truth)[0]
+    assert AccuracyEvaluator(employees_df, truth).accuracy(predictions) == expected
+
+def test_scaled_vectors_are_evaluated_once():
+    assert unique_up_to_scale([(1, 1, 0, 0), (2, 2, 0, 0), (0, 0, 0, 0), (1, 0, 0, 0)]) == \
+        [(1, 1, 0, 0), (0, 0, 0, 0), (1, 0, 0, 0)]
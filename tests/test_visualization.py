@@ -0,0 +1,108 @@
+import math
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dependencies.visualize_sunburst import sunburst_html, sunburst_page, SunburstTree
+from dependencies.visualize_network import network_figure_from_frames, create_radial_layout
+
+def test_visualizations_render_from_dataframes(tmp_path):
+    """
+    Tests that both charts can be produced from in-memory DataFrames without writing files.
+    """
+    employees_df = pd.read_csv('data/employees.csv')
+    connections_df = pd.read_csv('data/connections.csv')
+    gt_df = pd.read_csv('data/ground_truth_managers.csv')
+
+    cwd = os.getcwd()
+    os.chdir(tmp_path)
+    try:
+        html = sunburst_html(employees_df, gt_df)
+        fig = network_figure_from_frames(employees_df, connections_df, gt_df)
+    finally:
+        os.chdir(cwd)
+
+    assert '<html>' in html.lower()
+    assert len(fig.data) == 3
+    assert os.listdir(tmp_path) == []
+
+def test_radial_layout_handles_deep_hierarchies():
+    # Far deeper than the recursion limit
+    depth = sys.getrecursionlimit() * 3
+    ids = np.arange(1, depth + 1)
+    gt_df = pd.DataFrame({'employee_id': ids, 'manager_id': np.concatenate([[-1], ids[:-1]])})
+    layout = create_radial_layout(None, gt_df)
+    assert len(layout) == depth and layout[1] == (0.0, 0.0)
+    assert math.isclose(math.hypot(*layout[depth]), (depth - 1) * 10)
+
+def test_radial_layout_splits_wedges_between_reports():
+    gt_df = pd.DataFrame({'employee_id': [1, 2, 3, 4], 'manager_id': [-1, 1, 1, 2]})
+    layout = create_radial_layout(None, gt_df)
+    # 2 and 3 share the circle; 4 sits in the middle of 2's half at level 2
+    assert np.allclose(layout[2], (10 * math.cos(math.pi / 2), 10 * math.sin(math.pi / 2)))
+    assert np.allclose(layout[3], (10 * math.cos(3 * math.pi / 2), 10 * math.sin(3 * math.pi / 2)))
+    assert np.allclose(layout[4], (20 * math.cos(math.pi / 2), 20 * math.sin(math.pi / 2)))
+
+def test_large_graphs_use_webgl_and_sample_edges():
+    rng = np.random.default_rng(0)
+    n = 3000
+    employees_df = pd.DataFrame({'employee_id': np.arange(1, n + 1), 'name': 'x', 'job_title_current': 'y'})
+    connections_df = pd.DataFrame({'a': rng.integers(1, n + 1, 20_000), 'b': rng.integers(1, n + 1, 20_000)})
+    gt_df = pd.DataFrame({'employee_id': np.arange(1, n + 1), 'manager_id': np.concatenate([[-1], np.arange(1, n)])})
+
+    fig = network_figure_from_frames(employees_df, connections_df, gt_df, max_edges=2500)
+    assert all(trace.type == 'scattergl' for trace in fig.data)
+    edges_x = np.asarray(fig.data[0].x, dtype=float)
+    assert len(edges_x) == 3 * 2500 and np.isnan(edges_x[2::3]).all()
+    assert 'sampled' in fig.data[0].name
+
+    fig = network_figure_from_frames(employees_df.head(50), connections_df.head(40), gt_df.head(50), renderer='auto')
+    assert all(trace.type == 'scatter' for trace in fig.data)
+
+def _org(managers):
+    ids = np.arange(1, len(managers) + 1)
+    employees_df = pd.DataFrame({'employee_id': ids, 'name': [f'e{i}' for i in ids], 'job_title_current': 't'})
+    return employees_df, pd.DataFrame({'employee_id': ids, 'manager_id': managers})
+
+def test_sunburst_views_stay_within_the_node_budget():
+    # A CEO with 5,000 reports, the first of whom has 100 reports of their own
+    managers = np.concatenate([[-1], np.ones(5000, dtype=int), np.full(100, 2)])
+    tree = SunburstTree(*_org(managers))
+    assert tree.size[0] == 5101
+
+    view = tree.view(max_depth=3, max_nodes=50)
+    assert len(view['ids']) == 50
+    # Head counts add up: the CEO's wedge equals its shown teams plus the "+N more" wedge
+    shown = view['parents'] == '1'
+    assert view['values'][0] == 1 + view['values'][shown].sum()
+    assert view['ids'][-1] == '1/more' and view['labels'][-1] == '+4952 more'
+    # The largest team is kept and, with its reports hidden, drills down to itself
+    row = list(view['ids']).index('2')
+    assert view['values'][row] == 101 and view['targets'][row] == '2'
+
+    # Drilling into employee 2 shows its team, with the centre pointing back up
+    view = tree.view(2, max_depth=3, max_nodes=50)
+    assert view['ids'][0] == '2' and view['parents'][0] == '' and view['targets'][0] == '1'
+    assert len(view['ids']) == 50
+
+    # Without limits every employee is drawn
+    assert len(tree.view(max_depth=None, max_nodes=None)['ids']) == 5101
+
+def test_sunburst_tree_skips_unreachable_employees():
+    # 4 is unassigned (0) and 5/6 report to each other: none of them hangs off the CEO
+    tree = SunburstTree(*_org([-1, 1, 2, 0, 6, 5]))
+    assert sorted(tree.view(max_depth=None, max_nodes=None)['ids']) == ['1', '2', '3']
+    try:
+        tree.view(5)
+        assert False, 'expected KeyError'
+    except KeyError:
+        pass
+
+def test_sunburst_page_links_plotly_js_instead_of_inlining_it():
+    tree = SunburstTree(*_org([-1, 1, 1]))
+    html = sunburst_page(tree.figure(), '/assets/plotly.min.js', '/hierarchy/__NODE__?key=abc')
+    assert '<script charset="utf-8" src="/assets/plotly.min.js"></script>' in html
+    assert '"/hierarchy/__NODE__?key=abc"' in html and 'plotly_sunburstclick' in html
+    assert len(html) < 20_000
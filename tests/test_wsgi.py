@@ -0,0 +1,43 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def get(url):
+    with urllib.request.urlopen(url, timeout=2) as response:
+        return response.status, response.headers
+
+def test_preforking_server_serves_and_shuts_down_gracefully():
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), WEB_WORKERS='2', WEB_THREADS='2', PRELOAD_MODEL='0')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'serving/gunicorn.conf.py'],
+                              cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        deadline = time.time() + 60
+        while True:
+            try:
+                status, _ = get(f'http://127.0.0.1:{port}/healthz')
+                break
+            except OSError:
+                assert time.time() < deadline and server.poll() is None, "server did not start"
+                time.sleep(0.1)
+        assert status == 200
+        # PRELOAD_MODEL=0: every worker reports ready without a model loaded
+        assert {get(f'http://127.0.0.1:{port}/ready')[0] for _ in range(4)} == {200}
+    finally:
+        server.send_signal(signal.SIGTERM)
+        _, stderr = server.communicate(timeout=30)
+    assert server.returncode == 0
+    assert stderr.decode().count('Booting worker') == 2